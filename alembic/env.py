@@ -10,6 +10,8 @@ from app.db.models.character import Character as Character
 from app.db.models.combined import (
     word_character_association_table as word_character_association_table,
 )
+from app.db.models.dictionary_change import DictionaryChange as DictionaryChange
+from app.db.models.dictionary_version import DictionaryVersion as DictionaryVersion
 from app.db.models.user import User as User
 from app.db.models.word import Word as Word
 from app.settings.db import db_settings
@@ -0,0 +1,85 @@
+"""Adding dictionary changes table
+
+Revision ID: 1ca6a8e8aa88
+Revises: 9a6b2d4e8f13
+Create Date: 2026-10-18 21:38:14.420272
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "1ca6a8e8aa88"
+down_revision = "9a6b2d4e8f13"
+branch_labels = None
+depends_on = None
+
+# the md5 of the columns, as in app.db.models.base.content_hash
+WORDS_CONTENT_HASH = (
+    "md5(coalesce(simplified::text, '') || chr(31) || "
+    "coalesce(traditional::text, '') || chr(31) || "
+    "coalesce(pinyin_num::text, '') || chr(31) || "
+    "coalesce(pinyin_accent::text, '') || chr(31) || "
+    "coalesce(pinyin_clean::text, '') || chr(31) || "
+    "coalesce(pinyin_no_spaces::text, '') || chr(31) || "
+    "coalesce(also_written::text, '') || chr(31) || "
+    "coalesce(also_pronounced::text, '') || chr(31) || "
+    "coalesce(classifiers::text, '') || chr(31) || "
+    "coalesce(definitions::text, '') || chr(31) || "
+    "coalesce(frequency::text, ''))"
+)
+CHARACTERS_CONTENT_HASH = (
+    "md5(coalesce(character::text, '') || chr(31) || "
+    "coalesce(definition::text, '') || chr(31) || "
+    "coalesce(pinyin::text, '') || chr(31) || "
+    "coalesce(decomposition::text, '') || chr(31) || "
+    "coalesce(etymology::text, '') || chr(31) || "
+    "coalesce(radical::text, '') || chr(31) || "
+    "coalesce(matches::text, '') || chr(31) || "
+    "coalesce(frequency::text, ''))"
+)
+
+
+def upgrade():
+    op.create_table(
+        "dictionary_changes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(length=10), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=True),
+        sa.Column("key", sa.String(length=50), nullable=True),
+        sa.Column("action", sa.String(length=6), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_dictionary_changes")),
+    )
+    op.create_index(op.f("ix_dictionary_changes_id"), "dictionary_changes", ["id"], unique=False)
+    op.create_index(op.f("ix_dictionary_changes_version"), "dictionary_changes", ["version"], unique=False)
+    # the hashes of the existing rows are computed when the columns are added
+    op.add_column(
+        "words",
+        sa.Column(
+            "content_hash",
+            sa.String(length=32),
+            sa.Computed(WORDS_CONTENT_HASH, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "characters",
+        sa.Column(
+            "content_hash",
+            sa.String(length=32),
+            sa.Computed(CHARACTERS_CONTENT_HASH, persisted=True),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("characters", "content_hash")
+    op.drop_column("words", "content_hash")
+    op.drop_index(op.f("ix_dictionary_changes_version"), table_name="dictionary_changes")
+    op.drop_index(op.f("ix_dictionary_changes_id"), table_name="dictionary_changes")
+    op.drop_table("dictionary_changes")
@@ -0,0 +1,45 @@
+"""Adding pinyin search indexes
+
+Revision ID: 3c9e5d2a7b41
+Revises: f674fb1e524a
+Create Date: 2026-10-18 10:12:31.418302
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c9e5d2a7b41"
+down_revision = "f674fb1e524a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_words_pinyin_no_spaces_lower",
+        "words",
+        [sa.text("lower(pinyin_no_spaces) text_pattern_ops")],
+        unique=False,
+    )
+    # the partial search still works without pg_trgm (contrib), it just can't use an index
+    connection = op.get_bind()
+    has_pg_trgm = connection.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar_one_or_none()
+    if has_pg_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_words_pinyin_no_spaces_trgm",
+            "words",
+            [sa.text("lower(pinyin_no_spaces) gin_trgm_ops")],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade():
+    op.drop_index("ix_words_pinyin_no_spaces_trgm", table_name="words", if_exists=True)
+    op.drop_index("ix_words_pinyin_no_spaces_lower", table_name="words")
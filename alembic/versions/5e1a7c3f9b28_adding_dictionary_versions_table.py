@@ -0,0 +1,36 @@
+"""Adding dictionary versions table
+
+Revision ID: 5e1a7c3f9b28
+Revises: 8d4f1b6e2c90
+Create Date: 2026-10-18 14:20:07.514269
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e1a7c3f9b28"
+down_revision = "8d4f1b6e2c90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dictionary_versions = op.create_table(
+        "dictionary_versions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_dictionary_versions")),
+        sa.UniqueConstraint("version", name=op.f("uq_dictionary_versions_version")),
+    )
+    op.create_index(op.f("ix_dictionary_versions_id"), "dictionary_versions", ["id"], unique=False)
+    # whatever is already in the words and characters tables is the first version
+    op.bulk_insert(dictionary_versions, [{"version": 1}])
+
+
+def downgrade():
+    op.drop_index(op.f("ix_dictionary_versions_id"), table_name="dictionary_versions")
+    op.drop_table("dictionary_versions")
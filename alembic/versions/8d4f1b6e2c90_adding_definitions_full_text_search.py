@@ -0,0 +1,36 @@
+"""Adding definitions full-text search
+
+Revision ID: 8d4f1b6e2c90
+Revises: 3c9e5d2a7b41
+Create Date: 2026-10-18 11:02:54.102771
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d4f1b6e2c90"
+down_revision = "3c9e5d2a7b41"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "words",
+        sa.Column(
+            "definitions_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', definitions)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_words_definitions_tsv", "words", ["definitions_tsv"], unique=False, postgresql_using="gin")
+
+
+def downgrade():
+    op.drop_index("ix_words_definitions_tsv", table_name="words", postgresql_using="gin")
+    op.drop_column("words", "definitions_tsv")
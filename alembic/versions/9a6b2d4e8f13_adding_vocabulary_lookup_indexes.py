@@ -0,0 +1,31 @@
+"""Adding vocabulary lookup indexes
+
+Revision ID: 9a6b2d4e8f13
+Revises: 5e1a7c3f9b28
+Create Date: 2026-10-18 15:03:41.226914
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9a6b2d4e8f13"
+down_revision = "5e1a7c3f9b28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f("ix_characters_character"), "characters", ["character"], unique=True)
+    op.create_index(op.f("ix_words_simplified"), "words", ["simplified"], unique=False)
+    op.create_index(op.f("ix_words_traditional"), "words", ["traditional"], unique=False)
+    op.create_index(op.f("ix_words_frequency"), "words", ["frequency"], unique=False)
+    op.create_index("ix_word_characters_character_id", "word_characters", ["character_id", "word_id"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_word_characters_character_id", table_name="word_characters")
+    op.drop_index(op.f("ix_words_frequency"), table_name="words")
+    op.drop_index(op.f("ix_words_traditional"), table_name="words")
+    op.drop_index(op.f("ix_words_simplified"), table_name="words")
+    op.drop_index(op.f("ix_characters_character"), table_name="characters")
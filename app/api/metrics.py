@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Request, Response
+
+from app.core.metrics import CONTENT_TYPE, MetricsRegistry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=Response, name="metrics", include_in_schema=False)
+async def get_metrics(request: Request) -> Response:
+    """
+    The metrics in the Prometheus text format.
+    """
+    registry: MetricsRegistry = request.state._metrics
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,10 +1,12 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from app.api import v1
+from app.api import metrics, v1
 from app.core.exceptions import CNLearnWithMessage
 from app.core.handlers import cnlearn_exception_handler
 from app.middleware.logger import AccessLogger
+from app.middleware.metrics import RequestMetrics
+from app.middleware.profiler import RequestProfiler
 from app.settings.base import app_settings
 from app.settings.logging.structlog import configure_logging
 from app.state import lifespan
@@ -29,6 +31,9 @@ def create_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(RequestProfiler)
     app.add_middleware(AccessLogger, logger=logger)
+    app.add_middleware(RequestMetrics)
     app.include_router(v1.api_router, prefix=app_settings.API_V1_STR)
+    app.include_router(metrics.router)
     return app
@@ -0,0 +1,168 @@
+"""
+This module contains the metrics exposed on /metrics in the Prometheus text
+format. They are only ever updated from the event loop's thread so, unlike
+prometheus_client's, they don't take a lock: recording a value is a dictionary
+lookup and an addition. Values that are only known when asked for, such as the
+state of the database pool, are read by collectors at scrape time.
+"""
+
+import bisect
+import math
+from typing import Callable, Iterable
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+# the ones prometheus_client uses, in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind: str = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names: Labels = tuple(label_names)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, *labels: str, value: float) -> None:
+        # for counters kept elsewhere (e.g. SegmentationStats) and copied at scrape time
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # labels -> [count of each bucket (not cumulative) and of +Inf, sum]
+        self._values: dict[Labels, list[float]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        counts = self._values.get(labels)
+        if counts is None:
+            counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        # a value on a bucket's upper bound belongs to that bucket (le)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def count(self, *labels: str) -> int:
+        counts = self._values.get(labels)
+        return int(sum(counts[:-1])) if counts is not None else 0
+
+    def _samples(self) -> Iterable[str]:
+        label_names = (*self.label_names, "le")
+        for labels, counts in self._values.items():
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), counts[:-1]):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket{_format_labels(label_names, (*labels, _format_value(bound)))} "
+                    f"{_format_value(cumulative)}"
+                )
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {_format_value(cumulative)}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: dict[str, Callable[[], None]] = {}
+
+    def _register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"{metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        counter = Counter(name, documentation, label_names)
+        self._register(counter)
+        return counter
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        gauge = Gauge(name, documentation, label_names)
+        self._register(gauge)
+        return gauge
+
+    def histogram(
+        self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, label_names, buckets)
+        self._register(histogram)
+        return histogram
+
+    def add_collector(self, name: str, collector: Callable[[], None]) -> None:
+        """
+        Adds a function, called before every scrape, that updates some of the metrics.
+        """
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        for collector in self._collectors.values():
+            collector()
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
@@ -0,0 +1,27 @@
+"""
+This module contains the helpers for keyset (seek) pagination: the position of
+the last row of a page is handed to the client as an opaque cursor token which
+is then used to ask for the rows that come after it.
+"""
+
+import base64
+import binascii
+from typing import Any, Sequence
+
+import orjson
+
+from .exceptions import CNLearnWithMessage
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).decode("ascii")
+
+
+def decode_cursor(cursor: str, n_values: int) -> list[Any]:
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeEncodeError):
+        raise CNLearnWithMessage(status_code=400, message="Invalid cursor.")
+    if not isinstance(values, list) or len(values) != n_values:
+        raise CNLearnWithMessage(status_code=400, message="Invalid cursor.")
+    return values
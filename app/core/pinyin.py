@@ -0,0 +1,82 @@
+"""
+This module contains helpers to normalise the different ways pinyin can be typed
+(tone numbers, tone marks or no tones at all, with or without spaces) into the
+forms stored in the words table.
+"""
+
+import re
+import unicodedata
+from typing import NamedTuple
+
+# the combining characters used for the four tone marks (macron, acute, caron, grave)
+TONE_MARKS: frozenset[str] = frozenset("̄́̌̀")
+TONE_NUMBERS: frozenset[str] = frozenset("12345")
+_SEPARATORS = re.compile(r"[\s'’\-]+")
+_VALID_TONELESS = re.compile(r"^[a-zü]+$")
+# a CC-CEDICT syllable with its tone number, ü being written u:
+_NUMBERED_SYLLABLE = re.compile(r"([a-zA-Zü:]+)([1-5])")
+_COMBINING_TONE_MARKS: dict[str, str] = {"1": "\u0304", "2": "\u0301", "3": "\u030c", "4": "\u0300"}
+
+
+class NormalisedPinyin(NamedTuple):
+    # compared with lower(pinyin_no_spaces)
+    toneless: str
+    # compared with lower(pinyin_num) without spaces, when the input had tone numbers
+    tone_numbers: str | None
+    # compared with lower(pinyin_accent) without spaces, when the input had tone marks
+    tone_marks: str | None
+
+
+def strip_tone_marks(text: str) -> str:
+    decomposed = unicodedata.normalize("NFD", text)
+    return unicodedata.normalize("NFC", "".join(c for c in decomposed if c not in TONE_MARKS))
+
+
+def has_tone_marks(text: str) -> bool:
+    return any(c in TONE_MARKS for c in unicodedata.normalize("NFD", text))
+
+
+def normalise_pinyin(text: str) -> NormalisedPinyin | None:
+    """
+    Returns the normalised forms of `text` or None if it isn't something that looks like pinyin.
+    ü can be typed as ü, v or u: (as in CC-CEDICT).
+    """
+    cleaned = _SEPARATORS.sub("", unicodedata.normalize("NFC", text).lower())
+    cleaned = cleaned.replace("u:", "ü").replace("v", "ü")
+    toneless = strip_tone_marks("".join(c for c in cleaned if c not in TONE_NUMBERS))
+    if not _VALID_TONELESS.match(toneless):
+        return None
+    tone_numbers: str | None = None
+    if any(c in TONE_NUMBERS for c in cleaned):
+        # pinyin_num keeps the CC-CEDICT spelling of ü
+        tone_numbers = strip_tone_marks(cleaned).replace("ü", "u:")
+    tone_marks: str | None = None
+    if has_tone_marks(cleaned):
+        tone_marks = "".join(c for c in cleaned if c not in TONE_NUMBERS)
+    return NormalisedPinyin(toneless=toneless, tone_numbers=tone_numbers, tone_marks=tone_marks)
+
+
+def _mark_syllable(letters: str, tone: str) -> str:
+    letters = letters.replace("u:", "ü").replace("U:", "Ü")
+    mark = _COMBINING_TONE_MARKS.get(tone)
+    lowered = letters.lower()
+    # a and e always take the mark, o takes it in ou, otherwise it goes on the last vowel
+    if "a" in lowered:
+        position = lowered.index("a")
+    elif "e" in lowered:
+        position = lowered.index("e")
+    elif "ou" in lowered:
+        position = lowered.index("o")
+    else:
+        position = max(lowered.rfind(vowel) for vowel in "iouü")
+    if mark is None or position < 0:
+        return letters
+    return unicodedata.normalize("NFC", letters[: position + 1] + mark + letters[position + 1 :])
+
+
+def tone_numbers_to_marks(text: str) -> str:
+    """
+    Converts CC-CEDICT pinyin (ni3 hao3, nu:3) to pinyin with tone marks (nǐ hǎo, nǚ).
+    The neutral tone (5) gets no mark and anything without a tone number is kept as is.
+    """
+    return _NUMBERED_SYLLABLE.sub(lambda match: _mark_syllable(match[1], match[2]), text)
@@ -0,0 +1,89 @@
+"""
+This module contains a statistical profiler: a background thread looks at the
+stack of the profiled thread every few milliseconds and counts how many times
+each stack was seen. The counts are written in the collapsed stack format
+(`outermost;...;innermost count`, one stack per line) that flamegraph.pl,
+speedscope or inferno turn into flame graphs. Nothing is traced, so the
+profiled code runs at its usual speed apart from the sampling itself. The
+sampling thread needs the GIL to look at the stack, so while it runs the
+interpreter's switch interval is lowered to the sampling interval.
+"""
+
+import os
+import site
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+_PREFIXES: tuple[str, ...] = tuple(
+    os.path.join(path, "") for path in [*site.getsitepackages(), sysconfig.get_paths()["stdlib"]]
+)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # jieba/__init__.py rather than the whole path of site-packages or of the standard library
+    for prefix in _PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix) :]
+            break
+    else:
+        if os.path.isabs(filename):
+            filename = os.path.relpath(filename)
+    # ; separates the frames, the count comes after the last space
+    return f"{code.co_qualname} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def collapse_stack(frame: FrameType | None) -> str:
+    names: list[str] = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: int, interval: float = 0.001) -> None:
+        """
+        **Parameters**
+        * `thread_id`: `threading.get_ident()` of the thread to profile
+        * `interval`: seconds between two samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._switch_interval: float | None = None
+        self._sampler = threading.Thread(target=self._sample, name="profiler", daemon=True)
+
+    @property
+    def samples(self) -> int:
+        return self.stacks.total()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def start(self) -> None:
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._sampler.join()
+        if self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed(), encoding="utf-8")
@@ -0,0 +1,39 @@
+"""
+This module contains the sentence splitter used when searching long texts. It
+works on a stream of text so that a whole book never has to be held in memory.
+"""
+
+import re
+from typing import AsyncIterable, AsyncIterator
+
+SENTENCE_ENDINGS: str = "。！？!?；;\n"
+# a sentence ends with one or more of the above, possibly followed by closing quotes or brackets
+_SENTENCE = re.compile(rf"[^{SENTENCE_ENDINGS}]*[{SENTENCE_ENDINGS}]+[”’」』）)\"']*")
+
+
+async def split_sentences(chunks: AsyncIterable[str], max_length: int = 500) -> AsyncIterator[str]:
+    """
+    Yields the sentences of the text made of `chunks`, without surrounding whitespace.
+    Text without sentence endings is cut every `max_length` characters.
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        position = 0
+        while (match := _SENTENCE.match(buffer, position)) is not None and match.end() < len(buffer):
+            # a match reaching the end of the buffer could still be followed by a closing quote
+            if sentence := match.group().strip():
+                yield sentence
+            position = match.end()
+        buffer = buffer[position:]
+        while len(buffer) > max_length:
+            if sentence := buffer[:max_length].strip():
+                yield sentence
+            buffer = buffer[max_length:]
+    position = 0
+    while (match := _SENTENCE.match(buffer, position)) is not None:
+        if sentence := match.group().strip():
+            yield sentence
+        position = match.end()
+    if sentence := buffer[position:].strip():
+        yield sentence
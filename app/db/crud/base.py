@@ -1,9 +1,15 @@
-from typing import Any, Generic, Optional, Sequence, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Collection, Generic, Optional, Sequence, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, and_, inspect, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, load_only
+from sqlalchemy.sql.base import ExecutableOption
+
+from app.core.exceptions import CNLearnWithMessage
+from app.core.pagination import decode_cursor, encode_cursor
 
 from ..models.base import Base
 
@@ -27,9 +33,95 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return results.scalar_one_or_none()
 
     async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> Sequence[ModelType]:
-        results = await db.execute(select(self.model).offset(skip).limit(limit))
+        """
+        The legacy OFFSET pagination, kept for its existing callers. Deep offsets get slower
+        and slower, new list endpoints must use `get_page`.
+        """
+        results = await db.execute(select(self.model).order_by(self.model.id).offset(skip).limit(limit))
         return results.scalars().all()
 
+    def _load_only(self, fields: Collection[str] | None) -> list[ExecutableOption]:
+        """
+        Returns the option loading only the columns among `fields` (and the primary key),
+        none when `fields` is None and every column is needed.
+        """
+        if fields is None:
+            return []
+        columns = [
+            getattr(self.model, column.key) for column in inspect(self.model).column_attrs if column.key in fields
+        ]
+        return [load_only(self.model.id, *columns)]
+
+    def _sort_column(self, sort_key: str) -> ColumnElement[Any]:
+        column = getattr(self.model, sort_key, None)
+        if not isinstance(column, InstrumentedAttribute):
+            raise ValueError(f"{self.model.__name__} has no column {sort_key}")
+        return column.expression
+
+    def _decode_cursor(self, cursor: str, sort_column: ColumnElement[Any]) -> tuple[Any, int]:
+        sort_value, after_id = decode_cursor(cursor, 2)
+        python_type = sort_column.type.python_type
+        if python_type is datetime and isinstance(sort_value, str):
+            try:
+                sort_value = datetime.fromisoformat(sort_value)
+            except ValueError:
+                raise CNLearnWithMessage(status_code=400, message="Invalid cursor.")
+        # JSON doesn't tell 1.0 from 1
+        if python_type is float and isinstance(sort_value, int) and not isinstance(sort_value, bool):
+            sort_value = float(sort_value)
+        # bool is an int too, but never a valid id
+        if not isinstance(sort_value, python_type) or not isinstance(after_id, int) or isinstance(after_id, bool):
+            raise CNLearnWithMessage(status_code=400, message="Invalid cursor.")
+        return sort_value, after_id
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        sort_key: str | ColumnElement[Any] = "id",
+        descending: bool = False,
+        where: Sequence[ColumnElement[bool]] = (),
+        options: Sequence[ExecutableOption] = (),
+    ) -> tuple[Sequence[ModelType], str | None]:
+        """
+        Keyset (seek) pagination: the rows are ordered by `(sort_key, id)` and a page starts
+        right after the row its cursor points to, so every page costs the same however deep
+        it is, as long as `(sort_key, id)` is indexed.
+        **Parameters**
+        * `limit`: number of rows in a page
+        * `cursor`: the cursor returned with the previous page, None for the first page
+        * `sort_key`: name of a non nullable column, or a non nullable expression (with a type), to
+        order by, ties are broken by id (ascending)
+        * `descending`: whether `sort_key` is in descending order
+        * `where`: conditions the rows must meet
+        * `options`: loader options, e.g. `selectinload` of a relationship
+
+        Returns the rows and the cursor of the next page, None when this is the last page.
+        """
+        sort_column = self._sort_column(sort_key) if isinstance(sort_key, str) else sort_key
+        # the sort value of the last row goes in the next cursor
+        statement = select(self.model, sort_column).where(*where)
+        if cursor is not None:
+            sort_value, after_id = self._decode_cursor(cursor, sort_column)
+            after_sort = sort_column < sort_value if descending else sort_column > sort_value
+            statement = statement.where(or_(after_sort, and_(sort_column == sort_value, self.model.id > after_id)))
+        # one more row than asked for tells us whether there is a next page
+        statement = (
+            statement.order_by(sort_column.desc() if descending else sort_column, self.model.id)
+            .limit(limit + 1)
+            .options(*options)
+        )
+        results = await db.execute(statement)
+        rows = results.tuples().all()
+        next_cursor: str | None = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_row, last_sort_value = rows[-1]
+            next_cursor = encode_cursor([last_sort_value, last_row.id])
+        return [row for row, _ in rows], next_cursor
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.model_dump(by_alias=False)
         db_obj = self.model(**obj_in_data)
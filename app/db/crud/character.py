@@ -1,6 +1,6 @@
-from typing import Sequence
+from typing import Collection, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -8,6 +8,8 @@ from app.domain.vocabulary import character as character_domain
 from app.domain.vocabulary import common as common_vocabulary_domain
 
 from ..models import character as character_model
+from ..models import word as word_model
+from ..models.combined import word_character_association_table
 from .base import CRUDBase
 
 
@@ -17,14 +19,62 @@ class CRUDCharacter(
     CRUDBase[character_model.Character, character_domain.CharacterSchema, character_domain.CharacterSchema]
 ):
     async def get_multiple_characters(
-        self, db: AsyncSession, *, characters: list[common_vocabulary_domain.Character], include_words: bool
+        self,
+        db: AsyncSession,
+        *,
+        characters: list[common_vocabulary_domain.Character],
+        include_words: bool,
+        fields: Collection[str] | None = None,
     ) -> Sequence[character_model.Character]:
-        statement = select(character_model.Character).where(character_model.Character.character.in_(characters))
+        """
+        Returns the characters of `characters`. With `fields` only those columns are loaded.
+        """
+        statement = (
+            select(character_model.Character)
+            .where(character_model.Character.character.in_(characters))
+            .options(*self._load_only(fields))
+        )
         if include_words:
             statement = statement.options(selectinload(character_model.Character.words))
         result = await db.execute(statement)
         cs = result.scalars().all()
         return cs
 
+    async def get_top_words(
+        self, db: AsyncSession, *, character_ids: list[int], limit: int
+    ) -> dict[int, list[word_model.Word]]:
+        """
+        Returns, for each of `character_ids`, its `limit` most frequent words (most frequent
+        first). The words are ranked with a window function so that only the ones kept are
+        loaded, however many words a character appears in.
+        """
+        links = word_character_association_table.c
+        ranked = (
+            select(
+                links.character_id,
+                links.word_id,
+                func.row_number()
+                .over(
+                    partition_by=links.character_id,
+                    order_by=(word_model.Word.frequency.desc(), word_model.Word.id),
+                )
+                .label("rank"),
+            )
+            .join(word_model.Word, word_model.Word.id == links.word_id)
+            .where(links.character_id.in_(character_ids))
+            .subquery()
+        )
+        statement = (
+            select(ranked.c.character_id, word_model.Word)
+            .join(ranked, ranked.c.word_id == word_model.Word.id)
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.character_id, ranked.c.rank)
+        )
+        result = await db.execute(statement)
+        top_words: dict[int, list[word_model.Word]] = {character_id: [] for character_id in character_ids}
+        for character_id, word in result.tuples():
+            top_words[character_id].append(word)
+        return top_words
+
 
 character_crud = CRUDCharacter(character_model.Character)
@@ -0,0 +1,30 @@
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.vocabulary import version as version_domain
+
+from ..models import dictionary_change as dictionary_change_model
+from .base import CRUDBase
+
+
+class CRUDDictionaryChange(
+    CRUDBase[
+        dictionary_change_model.DictionaryChange,
+        version_domain.DictionaryChange,
+        version_domain.DictionaryChange,
+    ]
+):
+    async def get_since(
+        self, db: AsyncSession, *, version: int, limit: int = 100, cursor: str | None = None
+    ) -> tuple[Sequence[dictionary_change_model.DictionaryChange], str | None]:
+        """
+        Returns a page of the changes made after `version`, oldest first. A "reload"
+        among them means that everything has to be fetched again.
+        """
+        return await self.get_page(
+            db, limit=limit, cursor=cursor, where=(dictionary_change_model.DictionaryChange.version > version,)
+        )
+
+
+dictionary_change_crud = CRUDDictionaryChange(dictionary_change_model.DictionaryChange)
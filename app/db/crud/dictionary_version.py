@@ -0,0 +1,37 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.vocabulary import version as version_domain
+
+from ..models import dictionary_version as dictionary_version_model
+from .base import CRUDBase
+
+
+class CRUDDictionaryVersion(
+    CRUDBase[
+        dictionary_version_model.DictionaryVersion,
+        version_domain.DictionaryVersion,
+        version_domain.DictionaryVersion,
+    ]
+):
+    async def get_current(self, db: AsyncSession) -> int:
+        """
+        Returns the current dictionary version, 0 if there's none.
+        """
+        result = await db.execute(
+            select(func.coalesce(func.max(dictionary_version_model.DictionaryVersion.version), 0))
+        )
+        return result.scalar_one()
+
+    async def bump(self, db: AsyncSession) -> int:
+        """
+        Adds a new dictionary version and returns it. It isn't committed so that it
+        can be part of the import's transaction.
+        """
+        version = await self.get_current(db) + 1
+        db.add(dictionary_version_model.DictionaryVersion(version=version))
+        await db.flush()
+        return version
+
+
+dictionary_version_crud = CRUDDictionaryVersion(dictionary_version_model.DictionaryVersion)
@@ -1,26 +1,153 @@
-from typing import Sequence
+from typing import AsyncIterator, Collection, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Float, String, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.base import ExecutableOption
 
+from app.core.pinyin import NormalisedPinyin
 from app.domain.vocabulary import word as word_domain
 
+from ..models import character as character_model
 from ..models import word as word_model
+from ..models.combined import word_character_association_table
 from .base import CRUDBase
 
 
 class CRUDWord(CRUDBase[word_model.Word, word_domain.WordSchema, word_domain.WordSchema]):
+    def _word_options(self, fields: Collection[str] | None) -> list[ExecutableOption]:
+        options = self._load_only(fields)
+        if fields is None or "characters" in fields:
+            options.append(selectinload(word_model.Word.characters))
+        return options
+
     async def get_multiple_simplified(
-        self, db: AsyncSession, *, simplified_words: list[word_domain.SimplifiedWord]
+        self,
+        db: AsyncSession,
+        *,
+        simplified_words: list[word_domain.SimplifiedWord],
+        fields: Collection[str] | None = None,
     ) -> Sequence[word_model.Word]:
+        """
+        Returns the words of `simplified_words`. With `fields` only those columns (and the
+        characters if they are one of them) are loaded.
+        """
         statement = (
             select(word_model.Word)
             .where(word_model.Word.simplified.in_(simplified_words))
+            .options(*self._word_options(fields))
+        )
+        result = await db.execute(statement)
+        return result.scalars().all()
+
+    async def stream_multiple_simplified(
+        self,
+        db: AsyncSession,
+        *,
+        simplified_words: list[word_domain.SimplifiedWord],
+        batch_size: int = 500,
+        fields: Collection[str] | None = None,
+    ) -> AsyncIterator[tuple[int, str, word_model.Word | None]]:
+        """
+        Yields (position, simplified, word) for every word of `simplified_words`, in their order,
+        with None as the word when there isn't one. The list is sent as a single array parameter
+        (unnested with its positions) so the statement is the same whatever its length. `fields`
+        works like in `get_multiple_simplified`.
+        """
+        lookup = (
+            func.unnest(literal(simplified_words, type_=ARRAY(String)))
+            .table_valued("simplified", with_ordinality="position")
+            .render_derived()
+        )
+        statement = (
+            select(lookup.c.position, lookup.c.simplified, word_model.Word)
+            .outerjoin(word_model.Word, word_model.Word.simplified == lookup.c.simplified)
+            .order_by(lookup.c.position, word_model.Word.id)
+            .options(*self._word_options(fields))
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream(statement)
+        async for position, simplified, word in result.tuples():
+            yield position, simplified, word
+
+    async def get_character_words(
+        self, db: AsyncSession, *, character: str, limit: int, cursor: str | None = None
+    ) -> tuple[Sequence[word_model.Word], str | None]:
+        """
+        Returns a page of the words `character` appears in, most frequent first, and the
+        cursor of the next page.
+        """
+        links = word_character_association_table.c
+        character_word_ids = (
+            select(links.word_id)
+            .join(character_model.Character, character_model.Character.id == links.character_id)
+            .where(character_model.Character.character == character)
+        )
+        return await self.get_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            sort_key="frequency",
+            descending=True,
+            where=[word_model.Word.id.in_(character_word_ids)],
+            options=[selectinload(word_model.Word.characters)],
+        )
+
+    async def search_pinyin(
+        self, db: AsyncSession, *, pinyin: NormalisedPinyin, mode: word_domain.PinyinSearchMode, limit: int
+    ) -> Sequence[word_model.Word]:
+        def matches(column: ColumnElement[str], value: str) -> ColumnElement[bool]:
+            # the normalised pinyin only contains letters and tone numbers so nothing needs escaping
+            match mode:
+                case "exact":
+                    return column == value
+                case "prefix":
+                    return column.like(f"{value}%")
+                case "partial":
+                    return column.like(f"%{value}%")
+
+        # the toneless condition is the one served by the indexes, the tones then filter those rows
+        conditions = [matches(func.lower(word_model.Word.pinyin_no_spaces), pinyin.toneless)]
+        if pinyin.tone_numbers is not None:
+            conditions.append(
+                matches(func.replace(func.lower(word_model.Word.pinyin_num), " ", ""), pinyin.tone_numbers)
+            )
+        if pinyin.tone_marks is not None:
+            conditions.append(
+                matches(func.replace(func.lower(word_model.Word.pinyin_accent), " ", ""), pinyin.tone_marks)
+            )
+        statement = (
+            select(word_model.Word)
+            .where(*conditions)
+            .order_by(word_model.Word.frequency.desc(), word_model.Word.id)
+            .limit(limit)
             .options(selectinload(word_model.Word.characters))
         )
         result = await db.execute(statement)
         return result.scalars().all()
 
+    async def search_definitions(
+        self, db: AsyncSession, *, query: str, limit: int, cursor: str | None = None
+    ) -> tuple[Sequence[word_model.Word], str | None]:
+        """
+        Returns a page of the full-text search on the english definitions, and the cursor of
+        the next page. Rows are ranked by ts_rank weighted by the (log) frequency of the word.
+        """
+        ts_query = func.websearch_to_tsquery(literal("english", type_=REGCONFIG), query)
+        score = (
+            func.ts_rank(word_model.Word.definitions_tsv, ts_query, type_=Float)
+            * func.ln(word_model.Word.frequency + 1, type_=Float)
+        ).label("score")
+        return await self.get_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            sort_key=score,
+            descending=True,
+            where=[word_model.Word.definitions_tsv.bool_op("@@")(ts_query)],
+            options=[selectinload(word_model.Word.characters)],
+        )
+
 
 word_crud = CRUDWord(word_model.Word)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, MetaData
+from sqlalchemy import Computed, Integer, MetaData
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -21,3 +21,12 @@ class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
     metadata = custom_metadata
+
+
+def content_hash(*columns: str) -> Computed:
+    """
+    Returns a generated column holding the md5 of `columns`, which the incremental
+    dictionary import compares to tell which rows changed.
+    """
+    values = " || chr(31) || ".join(f"coalesce({column}::text, '')" for column in columns)
+    return Computed(f"md5({values})", persisted=True)
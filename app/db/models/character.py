@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING, Optional
 from sqlalchemy import JSON, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import Base, content_hash
 
 from .combined import word_character_association_table
 
@@ -12,8 +12,7 @@ if TYPE_CHECKING:
 
 
 class Character(Base):
-    # TODO: this one sohuld probably have a unique thing on it
-    character: Mapped[str] = mapped_column(String(1))
+    character: Mapped[str] = mapped_column(String(1), unique=True, index=True)
     definition: Mapped[Optional[str]] = mapped_column(String(150), nullable=True)
     pinyin: Mapped[str] = mapped_column(String(50))
     decomposition: Mapped[Optional[str]] = mapped_column(String(15), nullable=True)
@@ -21,6 +20,14 @@ class Character(Base):
     radical: Mapped[str] = mapped_column(String(1))
     matches: Mapped[str] = mapped_column(String(300))
     frequency: Mapped[int]
+    # generated by postgres, only read by the incremental import
+    content_hash: Mapped[str] = mapped_column(
+        String(32),
+        content_hash(
+            "character", "definition", "pinyin", "decomposition", "etymology", "radical", "matches", "frequency"
+        ),
+        deferred=True,
+    )
     words: Mapped[set["Word"]] = relationship(secondary=word_character_association_table, back_populates="characters")
 
     def __repr__(self) -> str:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 
 from app.db.models.base import Base
 
@@ -7,4 +7,6 @@ word_character_association_table = Table(
     Base.metadata,
     Column[int]("word_id", ForeignKey("words.id"), primary_key=True),
     Column[int]("character_id", ForeignKey("characters.id"), primary_key=True),
+    # the primary key serves word -> characters, this one serves character -> words (index only)
+    Index("ix_word_characters_character_id", "character_id", "word_id"),
 )
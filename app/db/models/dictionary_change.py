@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+
+from app.db.models.base import Base
+
+
+class DictionaryChange(Base):
+    @declared_attr.directive
+    def __tablename__(cls) -> str:
+        return "dictionary_changes"
+
+    # one row per word or character changed by an incremental import, one "reload" row
+    # (without an entity) for a full import after which everything must be fetched again
+    version: Mapped[int] = mapped_column(index=True)
+    # "word", "character" or "dictionary"
+    entity: Mapped[str] = mapped_column(String(10))
+    entity_id: Mapped[int | None]
+    # the simplified word or the character
+    key: Mapped[str | None] = mapped_column(String(50))
+    # "insert", "update", "delete" or "reload"
+    action: Mapped[str] = mapped_column(String(6))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<DictionaryChange({self.version}, {self.action} {self.entity} '{self.key}')>"
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, func
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+
+from app.db.models.base import Base
+
+
+class DictionaryVersion(Base):
+    @declared_attr.directive
+    def __tablename__(cls) -> str:
+        return "dictionary_versions"
+
+    # one row per import, the current version being the highest
+    version: Mapped[int] = mapped_column(unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<DictionaryVersion({self.version}, created_at='{self.created_at}')>"
@@ -1,9 +1,10 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String
+from sqlalchemy import Computed, Index, String, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import Base, content_hash
 
 from .combined import word_character_association_table
 
@@ -12,8 +13,8 @@ if TYPE_CHECKING:
 
 
 class Word(Base):
-    simplified: Mapped[str] = mapped_column(String(50))
-    traditional: Mapped[str] = mapped_column(String(50))
+    simplified: Mapped[str] = mapped_column(String(50), index=True)
+    traditional: Mapped[str] = mapped_column(String(50), index=True)
     pinyin_num: Mapped[str] = mapped_column(String(150))  # at least 104
     pinyin_accent: Mapped[str] = mapped_column(String(100))
     pinyin_clean: Mapped[str] = mapped_column(String(100))
@@ -22,10 +23,48 @@ class Word(Base):
     also_pronounced: Mapped[str] = mapped_column(String(75))
     classifiers: Mapped[str] = mapped_column(String(25))
     definitions: Mapped[str] = mapped_column(String(500))
-    frequency: Mapped[int]
+    frequency: Mapped[int] = mapped_column(index=True)
+    # generated by postgres for the english full-text search, never loaded unless asked for
+    definitions_tsv: Mapped[str] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', definitions)", persisted=True), deferred=True
+    )
+    # generated by postgres, only read by the incremental import
+    content_hash: Mapped[str] = mapped_column(
+        String(32),
+        content_hash(
+            "simplified",
+            "traditional",
+            "pinyin_num",
+            "pinyin_accent",
+            "pinyin_clean",
+            "pinyin_no_spaces",
+            "also_written",
+            "also_pronounced",
+            "classifiers",
+            "definitions",
+            "frequency",
+        ),
+        deferred=True,
+    )
     characters: Mapped[set["Character"]] = relationship(
         secondary=word_character_association_table, back_populates="words"
     )
 
     def __repr__(self) -> str:
         return f"<Word(simplified='{self.simplified}', pinyin='{self.pinyin_accent}')>"
+
+
+Index("ix_words_definitions_tsv", Word.definitions_tsv, postgresql_using="gin")
+# lower(pinyin_no_spaces) is what the pinyin search compares against: text_pattern_ops
+# serves the exact and prefix searches while the trigram index serves the partial ones
+Index(
+    "ix_words_pinyin_no_spaces_lower",
+    func.lower(Word.pinyin_no_spaces).label("pinyin_no_spaces_lower"),
+    postgresql_ops={"pinyin_no_spaces_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_words_pinyin_no_spaces_trgm",
+    func.lower(Word.pinyin_no_spaces).label("pinyin_no_spaces_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"pinyin_no_spaces_lower": "gin_trgm_ops"},
+)
@@ -0,0 +1,65 @@
+"""
+This module contains the instrumentation of the database pool: how many
+connections are checked out, in the overflow or idle, and how long a checkout
+waited for a connection when they were all in use.
+"""
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from app.core.metrics import Histogram, MetricsRegistry
+
+# in seconds, a checkout usually doesn't wait at all
+CHECKOUT_WAIT_BUCKETS: tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    The default pool of async engines, timing its checkouts once `checkout_wait` is set.
+    """
+
+    checkout_wait: Histogram | None = None
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.checkout_wait is not None:
+                self.checkout_wait.observe(value=time.perf_counter() - start)
+
+
+def instrument_pool(engine: AsyncEngine, registry: MetricsRegistry) -> None:
+    """
+    Exposes the state of `engine`'s pool in `registry`. Its checkouts are only timed
+    if the engine was created with `poolclass=InstrumentedAsyncPool`.
+    """
+    pool = engine.sync_engine.pool
+    size = registry.gauge("cnlearn_db_pool_size", "Connections the pool keeps open.")
+    checked_out = registry.gauge("cnlearn_db_pool_checked_out", "Connections in use.")
+    checked_in = registry.gauge("cnlearn_db_pool_checked_in", "Idle connections in the pool.")
+    overflow = registry.gauge("cnlearn_db_pool_overflow", "Connections opened beyond the pool size.")
+    checkouts = registry.counter("cnlearn_db_pool_checkouts_total", "Connections taken from the pool.")
+    if isinstance(pool, InstrumentedAsyncPool):
+        pool.checkout_wait = registry.histogram(
+            "cnlearn_db_pool_checkout_wait_seconds",
+            "Time spent waiting for a connection from the pool.",
+            buckets=CHECKOUT_WAIT_BUCKETS,
+        )
+
+    @event.listens_for(pool, "checkout")
+    def count_checkout(*_: object) -> None:
+        checkouts.inc()
+
+    def collect() -> None:
+        if isinstance(pool, QueuePool):
+            size.set(value=pool.size())
+            checked_in.set(value=pool.checkedin())
+            # negative while there is room left in the pool itself
+            overflow.set(value=max(pool.overflow(), 0))
+            checked_out.set(value=pool.checkedout())
+
+    registry.add_collector("db_pool", collect)
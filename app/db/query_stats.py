@@ -0,0 +1,81 @@
+"""
+This module contains the accounting of the SQL statements run while answering a
+request: how many, how long they took altogether and which one was the slowest.
+The engine's cursor events add every statement to the QueryStats of the current
+request, kept in a context variable, so that the access log can report them and
+point out requests that run the same statement over and over, which is what an
+N+1 pattern (one query, then one more for each of its rows) looks like.
+"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# where the start times of the statements being run are kept in the connection's info
+_START_TIMES: str = "query_start_times"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    # seconds
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: str | None = None
+    # statement -> number of times it was run
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if self.slowest_statement is None or duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Returns the statements run more than `threshold` times, with how many times, most repeated first.
+        """
+        return [(statement, count) for statement, count in self.statements.most_common() if count > threshold]
+
+
+# set by the access log for each request, statements run outside of one aren't accounted
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def _finish(conn: Connection, statement: str) -> None:
+    start_times: list[float] = conn.info.get(_START_TIMES, [])
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+def track_queries(engine: AsyncEngine) -> None:
+    """
+    Adds every statement `engine` runs to the QueryStats in `current_query_stats`, if any.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start(conn: Connection, cursor: Any, statement: str, *_: Any) -> None:
+        conn.info.setdefault(_START_TIMES, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def finish(conn: Connection, cursor: Any, statement: str, *_: Any) -> None:
+        _finish(conn, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def finish_failed(context: ExceptionContext) -> None:
+        # failed statements took time too, and their start time mustn't be left behind
+        if context.connection is not None and context.statement is not None:
+            _finish(context.connection, context.statement)
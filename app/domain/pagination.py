@@ -0,0 +1,11 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+ItemType = TypeVar("ItemType")
+
+
+class Page(BaseModel, Generic[ItemType]):
+    items: list[ItemType]
+    # pass this as the cursor to get the next page, None when this is the last page
+    next_cursor: str | None = None
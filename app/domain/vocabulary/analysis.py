@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+
+from .common import Frequency
+from .word import SimplifiedWord
+
+
+class Coverage(BaseModel):
+    # percentage of the text's tokens
+    percentile: int
+    # how many of the most frequent words one needs to know to understand that much of the text,
+    # None when too many of its tokens aren't in the dictionary
+    rank: int | None
+
+
+class FrequencyBand(BaseModel):
+    min_rank: int
+    # None for the last band
+    max_rank: int | None
+    tokens: int
+    # of all the tokens, the unknown ones not being in any band
+    share: float
+
+
+class RareToken(BaseModel):
+    token: SimplifiedWord
+    frequency: Frequency
+    rank: int
+    occurrences: int
+
+
+class TextAnalysis(BaseModel):
+    tokens: int
+    unique_tokens: int
+    unknown_tokens: int
+    coverage: list[Coverage]
+    frequency_bands: list[FrequencyBand]
+    rarest: list[RareToken]
+    not_found: list[SimplifiedWord]
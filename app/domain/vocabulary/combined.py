@@ -14,8 +14,43 @@ class CharacterOut(CharacterSchema):
     id: int
 
     words: list[WordSchema] | None = Field(default=[])
+    # set when only some of the words were returned, to get the others from /character-words
+    next_words_cursor: str | None = None
 
 
 class DictionarySearchResult(BaseModel):
     words: list[WordSchema]
     not_found: list[SimplifiedWord]
+
+
+class BulkLookupResult(BaseModel):
+    # position of the word in the request
+    position: int
+    simplified: SimplifiedWord
+    # empty when the word isn't in the dictionary
+    words: list[WordOut]
+
+
+class SentenceSearchResult(DictionarySearchResult):
+    # position of the sentence in the text
+    index: int
+    sentence: str
+
+
+class SentenceSearchError(BaseModel):
+    index: int
+    sentence: str
+    error: str
+
+
+class PhraseSearchResult(BaseModel):
+    # positions in BatchDictionarySearchResult.words
+    words: list[int]
+    not_found: list[SimplifiedWord]
+
+
+class BatchDictionarySearchResult(BaseModel):
+    # every word found in the batch, once
+    words: list[WordOut]
+    # one per phrase, in the order they were sent
+    phrases: list[PhraseSearchResult]
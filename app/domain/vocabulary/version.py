@@ -0,0 +1,20 @@
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
+
+
+class DictionaryVersion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    version: int
+
+
+class DictionaryChange(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    version: int
+    entity: Literal["word", "character", "dictionary"]
+    entity_id: int | None
+    # the simplified word or the character
+    key: str | None
+    action: Literal["insert", "update", "delete", "reload"]
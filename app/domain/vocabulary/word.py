@@ -1,4 +1,4 @@
-from typing import NewType
+from typing import Literal, NewType
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -18,6 +18,8 @@ AlsoWritten = NewType("AlsoWritten", str)
 AlsoPronounced = NewType("AlsoPronounced", str)
 Classifiers = NewType("Classifiers", str)
 
+PinyinSearchMode = Literal["exact", "prefix", "partial"]
+
 
 class WordSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -33,3 +35,11 @@ class WordSchema(BaseModel):
     classifiers: Classifiers = Field(min_length=0, max_length=25)
     definitions: Definition = Field(min_length=0, max_length=500)
     frequency: Frequency = Field(gt=0)
+
+
+class WordSuggestion(BaseModel):
+    id: int
+    simplified: SimplifiedWord
+    traditional: TraditionalWord
+    pinyin_accent: PinyinToneMarks
+    frequency: Frequency
@@ -9,7 +9,7 @@ from app.domain.auth import token as token_domain
 from app.domain.auth import user as user_domain
 
 
-async def get_current_user(db: AsyncSession, token: str) -> user_domain.User:
+def get_token_payload(token: str) -> token_domain.TokenPayload:
     try:
         payload = security.decode_access_token(token)
     except (JWTError, ExpiredSignatureError):
@@ -24,6 +24,10 @@ async def get_current_user(db: AsyncSession, token: str) -> user_domain.User:
             status_code=status.HTTP_403_FORBIDDEN,
             message="Could not validate credentials",
         )
+    return token_data
+
+
+async def get_token_user(db: AsyncSession, token_data: token_domain.TokenPayload) -> user_domain.User:
     possible_user = await user.user_crud.get(db, id=token_data.sub)
     if not possible_user:
         raise exceptions.CNLearnWithMessage(status_code=404, message="User not found")
@@ -32,3 +36,7 @@ async def get_current_user(db: AsyncSession, token: str) -> user_domain.User:
     except ValidationError:
         raise exceptions.CNLearnWithMessage(status_code=500, message="Problem with current user")
     return user_schema
+
+
+async def get_current_user(db: AsyncSession, token: str) -> user_domain.User:
+    return await get_token_user(db, get_token_payload(token))
@@ -0,0 +1,129 @@
+"""
+This module contains the in-process prefix index used to autocomplete what is
+typed in the search box, be it hanzi (simplified or traditional) or pinyin
+without tones. It is built once in the lifespan and never touches the database
+afterwards.
+"""
+
+import asyncio
+import heapq
+import itertools
+from bisect import bisect_left
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.pinyin import normalise_pinyin
+from app.db.models import word as word_model
+from app.domain.vocabulary import common as common_domain
+from app.domain.vocabulary import word as word_domain
+
+# (id, simplified, traditional, pinyin_no_spaces, pinyin_accent, frequency)
+AutocompleteEntry = tuple[int, str, str, str, str, int]
+
+# the last code point sorts after anything that can follow a prefix
+_MAX_CHARACTER = "\U0010ffff"
+
+
+class AutocompleteIndex:
+    """
+    Every key (simplified, traditional and lowercase pinyin_no_spaces) is kept in a sorted
+    list, next to the word it belongs to. A prefix matches a contiguous range of that list
+    which bisect finds in O(log n). Prefixes that match more than `scan_limit` keys have
+    their top K words, by frequency, precomputed so that no lookup has to go through
+    more than `scan_limit` keys.
+    """
+
+    __slots__ = ("_words", "_keys", "_key_words", "_top_words", "top_k", "scan_limit")
+
+    def __init__(self, entries: Iterable[AutocompleteEntry], *, top_k: int = 10, scan_limit: int = 64) -> None:
+        self.top_k = top_k
+        self.scan_limit = scan_limit
+        self._words: list[tuple[int, str, str, str, int]] = []
+        keyed: list[tuple[str, int]] = []
+        for word_id, simplified, traditional, pinyin_no_spaces, pinyin_accent, frequency in entries:
+            position = len(self._words)
+            self._words.append((word_id, simplified, traditional, pinyin_accent, frequency))
+            for key in {simplified, traditional, pinyin_no_spaces.lower()}:
+                keyed.append((key, position))
+        keyed.sort()
+        self._keys: list[str] = [key for key, _ in keyed]
+        self._key_words: list[int] = [position for _, position in keyed]
+        self._top_words: dict[str, tuple[int, ...]] = {}
+        self._precompute("", 0, len(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def n_precomputed_prefixes(self) -> int:
+        return len(self._top_words)
+
+    def _rank(self, start: int, end: int) -> tuple[int, ...]:
+        # a word has at most three keys so 3K keys always hold K distinct words (when there are K)
+        best_keys = heapq.nlargest(
+            3 * self.top_k, range(start, end), key=lambda index: self._words[self._key_words[index]][4]
+        )
+        return tuple(dict.fromkeys(self._key_words[index] for index in best_keys))[: self.top_k]
+
+    def _precompute(self, prefix: str, start: int, end: int) -> None:
+        # keys[start:end] all start with prefix and there are too many of them to scan
+        if prefix:
+            self._top_words[prefix] = self._rank(start, end)
+        length = len(prefix) + 1
+        # the key equal to the prefix itself sorts first and doesn't match any longer prefix
+        while start < end and len(self._keys[start]) < length:
+            start += 1
+        for longer_prefix, group in itertools.groupby(range(start, end), key=lambda index: self._keys[index][:length]):
+            indexes = list(group)
+            if len(indexes) > self.scan_limit:
+                self._precompute(longer_prefix, indexes[0], indexes[-1] + 1)
+
+    def _lookup(self, prefix: str) -> tuple[int, ...]:
+        if prefix in self._top_words:
+            return self._top_words[prefix]
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + _MAX_CHARACTER, lo=start)
+        return self._rank(start, end)
+
+    def suggest(self, prefix: str, limit: int | None = None) -> list[word_domain.WordSuggestion]:
+        """
+        Returns the most frequent words starting with `prefix`. Pinyin can be typed with
+        tones and spaces, they are ignored.
+        """
+        normalised_pinyin = normalise_pinyin(prefix)
+        key = normalised_pinyin.toneless if normalised_pinyin is not None else prefix.strip()
+        if not key:
+            return []
+        positions = self._lookup(key)[: limit or self.top_k]
+        suggestions: list[word_domain.WordSuggestion] = []
+        for position in positions:
+            word_id, simplified, traditional, pinyin_accent, frequency = self._words[position]
+            suggestions.append(
+                word_domain.WordSuggestion.model_construct(
+                    id=word_id,
+                    simplified=word_domain.SimplifiedWord(word_domain.Word(simplified)),
+                    traditional=word_domain.TraditionalWord(word_domain.Word(traditional)),
+                    pinyin_accent=common_domain.PinyinToneMarks(pinyin_accent),
+                    frequency=common_domain.Frequency(frequency),
+                )
+            )
+        return suggestions
+
+
+async def build_autocomplete_index(
+    async_session_maker: async_sessionmaker[AsyncSession], *, top_k: int, scan_limit: int
+) -> AutocompleteIndex:
+    statement = select(
+        word_model.Word.id,
+        word_model.Word.simplified,
+        word_model.Word.traditional,
+        word_model.Word.pinyin_no_spaces,
+        word_model.Word.pinyin_accent,
+        word_model.Word.frequency,
+    )
+    async with async_session_maker() as db:
+        entries = (await db.execute(statement)).tuples().all()
+    # building it takes a while, the event loop keeps serving requests meanwhile
+    return await asyncio.to_thread(AutocompleteIndex, entries, top_k=top_k, scan_limit=scan_limit)
@@ -0,0 +1,149 @@
+"""
+This module contains the cache of serialised vocabulary responses. Most of the
+traffic is for the same few thousand words and phrases so their responses are
+kept, as the JSON bytes that get sent, in a bounded LRU cache whose entries
+also expire after a while. Empty results (everything not found) are cached
+like any other. Clearing the cache starts a new generation, a response computed
+during an older one isn't cached since it may be made of the old dictionary.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Collection, Hashable, Iterable
+
+from app.core.metrics import MetricsRegistry
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # entries dropped to make room
+    evictions: int = 0
+    # entries dropped because they were too old
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        **Parameters**
+        * `max_entries`: number of responses kept
+        * `max_bytes`: total size of the responses kept
+        * `ttl`: seconds after which a response is dropped
+        * `clock`: where the time comes from, for the tests
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        # bumped by clear
+        self.generation: int = 0
+        self._clock = clock
+        # key -> (expiry time, content), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _remove(self, key: Hashable) -> None:
+        _, content = self._entries.pop(key)
+        self._size -= len(content)
+
+    def get(self, key: Hashable) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, content = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return content
+
+    def set(self, key: Hashable, content: bytes, generation: int | None = None) -> None:
+        """
+        Caches `content` under `key`, unless it is too big or was computed during
+        `generation` and the cache was cleared since.
+        """
+        if len(content) > self.max_bytes or (generation is not None and generation != self.generation):
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + self.ttl, content)
+        self._size += len(content)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drops every response, to be called whenever the dictionary changes.
+        """
+        self._entries.clear()
+        self._size = 0
+        self.generation += 1
+        self.stats.invalidations += 1
+
+
+def instrument_response_cache(cache: ResponseCache, registry: MetricsRegistry) -> None:
+    """
+    Exposes `cache`'s stats, and how much it holds, in `registry`.
+    """
+    hits = registry.counter("cnlearn_response_cache_hits_total", "Responses served from the response cache.")
+    misses = registry.counter("cnlearn_response_cache_misses_total", "Responses not found in the response cache.")
+    evictions = registry.counter(
+        "cnlearn_response_cache_evictions_total", "Responses dropped from the response cache to make room."
+    )
+    expirations = registry.counter(
+        "cnlearn_response_cache_expirations_total", "Responses dropped from the response cache because they expired."
+    )
+    invalidations = registry.counter(
+        "cnlearn_response_cache_invalidations_total", "Times the response cache was cleared by a dictionary change."
+    )
+    entries = registry.gauge("cnlearn_response_cache_entries", "Responses in the response cache.")
+    size = registry.gauge("cnlearn_response_cache_bytes", "Total size of the responses in the response cache.")
+
+    def collect() -> None:
+        hits.set_total(value=cache.stats.hits)
+        misses.set_total(value=cache.stats.misses)
+        evictions.set_total(value=cache.stats.evictions)
+        expirations.set_total(value=cache.stats.expirations)
+        invalidations.set_total(value=cache.stats.invalidations)
+        entries.set(value=len(cache))
+        size.set(value=cache.size)
+
+    registry.add_collector("response_cache", collect)
+
+
+def _fields_key(fields: Collection[str] | None) -> tuple[str, ...] | None:
+    return None if fields is None else tuple(sorted(fields))
+
+
+def words_key(simplified_words: Iterable[str], fields: Collection[str] | None = None) -> Hashable:
+    # the order and repetitions don't change the result
+    return ("get-words", _fields_key(fields), *sorted(set(simplified_words)))
+
+
+def phrase_key(phrase: str, fields: Collection[str] | None = None) -> Hashable:
+    # phrases can be long, their hash is enough
+    return ("search-phrase", _fields_key(fields), hashlib.sha256(phrase.encode("utf-8")).hexdigest())
@@ -0,0 +1,36 @@
+from typing import Annotated
+
+from fastapi import Query
+
+from app.core import exceptions
+
+from ..serialisation import CHARACTER_OUT_FIELDS, WORD_OUT_FIELDS, WORD_SCHEMA_FIELDS
+
+_FIELDS_DESCRIPTION = "Comma separated fields to return instead of all of them, e.g. simplified,pinyin_accent"
+
+
+def _parse_fields(fields: str | None, allowed: tuple[str, ...]) -> frozenset[str] | None:
+    if fields is None:
+        return None
+    requested = frozenset(field.strip() for field in fields.split(",") if field.strip())
+    if unknown := requested.difference(allowed):
+        raise exceptions.CNLearnWithMessage(status_code=422, message=f"Unknown fields: {', '.join(sorted(unknown))}.")
+    return requested
+
+
+async def word_out_fields(
+    fields: Annotated[str | None, Query(description=_FIELDS_DESCRIPTION)] = None
+) -> frozenset[str] | None:
+    return _parse_fields(fields, WORD_OUT_FIELDS)
+
+
+async def word_schema_fields(
+    fields: Annotated[str | None, Query(description=_FIELDS_DESCRIPTION)] = None
+) -> frozenset[str] | None:
+    return _parse_fields(fields, WORD_SCHEMA_FIELDS)
+
+
+async def character_out_fields(
+    fields: Annotated[str | None, Query(description=_FIELDS_DESCRIPTION)] = None
+) -> frozenset[str] | None:
+    return _parse_fields(fields, CHARACTER_OUT_FIELDS)
@@ -1,38 +1,171 @@
-from typing import Annotated
+from tempfile import SpooledTemporaryFile
+from typing import IO, Annotated, AsyncIterator
 
-import jieba
-from fastapi import Depends, Query, Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Body, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core import exceptions
+from app.domain import pagination as pagination_domain
+from app.domain.vocabulary import analysis as analysis_domain
 from app.domain.vocabulary import combined as combined_domain
 from app.domain.vocabulary import common as common_domain
 from app.domain.vocabulary import word as word_domain
 from app.features.db import get_async_session
+from app.settings.base import app_settings
 
+from ..autocomplete import AutocompleteIndex
+from ..cache import ResponseCache
+from ..frequency import FrequencyTable
 from ..logic import search as search_logic
+from ..segmentation import SegmentationExecutor
+from ..snapshot import DictionarySnapshot
+from . import fields as fields_dependencies
 
 
 async def search_simplified_words(
+    request: Request,
     simplified_words: Annotated[list[word_domain.SimplifiedWord], Query(min_length=1, max_length=10)],
+    fields: Annotated[frozenset[str] | None, Depends(fields_dependencies.word_out_fields)],
     db: AsyncSession = Depends(get_async_session),
-) -> list[combined_domain.WordOut]:
-    return await search_logic.search_simplified_words(simplified_words, db)
+) -> bytes:
+    response_cache: ResponseCache | None = request.state._response_cache
+    # before the snapshot is read, a response made of a snapshot replaced since isn't cached
+    cache_generation = response_cache.generation if response_cache is not None else None
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return await search_logic.search_simplified_words_json(
+        simplified_words, db, dictionary_snapshot, response_cache, fields, cache_generation
+    )
+
+
+async def bulk_lookup_stream(
+    request: Request,
+    simplified_words: Annotated[list[word_domain.SimplifiedWord], Body(embed=True, min_length=1, max_length=10_000)],
+    fields: Annotated[frozenset[str] | None, Depends(fields_dependencies.word_out_fields)],
+) -> AsyncIterator[bytes]:
+    async_session_maker: async_sessionmaker[AsyncSession] = request.state._db
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return search_logic.bulk_lookup_stream(simplified_words, async_session_maker, dictionary_snapshot, fields)
 
 
 async def search_characters(
+    request: Request,
     characters: Annotated[
         list[Annotated[common_domain.Character, Query(min_length=1, max_length=1)]], Query(min_length=1)
     ],
+    fields: Annotated[frozenset[str] | None, Depends(fields_dependencies.character_out_fields)],
     db: AsyncSession = Depends(get_async_session),
     include_words: bool = False,
-) -> list[combined_domain.CharacterOut]:
-    return await search_logic.search_characters(characters, db, include_words)
+    words_limit: Annotated[int | None, Query(ge=1, le=100)] = None,
+) -> bytes:
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return await search_logic.search_characters_json(
+        characters, db, include_words, dictionary_snapshot, words_limit, fields
+    )
+
+
+async def get_character_words(
+    request: Request,
+    character: Annotated[common_domain.Character, Query(min_length=1, max_length=1)],
+    db: AsyncSession = Depends(get_async_session),
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+) -> pagination_domain.Page[combined_domain.WordOut]:
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return await search_logic.get_character_words(character, db, limit, cursor, dictionary_snapshot)
 
 
 async def search_phrase(
     request: Request,
     phrase: Annotated[word_domain.SimplifiedWord, Query(min_length=2)],
+    fields: Annotated[frozenset[str] | None, Depends(fields_dependencies.word_schema_fields)],
+    db: AsyncSession = Depends(get_async_session),
+) -> bytes:
+    response_cache: ResponseCache | None = request.state._response_cache
+    # before the snapshot is read, a response made of a snapshot replaced since isn't cached
+    cache_generation = response_cache.generation if response_cache is not None else None
+    chinese_segmenter: SegmentationExecutor = request.state._chinese_segmenter
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return await search_logic.search_phrase_json(
+        phrase, db, chinese_segmenter, dictionary_snapshot, response_cache, fields, cache_generation
+    )
+
+
+async def search_phrases(
+    request: Request,
+    phrases: Annotated[list[word_domain.SimplifiedWord], Body(embed=True, min_length=1, max_length=500)],
     db: AsyncSession = Depends(get_async_session),
-) -> combined_domain.DictionarySearchResult:
-    chinese_segmenter: jieba = request.state._chinese_segmenter
-    return await search_logic.search_phrase(phrase, db, chinese_segmenter)
+) -> combined_domain.BatchDictionarySearchResult:
+    chinese_segmenter: SegmentationExecutor = request.state._chinese_segmenter
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return await search_logic.search_phrases(phrases, db, chinese_segmenter, dictionary_snapshot)
+
+
+async def _read_chunks(file: IO[bytes], chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    try:
+        while chunk := await run_in_threadpool(file.read, chunk_size):
+            yield chunk
+    finally:
+        file.close()
+
+
+async def search_text_stream(request: Request) -> AsyncIterator[bytes]:
+    # StreamingResponse consumes whatever the client sends while it streams (it's listening for
+    # a disconnect) so the body has to be read first. It's spooled to disk past 1MB, up to
+    # SEARCH_TEXT_MAX_BYTES
+    too_large = exceptions.CNLearnWithMessage(status_code=413, message="The text is too large.")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > app_settings.SEARCH_TEXT_MAX_BYTES:
+        raise too_large
+    body: IO[bytes] = SpooledTemporaryFile(max_size=1024 * 1024)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > app_settings.SEARCH_TEXT_MAX_BYTES:
+            body.close()
+            raise too_large
+        body.write(chunk)
+    body.seek(0)
+    async_session_maker: async_sessionmaker[AsyncSession] = request.state._db
+    chinese_segmenter: SegmentationExecutor = request.state._chinese_segmenter
+    dictionary_snapshot: DictionarySnapshot | None = request.state._dictionary.snapshot
+    return search_logic.search_text_stream(
+        _read_chunks(body), async_session_maker, chinese_segmenter, dictionary_snapshot
+    )
+
+
+async def search_pinyin(
+    pinyin: Annotated[str, Query(min_length=1, max_length=150)],
+    db: AsyncSession = Depends(get_async_session),
+    mode: word_domain.PinyinSearchMode = "prefix",
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> list[combined_domain.WordOut]:
+    return await search_logic.search_pinyin(pinyin, db, mode, limit)
+
+
+async def search_english(
+    query: Annotated[str, Query(min_length=1, max_length=200)],
+    db: AsyncSession = Depends(get_async_session),
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+) -> pagination_domain.Page[combined_domain.WordOut]:
+    return await search_logic.search_english(query, db, limit, cursor)
+
+
+async def autocomplete(
+    request: Request,
+    prefix: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> list[word_domain.WordSuggestion]:
+    autocomplete_index: AutocompleteIndex | None = request.state._dictionary.autocomplete_index
+    return await search_logic.autocomplete(prefix, autocomplete_index, limit)
+
+
+async def analyse_text(
+    request: Request,
+    text: Annotated[str, Body(embed=True, min_length=1, max_length=100_000)],
+    rarest: Annotated[int, Query(ge=0, le=100)] = 10,
+) -> analysis_domain.TextAnalysis:
+    chinese_segmenter: SegmentationExecutor = request.state._chinese_segmenter
+    frequency_table: FrequencyTable | None = request.state._dictionary.frequency_table
+    return await search_logic.analyse_text(text, chinese_segmenter, frequency_table, rarest)
@@ -0,0 +1,20 @@
+from fastapi import HTTPException, Request
+
+from app.settings.base import app_settings
+
+from ..versioning import DictionaryVersionTracker, etag_matches
+
+
+async def dictionary_version_headers(request: Request) -> dict[str, str]:
+    """
+    Returns the ETag and Cache-Control headers of the dictionary response being asked for,
+    or answers 304 when the client already has it. It needs to come before any dependency
+    opening a session so that a 304 doesn't open one.
+    """
+    dictionary_version: DictionaryVersionTracker = request.state._dictionary_version
+    etag = dictionary_version.etag(f"{request.url.path}?{request.url.query}")
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={app_settings.DICTIONARY_CACHE_MAX_AGE}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
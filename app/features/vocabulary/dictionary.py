@@ -0,0 +1,131 @@
+"""
+This module contains the structures built from the dictionary tables (the
+snapshot, the autocomplete index, the frequency table and the segmenter's
+dictionary). They're built when the app starts and again whenever the
+dictionary version changes, before the new version is published, so that the
+responses carrying an ETag of a version are made of the data of at least that
+version. The new structures replace the old ones all at once when they are
+ready, requests being answered meanwhile keep using the old ones.
+"""
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.settings.base import app_settings
+
+from .autocomplete import AutocompleteIndex, build_autocomplete_index
+from .frequency import FrequencyTable, load_frequency_table
+from .segmentation import (
+    SegmentationExecutor,
+    build_segmentation_dictionary,
+    remove_stale_segmentation_files,
+)
+from .snapshot import (
+    DictionarySnapshot,
+    MappedDictionarySnapshot,
+    export_dictionary_snapshot,
+    load_dictionary_snapshot,
+)
+
+logger: structlog.BoundLogger = structlog.get_logger()
+
+
+class LoadedDictionary:
+    def __init__(
+        self, async_session_maker: async_sessionmaker[AsyncSession], chinese_segmenter: SegmentationExecutor
+    ) -> None:
+        """
+        **Parameters**
+        * `async_session_maker`: where the dictionary is read from
+        * `chinese_segmenter`: switched to the new segmentation dictionary on every load, and
+        started by the first one
+        """
+        self.async_session_maker = async_session_maker
+        self.chinese_segmenter = chinese_segmenter
+        self.snapshot: DictionarySnapshot | None = None
+        self.autocomplete_index: AutocompleteIndex | None = None
+        self.frequency_table: FrequencyTable | None = None
+        self._segmenter_started: bool = False
+
+    async def _load_segmentation(self) -> None:
+        if not app_settings.SEGMENTATION_DICTIONARY_FROM_DB:
+            if not self._segmenter_started:
+                await self.chinese_segmenter.start()
+            self._segmenter_started = True
+            return
+        dictionary = await build_segmentation_dictionary(self.async_session_maker, app_settings.SEGMENTATION_CACHE_DIR)
+        # its name contains a hash of its content, an unchanged vocabulary doesn't restart the workers
+        if not self._segmenter_started or dictionary != self.chinese_segmenter.dictionary:
+            await self.chinese_segmenter.reload(dictionary)
+            logger.info("Loaded segmentation dictionary", dictionary=str(dictionary))
+            # the workers have loaded the new one, the others would pile up with every import
+            if dictionary is not None:
+                remove_stale_segmentation_files(app_settings.SEGMENTATION_CACHE_DIR, dictionary)
+        self._segmenter_started = True
+
+    async def _load_snapshot(self) -> DictionarySnapshot | None:
+        if not app_settings.DICTIONARY_SNAPSHOT_ENABLED:
+            return None
+        if app_settings.DICTIONARY_SNAPSHOT_MAPPED:
+            snapshot_file = await export_dictionary_snapshot(
+                self.async_session_maker, app_settings.DICTIONARY_SNAPSHOT_DIR
+            )
+            dictionary_snapshot: DictionarySnapshot = MappedDictionarySnapshot(snapshot_file)
+            logger.info(
+                "Mapped dictionary snapshot",
+                snapshot=str(snapshot_file),
+                words=len(dictionary_snapshot),
+                characters=dictionary_snapshot.n_characters,
+                memory_footprint=dictionary_snapshot.memory_footprint(),
+            )
+            return dictionary_snapshot
+        dictionary_snapshot = await load_dictionary_snapshot(self.async_session_maker)
+        logger.info(
+            "Loaded dictionary snapshot",
+            words=len(dictionary_snapshot),
+            characters=dictionary_snapshot.n_characters,
+            memory_footprint=dictionary_snapshot.memory_footprint(),
+        )
+        return dictionary_snapshot
+
+    async def _load_autocomplete_index(self) -> AutocompleteIndex | None:
+        if not app_settings.AUTOCOMPLETE_ENABLED:
+            return None
+        autocomplete_index = await build_autocomplete_index(
+            self.async_session_maker,
+            top_k=app_settings.AUTOCOMPLETE_TOP_K,
+            scan_limit=app_settings.AUTOCOMPLETE_SCAN_LIMIT,
+        )
+        logger.info(
+            "Built autocomplete index",
+            words=len(autocomplete_index),
+            precomputed_prefixes=autocomplete_index.n_precomputed_prefixes,
+        )
+        return autocomplete_index
+
+    async def _load_frequency_table(self) -> FrequencyTable | None:
+        if not app_settings.TEXT_ANALYSIS_ENABLED:
+            return None
+        frequency_table = await load_frequency_table(self.async_session_maker)
+        logger.info("Loaded frequency table", tokens=len(frequency_table))
+        return frequency_table
+
+    async def load(self) -> None:
+        """
+        Builds the structures from the dictionary tables and replaces the current ones with them.
+        Their rows are read asynchronously and they are built in threads, the requests served
+        meanwhile keep using the current ones.
+        """
+        await self._load_segmentation()
+        dictionary_snapshot = await self._load_snapshot()
+        autocomplete_index = await self._load_autocomplete_index()
+        frequency_table = await self._load_frequency_table()
+        # a mapped snapshot being replaced isn't closed, requests may still be reading it. Its
+        # mapping goes away with the last of them
+        self.snapshot = dictionary_snapshot
+        self.autocomplete_index = autocomplete_index
+        self.frequency_table = frequency_table
+
+    def close(self) -> None:
+        if isinstance(self.snapshot, MappedDictionarySnapshot):
+            self.snapshot.close()
@@ -0,0 +1,135 @@
+"""
+This module contains the frequency table used to tell how hard a text is. The
+words (and characters) are kept in NumPy arrays, sorted so that the tokens of a
+whole text are looked up at once with searchsorted, and the statistics are
+then computed over arrays rather than token by token.
+"""
+
+import asyncio
+import math
+import re
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.domain.vocabulary import analysis as analysis_domain
+from app.domain.vocabulary import common as common_domain
+from app.domain.vocabulary import word as word_domain
+
+# the percentage of a text's tokens we report the needed vocabulary size for
+COVERAGE_PERCENTILES: tuple[int, ...] = (50, 80, 90, 95, 98)
+# upper (inclusive) ranks of the frequency bands, the last band has no upper rank
+RANK_BANDS: tuple[int, ...] = (1000, 2000, 5000, 10000, 20000)
+_HAN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0003134f]")
+
+
+class FrequencyTable:
+    """
+    Maps a token to its frequency and its rank (1 being the most frequent word). Words
+    come from the words table, characters only fill in single characters that aren't words.
+    """
+
+    __slots__ = ("_tokens", "_frequencies", "_ranks")
+
+    def __init__(self, words: Iterable[tuple[str, int]], characters: Iterable[tuple[str, int]] = ()) -> None:
+        frequencies: dict[str, int] = {}
+        for token, frequency in words:
+            # a word with several readings keeps its highest frequency
+            frequencies[token] = max(frequency, frequencies.get(token, 0))
+        n_words = len(frequencies)
+        for token, frequency in characters:
+            frequencies.setdefault(token, frequency)
+        all_frequencies = np.array(list(frequencies.values()), dtype=np.int64)
+        # the ranks are the ones among words, a character gets the rank of a word as frequent as it is
+        ranks = np.empty(len(frequencies), dtype=np.int64)
+        word_order = np.argsort(-all_frequencies[:n_words], kind="stable")
+        ranks[word_order] = np.arange(1, n_words + 1)
+        ranks[n_words:] = np.searchsorted(-all_frequencies[word_order], -all_frequencies[n_words:], side="left") + 1
+        all_tokens = np.array(list(frequencies), dtype=np.str_)
+        # sorted by token for searchsorted
+        sorted_positions = np.argsort(all_tokens)
+        self._tokens: npt.NDArray[np.str_] = all_tokens[sorted_positions]
+        self._frequencies: npt.NDArray[np.int64] = all_frequencies[sorted_positions]
+        self._ranks: npt.NDArray[np.int64] = ranks[sorted_positions]
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def lookup(self, tokens: npt.NDArray[np.str_]) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """
+        Returns the frequencies and ranks of `tokens`, 0 for both when a token isn't in the table.
+        """
+        if not len(self._tokens):
+            return np.zeros(len(tokens), dtype=np.int64), np.zeros(len(tokens), dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._tokens, tokens), len(self._tokens) - 1)
+        found = self._tokens[positions] == tokens
+        return np.where(found, self._frequencies[positions], 0), np.where(found, self._ranks[positions], 0)
+
+    def analyse(self, tokens: Iterable[str], n_rarest: int = 10) -> analysis_domain.TextAnalysis:
+        """
+        Returns the statistics of the Chinese tokens among `tokens`, anything without
+        hanzi (punctuation, latin letters, whitespace) being ignored.
+        """
+        unique_tokens, counts = np.unique(
+            np.array([token for token in tokens if _HAN.search(token)], dtype=np.str_), return_counts=True
+        )
+        frequencies, ranks = self.lookup(unique_tokens)
+        known = ranks > 0
+        n_tokens = int(counts.sum())
+        # the rank of every known token occurrence, sorted, to read the coverage from
+        known_ranks = np.sort(np.repeat(ranks[known], counts[known]))
+        coverage: list[analysis_domain.Coverage] = []
+        for percentile in COVERAGE_PERCENTILES:
+            needed = math.ceil(percentile * n_tokens / 100)
+            # unknown tokens are never covered so some percentiles can't be reached
+            rank = int(known_ranks[needed - 1]) if 0 < needed <= len(known_ranks) else None
+            coverage.append(analysis_domain.Coverage(percentile=percentile, rank=rank))
+        band_counts = np.bincount(
+            np.searchsorted(np.array(RANK_BANDS), known_ranks, side="left"), minlength=len(RANK_BANDS) + 1
+        )
+        bands: list[analysis_domain.FrequencyBand] = []
+        for index, n_band_tokens in enumerate(band_counts.tolist()):
+            bands.append(
+                analysis_domain.FrequencyBand(
+                    min_rank=RANK_BANDS[index - 1] + 1 if index else 1,
+                    max_rank=RANK_BANDS[index] if index < len(RANK_BANDS) else None,
+                    tokens=n_band_tokens,
+                    share=n_band_tokens / n_tokens if n_tokens else 0.0,
+                )
+            )
+        rarest_positions = np.flatnonzero(known)[np.argsort(-ranks[known], kind="stable")[:n_rarest]]
+        rarest = [
+            analysis_domain.RareToken(
+                token=word_domain.SimplifiedWord(word_domain.Word(str(unique_tokens[position]))),
+                frequency=common_domain.Frequency(int(frequencies[position])),
+                rank=int(ranks[position]),
+                occurrences=int(counts[position]),
+            )
+            for position in rarest_positions
+        ]
+        return analysis_domain.TextAnalysis(
+            tokens=n_tokens,
+            unique_tokens=len(unique_tokens),
+            unknown_tokens=int(counts[~known].sum()),
+            coverage=coverage,
+            frequency_bands=bands,
+            rarest=rarest,
+            not_found=[word_domain.SimplifiedWord(word_domain.Word(str(token))) for token in unique_tokens[~known]],
+        )
+
+
+async def load_frequency_table(async_session_maker: async_sessionmaker[AsyncSession]) -> FrequencyTable:
+    async with async_session_maker() as db:
+        words = (await db.execute(select(word_model.Word.simplified, word_model.Word.frequency))).tuples().all()
+        characters = (
+            (await db.execute(select(character_model.Character.character, character_model.Character.frequency)))
+            .tuples()
+            .all()
+        )
+    # building it takes a while, the event loop keeps serving requests meanwhile
+    return await asyncio.to_thread(FrequencyTable, words, characters)
@@ -1,63 +1,225 @@
-import jieba
-from pydantic import RootModel, ValidationError
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import codecs
+from typing import Any, AsyncIterable, AsyncIterator
+
+from pydantic import RootModel, TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core import exceptions
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.pinyin import normalise_pinyin
+from app.core.sentences import split_sentences
 from app.db.crud.character import character_crud
 from app.db.crud.word import word_crud
+from app.domain import pagination as pagination_domain
+from app.domain.vocabulary import analysis as analysis_domain
 from app.domain.vocabulary import combined as combined_domain
 from app.domain.vocabulary import common as common_domain
 from app.domain.vocabulary import word as word_domain
 
+from ..autocomplete import AutocompleteIndex
+from ..cache import ResponseCache, phrase_key, words_key
+from ..frequency import FrequencyTable
+from ..segmentation import SegmentationExecutor
+from ..serialisation import (
+    WORD_SCHEMA_FIELDS,
+    character_out_dict,
+    dumps,
+    word_out_dict,
+    word_schema_dict,
+)
+from ..snapshot import DictionarySnapshot
+
+# the snapshot's models are built without validation, these only serialise them
+_WORDS_ADAPTER = TypeAdapter(list[combined_domain.WordOut])
+_CHARACTERS_ADAPTER = TypeAdapter(list[combined_domain.CharacterOut])
+_SEARCH_RESULT_ADAPTER = TypeAdapter(combined_domain.DictionarySearchResult)
+
+
+def _include_fields(fields: frozenset[str] | None, *always: str) -> dict[str, set[str]] | None:
+    # what the snapshot's models are dumped with for sparse fields, applied to every model of a list
+    return None if fields is None else {"__all__": {*fields, *always}}
+
 
-async def search_simplified_words(
+async def search_simplified_words_json(
     simplified_words: list[word_domain.SimplifiedWord],
     db: AsyncSession,
-) -> list[combined_domain.WordOut]:
-    words = await word_crud.get_multiple_simplified(db, simplified_words=simplified_words)
-    try:
-        word_schemas = RootModel[list[combined_domain.WordOut]].model_validate(words).root
-    except ValidationError:
-        raise exceptions.CNLearnWithMessage(status_code=500, message="There is something wrong with the words.")
-    return word_schemas
+    dictionary_snapshot: DictionarySnapshot | None = None,
+    response_cache: ResponseCache | None = None,
+    fields: frozenset[str] | None = None,
+    cache_generation: int | None = None,
+) -> bytes:
+    """
+    Returns the JSON of the words of `simplified_words`, from the cache when it's there.
+    With `fields` the words only have those fields (and their id). `cache_generation` is
+    the cache's generation from before `dictionary_snapshot` was read, the response
+    isn't cached if the dictionary changed since.
+    """
+    if response_cache is not None and cache_generation is None:
+        cache_generation = response_cache.generation
+    # searched in the key's order so that every query with the same key gets the same response
+    normalised_words = sorted(set(simplified_words))
+    key = words_key(normalised_words, fields)
+    if response_cache is not None and (content := response_cache.get(key)) is not None:
+        return content
+    if dictionary_snapshot is not None:
+        content = _WORDS_ADAPTER.dump_json(
+            dictionary_snapshot.get_multiple_simplified(normalised_words), include=_include_fields(fields, "id")
+        )
+    else:
+        words = await word_crud.get_multiple_simplified(db, simplified_words=normalised_words, fields=fields)
+        content = dumps([word_out_dict(word, fields) for word in words])
+    if response_cache is not None:
+        response_cache.set(key, content, cache_generation)
+    return content
+
+
+async def bulk_lookup_stream(
+    simplified_words: list[word_domain.SimplifiedWord],
+    async_session_maker: async_sessionmaker[AsyncSession],
+    dictionary_snapshot: DictionarySnapshot | None = None,
+    fields: frozenset[str] | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yields one NDJSON record per word of `simplified_words`, in their order, with its entries
+    (only their `fields` and id if given).
+    """
+    if dictionary_snapshot is not None:
+        include = (
+            None if fields is None else {"position": True, "simplified": True, "words": _include_fields(fields, "id")}
+        )
+        for position, simplified_word in enumerate(simplified_words):
+            record = combined_domain.BulkLookupResult(
+                position=position,
+                simplified=simplified_word,
+                words=dictionary_snapshot.get_multiple_simplified([simplified_word]),
+            )
+            yield record.model_dump_json(include=include).encode("utf-8") + b"\n"
+        return
+    # the response outlives the request's dependencies so it needs its own session
+    async with async_session_maker() as db:
+        current: dict[str, Any] | None = None
+        async for position, simplified, word in word_crud.stream_multiple_simplified(
+            db, simplified_words=simplified_words, fields=fields
+        ):
+            # the rows come ordered by position, a word with several entries spanning several rows
+            if current is not None and current["position"] != position - 1:
+                yield dumps(current) + b"\n"
+                current = None
+            if current is None:
+                current = {"position": position - 1, "simplified": simplified, "words": []}
+            if word is not None:
+                current["words"].append(word_out_dict(word, fields))
+        if current is not None:
+            yield dumps(current) + b"\n"
 
 
-async def search_characters(
+async def search_characters_json(
     characters: list[common_domain.Character],
     db: AsyncSession,
     include_words: bool = False,
-) -> list[combined_domain.CharacterOut]:
+    dictionary_snapshot: DictionarySnapshot | None = None,
+    words_limit: int | None = None,
+    fields: frozenset[str] | None = None,
+) -> bytes:
+    """
+    Returns the JSON of `characters`, with their words if `include_words` (only the
+    `words_limit` most frequent ones and a cursor to the others if given), the rows being
+    serialised without validation. With `fields` the characters only have those fields
+    (and their id).
+    """
+    # the words aren't loaded if they aren't returned
+    include_words = include_words and (fields is None or "words" in fields)
+    if dictionary_snapshot is not None:
+        return _CHARACTERS_ADAPTER.dump_json(
+            dictionary_snapshot.get_multiple_characters(
+                characters, include_words=include_words, words_limit=words_limit
+            ),
+            include=_include_fields(fields, "id"),
+        )
     character_objects = await character_crud.get_multiple_characters(
-        db, characters=characters, include_words=include_words
+        db, characters=characters, include_words=include_words and words_limit is None, fields=fields
     )
-    character_schemas: list[combined_domain.CharacterOut] = []
     if not include_words:
-        try:
-            character_schemas = [
-                combined_domain.CharacterOut.model_validate({**character_object.__dict__, "words": set()})
+        return dumps([character_out_dict(character_object, fields=fields) for character_object in character_objects])
+    if words_limit is None:
+        return dumps(
+            [
+                character_out_dict(character_object, character_object.words, fields=fields)
                 for character_object in character_objects
             ]
-        except ValidationError:
-            raise exceptions.CNLearnWithMessage(
-                status_code=500, message="There is something wrong with the characters."
-            )
-    else:
+        )
+    top_words = await character_crud.get_top_words(
+        db, character_ids=[character_object.id for character_object in character_objects], limit=words_limit + 1
+    )
+    character_dicts: list[dict[str, Any]] = []
+    for character_object in character_objects:
+        words = top_words[character_object.id]
+        next_words_cursor: str | None = None
+        if len(words) > words_limit:
+            words = words[:words_limit]
+            next_words_cursor = encode_cursor([words[-1].frequency, words[-1].id])
+        character_dicts.append(character_out_dict(character_object, words, next_words_cursor, fields))
+    return dumps(character_dicts)
+
+
+async def get_character_words(
+    character: common_domain.Character,
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: str | None = None,
+    dictionary_snapshot: DictionarySnapshot | None = None,
+) -> pagination_domain.Page[combined_domain.WordOut]:
+    if dictionary_snapshot is None:
+        words, next_cursor = await word_crud.get_character_words(db, character=character, limit=limit, cursor=cursor)
         try:
-            character_schemas = RootModel[list[combined_domain.CharacterOut]].model_validate(character_objects).root
+            word_schemas = RootModel[list[combined_domain.WordOut]].model_validate(words).root
         except ValidationError:
-            raise exceptions.CNLearnWithMessage(
-                status_code=500, message="There is something wrong with the characters."
-            )
-    return character_schemas
+            raise exceptions.CNLearnWithMessage(status_code=500, message="There is something wrong with the words.")
+        return pagination_domain.Page[combined_domain.WordOut](items=word_schemas, next_cursor=next_cursor)
+    # the snapshot's cursors are the same (frequency, id) as the database's
+    after: tuple[int, int] | None = None
+    if cursor is not None:
+        after_frequency, after_id = decode_cursor(cursor, 2)
+        if not isinstance(after_frequency, int) or not isinstance(after_id, int):
+            raise exceptions.CNLearnWithMessage(status_code=400, message="Invalid cursor.")
+        after = (after_frequency, after_id)
+    # one more word than asked for tells us whether there is a next page
+    word_schemas = dictionary_snapshot.get_character_words(character, limit=limit + 1, after=after)
+    next_cursor = None
+    if len(word_schemas) > limit:
+        word_schemas = word_schemas[:limit]
+        next_cursor = encode_cursor([word_schemas[-1].frequency, word_schemas[-1].id])
+    return pagination_domain.Page[combined_domain.WordOut](items=word_schemas, next_cursor=next_cursor)
+
+
+async def _split_phrase(
+    phrase: word_domain.SimplifiedWord, chinese_segmenter: SegmentationExecutor
+) -> list[word_domain.SimplifiedWord]:
+    return [word_domain.SimplifiedWord(word_domain.Word(token)) for token in await chinese_segmenter.cut(phrase)]
+
+
+def _search_snapshot(
+    split_words: list[word_domain.SimplifiedWord], dictionary_snapshot: DictionarySnapshot
+) -> combined_domain.DictionarySearchResult:
+    snapshot_words = dictionary_snapshot.get_multiple_simplified(split_words)
+    found = set(word.simplified for word in snapshot_words)
+    return combined_domain.DictionarySearchResult(
+        words=snapshot_words,
+        not_found=[word for word in set(split_words).difference(found) if word.strip()],
+    )
 
 
 async def search_phrase(
     phrase: word_domain.SimplifiedWord,
     db: AsyncSession,
-    chinese_segmenter: jieba,
+    chinese_segmenter: SegmentationExecutor,
+    dictionary_snapshot: DictionarySnapshot | None = None,
 ) -> combined_domain.DictionarySearchResult:
     # we first segment the phrase into a list of words
-    split_words: list[word_domain.SimplifiedWord] = list(chinese_segmenter.cut(phrase))
+    split_words = await _split_phrase(phrase, chinese_segmenter)
+    if dictionary_snapshot is not None:
+        return _search_snapshot(split_words, dictionary_snapshot)
     word_results = await word_crud.get_multiple_simplified(
         db,
         simplified_words=list(set(split_words)),
@@ -75,3 +237,183 @@ async def search_phrase(
     except ValidationError:
         raise exceptions.CNLearnWithMessage(status_code=500, message="There is something wrong with the words.")
     return combined_domain.DictionarySearchResult(words=word_schemas, not_found=not_found)
+
+
+async def search_phrase_json(
+    phrase: word_domain.SimplifiedWord,
+    db: AsyncSession,
+    chinese_segmenter: SegmentationExecutor,
+    dictionary_snapshot: DictionarySnapshot | None = None,
+    response_cache: ResponseCache | None = None,
+    fields: frozenset[str] | None = None,
+    cache_generation: int | None = None,
+) -> bytes:
+    """
+    Returns the JSON of `search_phrase`, from the cache when it's there. With `fields`
+    the words only have those fields. As with `search_simplified_words_json`, the
+    response is only cached if the cache is still at `cache_generation`.
+    """
+    if response_cache is not None and cache_generation is None:
+        cache_generation = response_cache.generation
+    key = phrase_key(phrase, fields)
+    if response_cache is not None and (content := response_cache.get(key)) is not None:
+        return content
+    if dictionary_snapshot is not None:
+        content = _SEARCH_RESULT_ADAPTER.dump_json(
+            await search_phrase(phrase, db, chinese_segmenter, dictionary_snapshot),
+            include=None if fields is None else {"words": _include_fields(fields), "not_found": True},
+        )
+    else:
+        split_words = set(await _split_phrase(phrase, chinese_segmenter))
+        columns = WORD_SCHEMA_FIELDS if fields is None else [field for field in WORD_SCHEMA_FIELDS if field in fields]
+        # the simplified words tell which words weren't found
+        word_results = await word_crud.get_multiple_simplified(
+            db, simplified_words=list(split_words), fields={*columns, "simplified"}
+        )
+        found = set(word.simplified for word in word_results)
+        content = dumps(
+            {
+                "words": [word_schema_dict(word, columns) for word in word_results],
+                "not_found": [word for word in split_words.difference(found) if word.strip()],
+            }
+        )
+    if response_cache is not None:
+        response_cache.set(key, content, cache_generation)
+    return content
+
+
+async def search_text_stream(
+    chunks: AsyncIterable[bytes],
+    async_session_maker: async_sessionmaker[AsyncSession],
+    chinese_segmenter: SegmentationExecutor,
+    dictionary_snapshot: DictionarySnapshot | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yields one NDJSON record per sentence of the UTF-8 text made of `chunks`, as soon
+    as that sentence has been searched. Only the current sentence is kept in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def decoded_chunks() -> AsyncIterator[str]:
+        async for chunk in chunks:
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    index = 0
+    async for sentence in split_sentences(decoded_chunks()):
+        record: combined_domain.SentenceSearchResult | combined_domain.SentenceSearchError
+        phrase = word_domain.SimplifiedWord(word_domain.Word(sentence))
+        try:
+            if dictionary_snapshot is not None:
+                result = _search_snapshot(await _split_phrase(phrase, chinese_segmenter), dictionary_snapshot)
+            else:
+                # the response outlives the request's dependencies so each sentence gets its own, short, session
+                async with async_session_maker() as db:
+                    result = await search_phrase(phrase, db, chinese_segmenter)
+            record = combined_domain.SentenceSearchResult(
+                index=index, sentence=sentence, words=result.words, not_found=result.not_found
+            )
+        except exceptions.CNLearnWithMessage as exception:
+            # the status code has already been sent, the client gets the error for this sentence instead
+            record = combined_domain.SentenceSearchError(index=index, sentence=sentence, error=exception.message)
+        yield record.model_dump_json().encode("utf-8") + b"\n"
+        index += 1
+
+
+async def search_phrases(
+    phrases: list[word_domain.SimplifiedWord],
+    db: AsyncSession,
+    chinese_segmenter: SegmentationExecutor,
+    dictionary_snapshot: DictionarySnapshot | None = None,
+) -> combined_domain.BatchDictionarySearchResult:
+    # the long phrases are segmented concurrently by the pool's workers, at most one per worker so
+    # that a big batch neither fills the segmenter's queue nor holds up other requests
+    concurrency = asyncio.Semaphore(max(chinese_segmenter.pool_size, 1))
+
+    async def split_phrase(phrase: word_domain.SimplifiedWord) -> list[word_domain.SimplifiedWord]:
+        async with concurrency:
+            return await _split_phrase(phrase, chinese_segmenter)
+
+    segmented_phrases: list[list[word_domain.SimplifiedWord]] = await asyncio.gather(
+        *(split_phrase(phrase) for phrase in phrases)
+    )
+    # the words of the whole batch are looked up at once, each of them only once
+    unique_words: list[word_domain.SimplifiedWord] = list(
+        dict.fromkeys(token for split_words in segmented_phrases for token in split_words if token.strip())
+    )
+    word_schemas: list[combined_domain.WordOut]
+    if dictionary_snapshot is not None:
+        word_schemas = dictionary_snapshot.get_multiple_simplified(unique_words)
+    else:
+        word_results = await word_crud.get_multiple_simplified(db, simplified_words=unique_words)
+        try:
+            word_schemas = RootModel[list[combined_domain.WordOut]].model_validate(word_results).root
+        except ValidationError:
+            raise exceptions.CNLearnWithMessage(status_code=500, message="There is something wrong with the words.")
+    # a simplified word can have several entries (different readings)
+    positions: dict[str, list[int]] = {}
+    for position, word in enumerate(word_schemas):
+        positions.setdefault(word.simplified, []).append(position)
+    phrase_results: list[combined_domain.PhraseSearchResult] = []
+    for split_words in segmented_phrases:
+        word_positions: list[int] = []
+        not_found: list[word_domain.SimplifiedWord] = []
+        for token in dict.fromkeys(split_words):
+            if token in positions:
+                word_positions.extend(positions[token])
+            elif token.strip():
+                not_found.append(token)
+        phrase_results.append(combined_domain.PhraseSearchResult(words=word_positions, not_found=not_found))
+    return combined_domain.BatchDictionarySearchResult(words=word_schemas, phrases=phrase_results)
+
+
+async def search_pinyin(
+    pinyin: str,
+    db: AsyncSession,
+    mode: word_domain.PinyinSearchMode = "prefix",
+    limit: int = 20,
+) -> list[combined_domain.WordOut]:
+    normalised_pinyin = normalise_pinyin(pinyin)
+    if normalised_pinyin is None:
+        raise exceptions.CNLearnWithMessage(status_code=400, message="This does not look like pinyin.")
+    words = await word_crud.search_pinyin(db, pinyin=normalised_pinyin, mode=mode, limit=limit)
+    try:
+        word_schemas = RootModel[list[combined_domain.WordOut]].model_validate(words).root
+    except ValidationError:
+        raise exceptions.CNLearnWithMessage(status_code=500, message="There is something wrong with the words.")
+    return word_schemas
+
+
+async def search_english(
+    query: str,
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> pagination_domain.Page[combined_domain.WordOut]:
+    words, next_cursor = await word_crud.search_definitions(db, query=query, limit=limit, cursor=cursor)
+    try:
+        word_schemas = RootModel[list[combined_domain.WordOut]].model_validate(words).root
+    except ValidationError:
+        raise exceptions.CNLearnWithMessage(status_code=500, message="There is something wrong with the words.")
+    return pagination_domain.Page[combined_domain.WordOut](items=word_schemas, next_cursor=next_cursor)
+
+
+async def autocomplete(
+    prefix: str,
+    autocomplete_index: AutocompleteIndex | None,
+    limit: int = 10,
+) -> list[word_domain.WordSuggestion]:
+    if autocomplete_index is None:
+        raise exceptions.CNLearnWithMessage(status_code=503, message="Autocomplete is not available.")
+    return autocomplete_index.suggest(prefix, limit)
+
+
+async def analyse_text(
+    text: str,
+    chinese_segmenter: SegmentationExecutor,
+    frequency_table: FrequencyTable | None,
+    n_rarest: int = 10,
+) -> analysis_domain.TextAnalysis:
+    if frequency_table is None:
+        raise exceptions.CNLearnWithMessage(status_code=503, message="Text analysis is not available.")
+    return frequency_table.analyse(await chinese_segmenter.cut(text), n_rarest)
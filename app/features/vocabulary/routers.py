@@ -1,30 +1,151 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 
+from app.domain import pagination as pagination_domain
+from app.domain.vocabulary import analysis as analysis_domain
 from app.domain.vocabulary import combined as combined_domain
+from app.domain.vocabulary import word as word_domain
 
 from .dependencies import search as search_dependencies
+from .dependencies import versioning as versioning_dependencies
 
 router = APIRouter()
 
 
 @router.get("/get-words", response_model=list[combined_domain.WordOut], name="vocabulary:get-words")
 async def get_words(
-    result: Annotated[list[combined_domain.WordOut], Depends(search_dependencies.search_simplified_words)]
-) -> list[combined_domain.WordOut]:
-    return result
+    # first so that a 304 is answered before the search opens a session
+    headers: Annotated[dict[str, str], Depends(versioning_dependencies.dictionary_version_headers)],
+    result: Annotated[bytes, Depends(search_dependencies.search_simplified_words)],
+) -> Response:
+    # already serialised, possibly cached
+    return Response(content=result, media_type="application/json", headers=headers)
+
+
+@router.post("/bulk-lookup", response_class=StreamingResponse, name="vocabulary:bulk-lookup")
+async def bulk_lookup(
+    result: Annotated[AsyncIterator[bytes], Depends(search_dependencies.bulk_lookup_stream)]
+) -> StreamingResponse:
+    """
+    Looks up to 10000 simplified words at once. The response is NDJSON with one record
+    per word sent, in the same order, with its entries (none when it isn't in the dictionary).
+    """
+    return StreamingResponse(result, media_type="application/x-ndjson")
 
 
 @router.get("/get-characters", response_model=list[combined_domain.CharacterOut], name="vocabulary:get-characters")
 async def get_characters(
-    result: Annotated[list[combined_domain.CharacterOut], Depends(search_dependencies.search_characters)]
-) -> list[combined_domain.CharacterOut]:
+    # first so that a 304 is answered before the search opens a session
+    headers: Annotated[dict[str, str], Depends(versioning_dependencies.dictionary_version_headers)],
+    result: Annotated[bytes, Depends(search_dependencies.search_characters)],
+) -> Response:
+    # already serialised
+    return Response(content=result, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/character-words",
+    response_model=pagination_domain.Page[combined_domain.WordOut],
+    name="vocabulary:character-words",
+)
+async def get_character_words(
+    result: Annotated[pagination_domain.Page[combined_domain.WordOut], Depends(search_dependencies.get_character_words)]
+) -> pagination_domain.Page[combined_domain.WordOut]:
+    """
+    Lists the words a character appears in, most frequent first. Pass the `next_words_cursor`
+    of /get-characters (called with `words_limit`), or the returned `next_cursor`, as `cursor`
+    to get the words that follow.
+    """
     return result
 
 
 @router.get("/search-phrase", response_model=combined_domain.DictionarySearchResult, name="vocabulary:search-phrase")
 async def search_phrase(
-    result: Annotated[combined_domain.DictionarySearchResult, Depends(search_dependencies.search_phrase)]
-) -> combined_domain.DictionarySearchResult:
+    # first so that a 304 is answered before the search opens a session
+    headers: Annotated[dict[str, str], Depends(versioning_dependencies.dictionary_version_headers)],
+    result: Annotated[bytes, Depends(search_dependencies.search_phrase)],
+) -> Response:
+    # already serialised, possibly cached
+    return Response(content=result, media_type="application/json", headers=headers)
+
+
+@router.post(
+    "/search-phrases",
+    response_model=combined_domain.BatchDictionarySearchResult,
+    name="vocabulary:search-phrases",
+)
+async def search_phrases(
+    result: Annotated[combined_domain.BatchDictionarySearchResult, Depends(search_dependencies.search_phrases)]
+) -> combined_domain.BatchDictionarySearchResult:
+    """
+    Searches the words of several phrases at once. Every word found is returned once in
+    `words` and each phrase refers to its words by their position in that list.
+    """
+    return result
+
+
+@router.post(
+    "/search-text",
+    response_class=StreamingResponse,
+    name="vocabulary:search-text",
+    openapi_extra={"requestBody": {"required": True, "content": {"text/plain": {"schema": {"type": "string"}}}}},
+)
+async def search_text(
+    result: Annotated[AsyncIterator[bytes], Depends(search_dependencies.search_text_stream)]
+) -> StreamingResponse:
+    """
+    Searches the words of a text of any length, sent as UTF-8 plain text. The response is
+    NDJSON with one record per sentence, sent as soon as that sentence has been searched.
+    """
+    return StreamingResponse(result, media_type="application/x-ndjson")
+
+
+@router.get("/search-pinyin", response_model=list[combined_domain.WordOut], name="vocabulary:search-pinyin")
+async def search_pinyin(
+    result: Annotated[list[combined_domain.WordOut], Depends(search_dependencies.search_pinyin)]
+) -> list[combined_domain.WordOut]:
+    """
+    Searches words by pinyin typed with tone numbers (ni3hao3), tone marks (nǐ hǎo)
+    or without tones (ni hao), ordered by frequency.
+    """
+    return result
+
+
+@router.get(
+    "/search-english",
+    response_model=pagination_domain.Page[combined_domain.WordOut],
+    name="vocabulary:search-english",
+)
+async def search_english(
+    result: Annotated[pagination_domain.Page[combined_domain.WordOut], Depends(search_dependencies.search_english)]
+) -> pagination_domain.Page[combined_domain.WordOut]:
+    """
+    Searches words by their english definitions, ranked by relevance and frequency.
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    return result
+
+
+@router.get("/autocomplete", response_model=list[word_domain.WordSuggestion], name="vocabulary:autocomplete")
+async def autocomplete(
+    result: Annotated[list[word_domain.WordSuggestion], Depends(search_dependencies.autocomplete)]
+) -> list[word_domain.WordSuggestion]:
+    """
+    Suggests the most frequent words starting with the typed hanzi or pinyin.
+    At most AUTOCOMPLETE_TOP_K suggestions are returned.
+    """
+    return result
+
+
+@router.post("/analyse-text", response_model=analysis_domain.TextAnalysis, name="vocabulary:analyse-text")
+async def analyse_text(
+    result: Annotated[analysis_domain.TextAnalysis, Depends(search_dependencies.analyse_text)]
+) -> analysis_domain.TextAnalysis:
+    """
+    Tells how hard a text is: how many of the most frequent words one needs to know to
+    understand a given share of it, how its words spread over frequency bands and its
+    rarest words.
+    """
     return result
@@ -0,0 +1,284 @@
+"""
+This module contains the executor used to segment Chinese text. jieba is pure
+Python and CPU bound so long texts are segmented in a pool of worker processes,
+each of which initialises jieba once when it starts, instead of blocking the
+event loop. Short texts are still segmented inline since sending them to
+another process would cost more than segmenting them.
+
+The segmenter's dictionary can be derived from the words table so that the
+tokens it returns are the words we have. The dictionary and jieba's compiled
+model are cached on disk under names containing a hash of the dictionary so
+that only a changed vocabulary gets compiled again.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import multiprocessing
+import multiprocessing.synchronize
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import jieba
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import exceptions
+from app.core.metrics import Histogram, MetricsRegistry
+from app.db.models import word as word_model
+
+logger: structlog.BoundLogger = structlog.get_logger()
+
+# the tokenizer of a worker process, set by its initializer
+_worker_tokenizer: jieba.Tokenizer = jieba.dt
+_worker_hmm: bool = True
+# seconds a worker waits for the others to have loaded their dictionary
+WORKER_START_TIMEOUT: float = 120.0
+
+
+def _create_tokenizer(dictionary: Path | None) -> jieba.Tokenizer:
+    if dictionary is None:
+        tokenizer = jieba.dt
+    else:
+        tokenizer = jieba.Tokenizer(str(dictionary))
+        # the compiled model sits next to the dictionary, with the same hash in its name
+        tokenizer.tmp_dir = str(dictionary.parent)
+        tokenizer.cache_file = dictionary.with_suffix(".cache").name
+    tokenizer.initialize()
+    return tokenizer
+
+
+def _cut(tokenizer: jieba.Tokenizer, hmm: bool, text: str) -> tuple[list[str], float]:
+    start = time.perf_counter()
+    tokens = list(tokenizer.cut(text, HMM=hmm))
+    return tokens, time.perf_counter() - start
+
+
+def _initialize_worker(dictionary: Path | None, started: multiprocessing.synchronize.Barrier) -> None:
+    global _worker_tokenizer, _worker_hmm
+    # logging isn't configured in the workers, jieba would print its loading messages to stderr
+    jieba.setLogLevel(logging.WARNING)
+    _worker_tokenizer = _create_tokenizer(dictionary)
+    _worker_hmm = dictionary is None
+    # no worker takes a task before every worker has loaded its dictionary, so the warm-up
+    # tasks only finish once none of them is left to pay for it
+    with contextlib.suppress(threading.BrokenBarrierError):
+        started.wait(WORKER_START_TIMEOUT)
+
+
+def _warm_up() -> None:
+    pass
+
+
+def _segment(text: str) -> tuple[list[str], float]:
+    return _cut(_worker_tokenizer, _worker_hmm, text)
+
+
+async def build_segmentation_dictionary(
+    async_session_maker: async_sessionmaker[AsyncSession], cache_dir: Path
+) -> Path | None:
+    """
+    Writes a jieba dictionary made of the simplified words, and their frequencies, in
+    `cache_dir` unless it's already there. Returns its path or None if there are no words.
+    """
+    statement = (
+        select(word_model.Word.simplified, func.max(word_model.Word.frequency))
+        .group_by(word_model.Word.simplified)
+        .order_by(word_model.Word.simplified)
+    )
+    async with async_session_maker() as db:
+        rows = (await db.execute(statement)).tuples().all()
+    # jieba's dictionary format is "word frequency" per line so words can't contain whitespace
+    lines = [
+        f"{simplified} {max(frequency, 1)}\n"
+        for simplified, frequency in rows
+        if not any(c.isspace() for c in simplified)
+    ]
+    if not lines:
+        return None
+    content = "".join(lines).encode("utf-8")
+    dictionary = cache_dir / f"jieba-{hashlib.sha256(content).hexdigest()[:16]}.dict"
+    if not dictionary.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        temporary = dictionary.with_suffix(".tmp")
+        temporary.write_bytes(content)
+        temporary.replace(dictionary)
+    return dictionary
+
+
+def remove_stale_segmentation_files(cache_dir: Path, dictionary: Path) -> None:
+    """
+    Removes the dictionaries written by `build_segmentation_dictionary` in `cache_dir`, and
+    their compiled models, other than `dictionary` and its own.
+    """
+    for path in cache_dir.glob("jieba-*"):
+        if path.stem != dictionary.stem:
+            path.unlink(missing_ok=True)
+
+
+@dataclass
+class SegmentationStats:
+    inline_calls: int = 0
+    pooled_calls: int = 0
+    rejected_calls: int = 0
+    timed_out_calls: int = 0
+    # in seconds
+    total_queue_wait: float = 0.0
+    total_segmentation_time: float = 0.0
+
+
+class SegmentationExecutor:
+    def __init__(
+        self,
+        *,
+        pool_size: int = 0,
+        inline_threshold: int = 200,
+        max_queue: int = 64,
+        timeout: float = 5.0,
+        dictionary: Path | None = None,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        """
+        **Parameters**
+        * `pool_size`: number of worker processes, 0 segments everything inline
+        * `inline_threshold`: texts shorter than this (in characters) are segmented inline
+        * `max_queue`: texts that can be waiting for, or being segmented by, the pool at once
+        * `timeout`: seconds after which a pooled segmentation is given up on
+        * `dictionary`: jieba dictionary to use instead of the bundled one. jieba's HMM, which
+        guesses words that aren't in the dictionary, is turned off with it
+        * `metrics`: where the segmentation times are recorded
+        """
+        self.pool_size = pool_size
+        self.inline_threshold = inline_threshold
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.dictionary = dictionary
+        self._tokenizer: jieba.Tokenizer = jieba.dt
+        self._hmm: bool = dictionary is None
+        self.stats = SegmentationStats()
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: int = 0
+        self._durations: Histogram | None = None
+        self._queue_waits: Histogram | None = None
+        if metrics is not None:
+            self._register_metrics(metrics)
+
+    def _register_metrics(self, metrics: MetricsRegistry) -> None:
+        self._durations = metrics.histogram(
+            "cnlearn_segmentation_duration_seconds", "Time jieba took to segment a text.", ("mode",)
+        )
+        self._queue_waits = metrics.histogram(
+            "cnlearn_segmentation_queue_wait_seconds",
+            "Time a pooled segmentation spent waiting for a worker and sending the text back and forth.",
+        )
+        rejected = metrics.counter("cnlearn_segmentation_rejected_total", "Segmentations refused with a 503.")
+        timed_out = metrics.counter("cnlearn_segmentation_timed_out_total", "Segmentations given up with a 504.")
+
+        def collect() -> None:
+            rejected.set_total(value=self.stats.rejected_calls)
+            timed_out.set_total(value=self.stats.timed_out_calls)
+
+        metrics.add_collector("segmentation", collect)
+
+    async def _start_pool(self, dictionary: Path | None) -> ProcessPoolExecutor | None:
+        if self.pool_size <= 0:
+            return None
+        context = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(
+            max_workers=self.pool_size,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(dictionary, context.Barrier(self.pool_size)),
+        )
+        # workers are started on demand, as many tasks as workers start all of them
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, _warm_up) for _ in range(self.pool_size)))
+        return pool
+
+    async def start(self) -> None:
+        await self.reload(self.dictionary)
+
+    async def reload(self, dictionary: Path | None) -> None:
+        """
+        Switches to `dictionary`. The new tokenizer and workers are ready before they replace the
+        old ones, the segmentations the old workers are running still finish.
+        """
+        # the inline path uses this process' tokenizer. Creating it also compiles the model, if it
+        # isn't cached yet, before the workers start loading it
+        tokenizer = await asyncio.to_thread(_create_tokenizer, dictionary)
+        pool = await self._start_pool(dictionary)
+        old_pool = self._pool
+        self.dictionary = dictionary
+        self._tokenizer = tokenizer
+        self._hmm = dictionary is None
+        self._pool = pool
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _record(self, *, pooled: bool, queue_wait: float, segmentation_time: float, n_characters: int) -> None:
+        if pooled:
+            self.stats.pooled_calls += 1
+        else:
+            self.stats.inline_calls += 1
+        self.stats.total_queue_wait += queue_wait
+        self.stats.total_segmentation_time += segmentation_time
+        if self._durations is not None:
+            self._durations.observe("pooled" if pooled else "inline", value=segmentation_time)
+        if pooled and self._queue_waits is not None:
+            self._queue_waits.observe(value=queue_wait)
+        logger.debug(
+            "Segmented text",
+            pooled=pooled,
+            characters=n_characters,
+            queue_wait=queue_wait,
+            segmentation_time=segmentation_time,
+        )
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop) -> None:
+        # called from the pool's thread
+        def release() -> None:
+            self._pending -= 1
+
+        # the loop may be gone when a job finishes after the app stopped
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(release)
+
+    async def cut(self, text: str) -> list[str]:
+        """
+        Segments `text` into a list of words, like `jieba.cut` does.
+        """
+        if self._pool is None or len(text) < self.inline_threshold:
+            tokens, segmentation_time = _cut(self._tokenizer, self._hmm, text)
+            self._record(pooled=False, queue_wait=0.0, segmentation_time=segmentation_time, n_characters=len(text))
+            return tokens
+        if self._pending >= self.max_queue:
+            self.stats.rejected_calls += 1
+            raise exceptions.CNLearnWithMessage(
+                status_code=503, message="The segmenter is busy at the moment, please try again."
+            )
+        submitted = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        job: Future[tuple[list[str], float]] = self._pool.submit(_segment, text)
+        # the worker keeps segmenting after a timeout, the job only leaves the queue once it's done
+        self._pending += 1
+        job.add_done_callback(lambda _: self._job_done(loop))
+        try:
+            tokens, segmentation_time = await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # the worker still finishes the segmentation, its result is just dropped
+            self.stats.timed_out_calls += 1
+            raise exceptions.CNLearnWithMessage(status_code=504, message="Segmenting this text took too long.")
+        # whatever isn't segmentation is time spent queued for a worker and sending the text back and forth
+        queue_wait = time.perf_counter() - submitted - segmentation_time
+        self._record(pooled=True, queue_wait=queue_wait, segmentation_time=segmentation_time, n_characters=len(text))
+        return tokens
@@ -0,0 +1,82 @@
+"""
+This module turns the ORM rows of the vocabulary tables straight into the
+dictionaries of their response models, which are then serialised once with
+orjson. The rows come from our own tables so, unlike with `model_validate`
+followed by FastAPI's `response_model`, nothing gets validated on the way out.
+The dictionaries have the fields of the response models so that the JSON is
+the same as the one pydantic would produce, or a subset of them when the client
+asked for sparse fields.
+"""
+
+from typing import Any, Collection, Iterable
+
+import orjson
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.domain.vocabulary import character as character_domain
+from app.domain.vocabulary import combined as combined_domain
+from app.domain.vocabulary import word as word_domain
+
+WORD_SCHEMA_FIELDS: tuple[str, ...] = tuple(word_domain.WordSchema.model_fields)
+CHARACTER_SCHEMA_FIELDS: tuple[str, ...] = tuple(character_domain.CharacterSchema.model_fields)
+# what can be asked for with sparse fields, the id is always returned
+WORD_OUT_FIELDS: tuple[str, ...] = tuple(combined_domain.WordOut.model_fields)
+CHARACTER_OUT_FIELDS: tuple[str, ...] = tuple(combined_domain.CharacterOut.model_fields)
+
+
+def word_schema_dict(word: word_model.Word, columns: Iterable[str] = WORD_SCHEMA_FIELDS) -> dict[str, Any]:
+    return {field: getattr(word, field) for field in columns}
+
+
+def character_schema_dict(
+    character: character_model.Character, columns: Iterable[str] = CHARACTER_SCHEMA_FIELDS
+) -> dict[str, Any]:
+    return {field: getattr(character, field) for field in columns}
+
+
+def word_out_dict(word: word_model.Word, fields: Collection[str] | None = None) -> dict[str, Any]:
+    """
+    Returns the WordOut of `word`, or only its `fields` and id. The characters must have
+    been loaded unless they aren't among `fields`.
+    """
+    if fields is None:
+        return {
+            **word_schema_dict(word),
+            "id": word.id,
+            "characters": [character_schema_dict(character) for character in word.characters],
+        }
+    content = word_schema_dict(word, [field for field in WORD_SCHEMA_FIELDS if field in fields])
+    content["id"] = word.id
+    if "characters" in fields:
+        content["characters"] = [character_schema_dict(character) for character in word.characters]
+    return content
+
+
+def character_out_dict(
+    character: character_model.Character,
+    words: Iterable[word_model.Word] = (),
+    next_words_cursor: str | None = None,
+    fields: Collection[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Returns the CharacterOut of `character` with `words`, or only its `fields` and id.
+    """
+    if fields is None:
+        return {
+            **character_schema_dict(character),
+            "id": character.id,
+            "words": [word_schema_dict(word) for word in words],
+            "next_words_cursor": next_words_cursor,
+        }
+    content = character_schema_dict(character, [field for field in CHARACTER_SCHEMA_FIELDS if field in fields])
+    content["id"] = character.id
+    if "words" in fields:
+        content["words"] = [word_schema_dict(word) for word in words]
+    if "next_words_cursor" in fields:
+        content["next_words_cursor"] = next_words_cursor
+    return content
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
@@ -0,0 +1,633 @@
+"""
+This module contains a read-only, in-memory snapshot of the dictionary
+(words, characters and the links between them). The words and characters
+tables only change when the dictionary is re-imported so, when enabled,
+the snapshot is loaded once in the lifespan and the vocabulary endpoints
+can answer lookups without a round trip to the database.
+
+With several workers, the snapshot can instead be exported to a binary file
+that every worker maps read-only: the OS page cache then holds a single copy
+shared by all of them and the entries are only decoded when they are looked up.
+"""
+
+import array
+import asyncio
+import bisect
+import fcntl
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence, overload
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.pagination import encode_cursor
+from app.db.crud.dictionary_version import dictionary_version_crud
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
+from app.domain.vocabulary import character as character_domain
+from app.domain.vocabulary import combined as combined_domain
+from app.domain.vocabulary import common as common_domain
+from app.domain.vocabulary import word as word_domain
+
+# seconds between two attempts at taking the lock of the snapshot files
+LOCK_RETRY_INTERVAL: float = 0.05
+# the order of the columns in the word and character rows we keep
+WORD_FIELDS: tuple[str, ...] = (
+    "simplified",
+    "traditional",
+    "pinyin_num",
+    "pinyin_accent",
+    "pinyin_clean",
+    "pinyin_no_spaces",
+    "also_written",
+    "also_pronounced",
+    "classifiers",
+    "definitions",
+    "frequency",
+)
+CHARACTER_FIELDS: tuple[str, ...] = (
+    "character",
+    "definition",
+    "pinyin",
+    "decomposition",
+    "etymology",
+    "radical",
+    "matches",
+    "frequency",
+)
+
+# position of the frequency in a word row
+_WORD_FREQUENCY: int = 1 + WORD_FIELDS.index("frequency")
+
+WordRow = tuple[Any, ...]
+CharacterRow = tuple[Any, ...]
+
+
+def _intern(value: Any) -> Any:
+    # pinyin syllables, radicals and empty strings repeat a lot
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _deep_size(obj: Any, seen: set[int]) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    return size
+
+
+class DictionarySnapshot:
+    """
+    Words and characters are kept as plain tuples in two lists and are referred
+    to by their position in those lists. The links between them are kept as
+    tuples of positions in both directions, a character's words being sorted
+    from the most frequent one.
+    """
+
+    __slots__ = (
+        "_words",
+        "_characters",
+        "_simplified_index",
+        "_character_index",
+        "_word_characters",
+        "_character_words",
+    )
+
+    def __init__(
+        self,
+        *,
+        words: Iterable[Sequence[Any]],
+        characters: Iterable[Sequence[Any]],
+        links: Iterable[tuple[int, int]],
+    ) -> None:
+        """
+        **Parameters**
+        * `words`: rows of `(id, *WORD_FIELDS)`
+        * `characters`: rows of `(id, *CHARACTER_FIELDS)`
+        * `links`: `(word_id, character_id)` pairs from the word_characters table
+        """
+        word_rows: list[WordRow] = []
+        character_rows: list[CharacterRow] = []
+        character_index: dict[str, int] = {}
+
+        word_positions: dict[int, int] = {}
+        simplified_positions: dict[str, list[int]] = {}
+        for row in words:
+            word_positions[row[0]] = len(word_rows)
+            simplified_positions.setdefault(row[1], []).append(len(word_rows))
+            word_rows.append(tuple(_intern(value) for value in row))
+        self._words: Sequence[WordRow] = word_rows
+        self._simplified_index: Mapping[str, Sequence[int]] = {
+            simplified: tuple(positions) for simplified, positions in simplified_positions.items()
+        }
+
+        character_positions: dict[int, int] = {}
+        for row in characters:
+            character_positions[row[0]] = len(character_rows)
+            character_index[row[1]] = len(character_rows)
+            character_rows.append(tuple(_intern(value) for value in row))
+        self._characters: Sequence[CharacterRow] = character_rows
+        self._character_index: Mapping[str, int] = character_index
+
+        word_characters: list[list[int]] = [[] for _ in word_rows]
+        character_words: list[list[int]] = [[] for _ in character_rows]
+        for word_id, character_id in links:
+            word_position = word_positions.get(word_id)
+            character_position = character_positions.get(character_id)
+            if word_position is None or character_position is None:
+                continue
+            word_characters[word_position].append(character_position)
+            character_words[character_position].append(word_position)
+        self._word_characters: Sequence[Sequence[int]] = [tuple(positions) for positions in word_characters]
+        self._character_words: Sequence[Sequence[int]] = [
+            tuple(sorted(positions, key=self._word_order)) for positions in character_words
+        ]
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def n_characters(self) -> int:
+        return len(self._characters)
+
+    def _word_order(self, position: int) -> tuple[int, int]:
+        # most frequent first, then by id like the database does
+        row = self._words[position]
+        return -row[_WORD_FREQUENCY], row[0]
+
+    def _word_schema_fields(self, position: int) -> dict[str, Any]:
+        return dict(zip(WORD_FIELDS, self._words[position][1:]))
+
+    def _character_schema_fields(self, position: int) -> dict[str, Any]:
+        return dict(zip(CHARACTER_FIELDS, self._characters[position][1:]))
+
+    def _word_out(self, position: int) -> combined_domain.WordOut:
+        # the rows come straight from the database so they are not validated again
+        return combined_domain.WordOut.model_construct(
+            id=self._words[position][0],
+            characters=[
+                character_domain.CharacterSchema.model_construct(**self._character_schema_fields(character_position))
+                for character_position in self._word_characters[position]
+            ],
+            **self._word_schema_fields(position),
+        )
+
+    def _character_out(
+        self, position: int, include_words: bool, words_limit: int | None
+    ) -> combined_domain.CharacterOut:
+        words: list[word_domain.WordSchema] = []
+        next_words_cursor: str | None = None
+        if include_words:
+            word_positions = self._character_words[position]
+            if words_limit is not None and len(word_positions) > words_limit:
+                word_positions = word_positions[:words_limit]
+                last_word = self._words[word_positions[-1]]
+                next_words_cursor = encode_cursor([last_word[_WORD_FREQUENCY], last_word[0]])
+            words = [
+                word_domain.WordSchema.model_construct(**self._word_schema_fields(word_position))
+                for word_position in word_positions
+            ]
+        return combined_domain.CharacterOut.model_construct(
+            id=self._characters[position][0],
+            words=words,
+            next_words_cursor=next_words_cursor,
+            **self._character_schema_fields(position),
+        )
+
+    def get_multiple_simplified(
+        self, simplified_words: Iterable[word_domain.SimplifiedWord]
+    ) -> list[combined_domain.WordOut]:
+        """
+        Returns every word whose simplified form is in `simplified_words`.
+        """
+        positions: list[int] = []
+        for simplified in dict.fromkeys(simplified_words):
+            positions.extend(self._simplified_index.get(simplified, ()))
+        return [self._word_out(position) for position in positions]
+
+    def get_multiple_characters(
+        self, characters: Iterable[common_domain.Character], *, include_words: bool, words_limit: int | None = None
+    ) -> list[combined_domain.CharacterOut]:
+        """
+        Returns every character in `characters`, optionally with the words it appears in
+        (only the `words_limit` most frequent ones if given).
+        """
+        positions = [
+            self._character_index[character]
+            for character in dict.fromkeys(characters)
+            if character in self._character_index
+        ]
+        return [self._character_out(position, include_words, words_limit) for position in positions]
+
+    def get_character_words(
+        self, character: common_domain.Character, *, limit: int, after: tuple[int, int] | None = None
+    ) -> list[combined_domain.WordOut]:
+        """
+        Returns the words `character` appears in, most frequent first. `after` is the
+        (frequency, id) of the last word of the previous page.
+        """
+        position = self._character_index.get(character)
+        if position is None:
+            return []
+        word_positions = self._character_words[position]
+        start = 0
+        if after is not None:
+            after_frequency, after_id = after
+            start = bisect.bisect_right(word_positions, (-after_frequency, after_id), key=self._word_order)
+        return [self._word_out(word_position) for word_position in word_positions[start : start + limit]]
+
+    def memory_footprint(self) -> dict[str, int]:
+        """
+        Returns the approximate number of bytes used by each of the snapshot's structures.
+        Objects shared between structures (e.g. interned strings) are only counted once.
+        """
+        seen: set[int] = set()
+        footprint: dict[str, int] = {name.lstrip("_"): _deep_size(getattr(self, name), seen) for name in self.__slots__}
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+
+async def _read_dictionary_snapshot(db: AsyncSession) -> DictionarySnapshot:
+    word_columns = [word_model.Word.id] + [getattr(word_model.Word, field) for field in WORD_FIELDS]
+    character_columns = [character_model.Character.id] + [
+        getattr(character_model.Character, field) for field in CHARACTER_FIELDS
+    ]
+    words = (await db.execute(select(*word_columns))).tuples().all()
+    characters = (await db.execute(select(*character_columns))).tuples().all()
+    links = (
+        (
+            await db.execute(
+                select(
+                    word_character_association_table.c.word_id,
+                    word_character_association_table.c.character_id,
+                )
+            )
+        )
+        .tuples()
+        .all()
+    )
+    return await asyncio.to_thread(DictionarySnapshot, words=words, characters=characters, links=links)
+
+
+async def load_dictionary_snapshot(async_session_maker: async_sessionmaker[AsyncSession]) -> DictionarySnapshot:
+    """
+    Loads the words, characters and word_characters tables into a DictionarySnapshot.
+    Only the columns are selected so no ORM objects get created along the way, and the
+    snapshot is built in a thread so that the event loop keeps serving requests.
+    """
+    async with async_session_maker() as db:
+        return await _read_dictionary_snapshot(db)
+
+
+# The binary snapshot file is made of a header, a table of sections (offset and length in
+# bytes) and the sections themselves, aligned on 8 bytes. A section is an array of native
+# integers, apart from the UTF-8 strings which are each stored once and referred to by their
+# number. Rows of words (characters) are found at the same position in every word (character)
+# section and the links are kept as offsets into arrays of positions.
+_MAGIC = b"CNLSNAP\0"
+FORMAT_VERSION = 1
+# written natively, reading it back tells whether the byte order is the same
+_BYTE_ORDER_MARK = 0x01020304
+# magic, byte order mark, format version, dictionary version, number of words, number of characters
+_HEADER = struct.Struct("=8sIIIII")
+_SECTION = struct.Struct("=QQ")
+_SECTIONS: tuple[tuple[str, str], ...] = (
+    ("string_offsets", "I"),
+    ("strings", "B"),
+    ("word_ids", "q"),
+    ("word_frequencies", "q"),
+    # the string numbers of every word's fields but the frequency, row after row
+    ("word_strings", "I"),
+    ("character_ids", "q"),
+    ("character_frequencies", "q"),
+    ("character_strings", "I"),
+    ("word_character_offsets", "I"),
+    ("word_character_positions", "I"),
+    ("character_word_offsets", "I"),
+    # most frequent word first
+    ("character_word_positions", "I"),
+    # word positions sorted by simplified, then by position
+    ("simplified_order", "I"),
+    # character positions sorted by character
+    ("character_order", "I"),
+)
+# the sections making up each of the snapshot's structures
+_STRUCTURES: dict[str, tuple[str, ...]] = {
+    "words": ("word_ids", "word_frequencies", "word_strings"),
+    "characters": ("character_ids", "character_frequencies", "character_strings"),
+    "strings": ("string_offsets", "strings"),
+    "simplified_index": ("simplified_order",),
+    "character_index": ("character_order",),
+    "word_characters": ("word_character_offsets", "word_character_positions"),
+    "character_words": ("character_word_offsets", "character_word_positions"),
+}
+# the string number of None
+_NO_STRING = 0xFFFFFFFF
+# the frequency is the last field of both words and characters, all the others are strings
+_N_WORD_STRINGS = len(WORD_FIELDS) - 1
+_N_CHARACTER_STRINGS = len(CHARACTER_FIELDS) - 1
+# stored as its JSON
+_ETYMOLOGY: int = CHARACTER_FIELDS.index("etymology")
+
+
+def _align(size: int) -> int:
+    return -size % 8
+
+
+def write_mapped_snapshot(snapshot: DictionarySnapshot, path: Path, dictionary_version: int = 0) -> None:
+    """
+    Writes `snapshot` to `path` in the format read by MappedDictionarySnapshot.
+    """
+    string_numbers: dict[str, int] = {}
+    strings = bytearray()
+    string_offsets = array.array("I", [0])
+
+    def string_number(value: Any) -> int:
+        if value is None:
+            return _NO_STRING
+        if not isinstance(value, str):
+            value = orjson.dumps(value).decode("utf-8")
+        number = string_numbers.get(value)
+        if number is None:
+            number = string_numbers[value] = len(string_numbers)
+            strings.extend(value.encode("utf-8"))
+            string_offsets.append(len(strings))
+        return number
+
+    def ranges(positions: Sequence[Sequence[int]]) -> "tuple[array.array[int], array.array[int]]":
+        offsets = array.array("I", [0])
+        values = array.array("I")
+        for row_positions in positions:
+            values.extend(row_positions)
+            offsets.append(len(values))
+        return offsets, values
+
+    words, characters = snapshot._words, snapshot._characters
+    sections: dict[str, bytes] = {}
+    sections["word_ids"] = array.array("q", (row[0] for row in words)).tobytes()
+    sections["word_frequencies"] = array.array("q", (row[-1] for row in words)).tobytes()
+    sections["word_strings"] = array.array(
+        "I", (string_number(value) for row in words for value in row[1:-1])
+    ).tobytes()
+    sections["character_ids"] = array.array("q", (row[0] for row in characters)).tobytes()
+    sections["character_frequencies"] = array.array("q", (row[-1] for row in characters)).tobytes()
+    sections["character_strings"] = array.array(
+        "I", (string_number(value) for row in characters for value in row[1:-1])
+    ).tobytes()
+    for name, positions in [
+        ("word_character", snapshot._word_characters),
+        ("character_word", snapshot._character_words),
+    ]:
+        offsets, values = ranges(positions)
+        sections[f"{name}_offsets"], sections[f"{name}_positions"] = offsets.tobytes(), values.tobytes()
+    sections["simplified_order"] = array.array(
+        "I", sorted(range(len(words)), key=lambda position: (words[position][1], position))
+    ).tobytes()
+    sections["character_order"] = array.array(
+        "I", sorted(range(len(characters)), key=lambda position: characters[position][1])
+    ).tobytes()
+    sections["string_offsets"] = string_offsets.tobytes()
+    sections["strings"] = bytes(strings)
+
+    offset = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    offset += _align(offset)
+    table = bytearray()
+    for name, _ in _SECTIONS:
+        table += _SECTION.pack(offset, len(sections[name]))
+        offset += len(sections[name]) + _align(len(sections[name]))
+    with path.open("wb") as file:
+        header = _HEADER.pack(_MAGIC, _BYTE_ORDER_MARK, FORMAT_VERSION, dictionary_version, len(words), len(characters))
+        file.write(header + table + bytes(_align(len(header) + len(table))))
+        for name, _ in _SECTIONS:
+            file.write(sections[name] + bytes(_align(len(sections[name]))))
+
+
+class _MappedStrings:
+    __slots__ = ("_offsets", "_strings")
+
+    def __init__(self, offsets: memoryview, strings: memoryview) -> None:
+        self._offsets = offsets
+        self._strings = strings
+
+    def __getitem__(self, number: int) -> str | None:
+        return None if number == _NO_STRING else self.text(number)
+
+    def text(self, number: int) -> str:
+        return str(self._strings[self._offsets[number] : self._offsets[number + 1]], "utf-8")
+
+
+class _MappedRows(Sequence[tuple[Any, ...]]):
+    """
+    The `(id, *fields)` rows of the words or characters, decoded when they are read.
+    """
+
+    __slots__ = ("_ids", "_frequencies", "_string_numbers", "_strings", "_n_strings", "_json_field")
+
+    def __init__(
+        self,
+        ids: memoryview,
+        frequencies: memoryview,
+        string_numbers: memoryview,
+        strings: _MappedStrings,
+        n_strings: int,
+        json_field: int | None = None,
+    ) -> None:
+        self._ids = ids
+        self._frequencies = frequencies
+        self._string_numbers = string_numbers
+        self._strings = strings
+        self._n_strings = n_strings
+        self._json_field = json_field
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @overload
+    def __getitem__(self, position: int) -> tuple[Any, ...]: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> list[tuple[Any, ...]]: ...
+
+    def __getitem__(self, position: int | slice) -> tuple[Any, ...] | list[tuple[Any, ...]]:
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(len(self)))]
+        start = position * self._n_strings
+        values: list[Any] = [self._strings[number] for number in self._string_numbers[start : start + self._n_strings]]
+        if self._json_field is not None and values[self._json_field] is not None:
+            values[self._json_field] = orjson.loads(values[self._json_field])
+        return (self._ids[position], *values, self._frequencies[position])
+
+
+class _MappedRanges(Sequence[Sequence[int]]):
+    """
+    The positions linked to each word (or character), as lists.
+    """
+
+    __slots__ = ("_offsets", "_positions")
+
+    def __init__(self, offsets: memoryview, positions: memoryview) -> None:
+        self._offsets = offsets
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> list[int]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[list[int]]: ...
+
+    def __getitem__(self, index: int | slice) -> list[int] | list[list[int]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        return self._positions[self._offsets[index] : self._offsets[index + 1]].tolist()
+
+
+class _MappedIndex(Mapping[str, Any]):
+    """
+    Maps a simplified word to the positions of its words (or a character to its
+    position) by a binary search over the positions sorted by their key.
+    """
+
+    __slots__ = ("_order", "_key", "_unique")
+
+    def __init__(self, order: memoryview, key: Callable[[int], str], *, unique: bool) -> None:
+        self._order = order
+        self._key = key
+        self._unique = unique
+
+    def __getitem__(self, key: str) -> Any:
+        start = bisect.bisect_left(self._order, key, key=self._key)
+        end = start
+        while end < len(self._order) and self._key(self._order[end]) == key:
+            end += 1
+        if start == end:
+            raise KeyError(key)
+        return self._order[start] if self._unique else tuple(self._order[start:end].tolist())
+
+    def __iter__(self) -> Iterator[str]:
+        previous: str | None = None
+        for position in self._order:
+            key = self._key(position)
+            if key != previous:
+                yield key
+            previous = key
+
+    def __len__(self) -> int:
+        return len(self._order) if self._unique else sum(1 for _ in self)
+
+
+class MappedDictionarySnapshot(DictionarySnapshot):
+    """
+    A DictionarySnapshot read from a file written by `write_mapped_snapshot` and mapped
+    in memory read-only. Nothing is decoded up front, a lookup only decodes (and builds
+    the Python objects of) the rows it returns.
+    """
+
+    __slots__ = ("_file", "_mapping", "_sections", "dictionary_version")
+
+    def __init__(self, path: Path) -> None:
+        self._file = path.open("rb")
+        self._mapping = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byte_order_mark, format_version, self.dictionary_version, _, _ = _HEADER.unpack_from(self._mapping)
+        if magic != _MAGIC or byte_order_mark != _BYTE_ORDER_MARK or format_version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a dictionary snapshot of format {FORMAT_VERSION} and this byte order")
+        self._sections: dict[str, memoryview] = {}
+        with memoryview(self._mapping) as buffer:
+            for index, (name, typecode) in enumerate(_SECTIONS):
+                offset, length = _SECTION.unpack_from(self._mapping, _HEADER.size + index * _SECTION.size)
+                self._sections[name] = buffer[offset : offset + length].cast(typecode)
+        sections = self._sections
+        strings = _MappedStrings(sections["string_offsets"], sections["strings"])
+        word_strings, character_strings = sections["word_strings"], sections["character_strings"]
+        self._words = _MappedRows(
+            sections["word_ids"], sections["word_frequencies"], word_strings, strings, _N_WORD_STRINGS
+        )
+        self._characters = _MappedRows(
+            sections["character_ids"],
+            sections["character_frequencies"],
+            character_strings,
+            strings,
+            _N_CHARACTER_STRINGS,
+            json_field=_ETYMOLOGY,
+        )
+        self._word_characters = _MappedRanges(sections["word_character_offsets"], sections["word_character_positions"])
+        self._character_words = _MappedRanges(sections["character_word_offsets"], sections["character_word_positions"])
+        # simplified and character are the first string of their rows
+        self._simplified_index = _MappedIndex(
+            sections["simplified_order"],
+            lambda position: strings.text(word_strings[position * _N_WORD_STRINGS]),
+            unique=False,
+        )
+        self._character_index = _MappedIndex(
+            sections["character_order"],
+            lambda position: strings.text(character_strings[position * _N_CHARACTER_STRINGS]),
+            unique=True,
+        )
+
+    def _word_order(self, position: int) -> tuple[int, int]:
+        # without decoding the whole row
+        return -self._sections["word_frequencies"][position], self._sections["word_ids"][position]
+
+    def memory_footprint(self) -> dict[str, int]:
+        """
+        Returns the number of bytes of the file used by each of the snapshot's structures,
+        they are shared with every other process mapping the same file.
+        """
+        footprint = {
+            name: sum(self._sections[section].nbytes for section in sections) for name, sections in _STRUCTURES.items()
+        }
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+    def close(self) -> None:
+        for section in getattr(self, "_sections", {}).values():
+            section.release()
+        self._mapping.close()
+        self._file.close()
+
+
+async def export_dictionary_snapshot(async_session_maker: async_sessionmaker[AsyncSession], cache_dir: Path) -> Path:
+    """
+    Writes the binary snapshot of the current dictionary version in `cache_dir`, unless
+    it's already there, and returns its path. Workers starting together wait for the
+    first one to write it, the older snapshots are then removed (the workers still
+    mapping them keep them until they close them).
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    async with async_session_maker() as db:
+        # the version and the rows are read from the same snapshot of the database, an import
+        # committing in between doesn't end up in a file labelled with the other version
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        version = await dictionary_version_crud.get_current(db)
+        path = cache_dir / f"dictionary-{version}.v{FORMAT_VERSION}.snapshot"
+        with (cache_dir / "dictionary-snapshot.lock").open("w") as lock:
+            # waiting for another worker mustn't block this one's event loop
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(LOCK_RETRY_INTERVAL)
+            if not path.exists():
+                snapshot = await _read_dictionary_snapshot(db)
+                temporary = path.with_suffix(".tmp")
+                await asyncio.to_thread(write_mapped_snapshot, snapshot, temporary, version)
+                temporary.replace(path)
+                # a worker that read an older version meanwhile doesn't remove the newer snapshots
+                for old_path in cache_dir.glob("dictionary-*.snapshot"):
+                    old_version = old_path.name.removeprefix("dictionary-").partition(".")[0]
+                    if old_version.isdigit() and int(old_version) < version:
+                        old_path.unlink(missing_ok=True)
+    return path
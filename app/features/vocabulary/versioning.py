@@ -0,0 +1,84 @@
+"""
+This module keeps track of the dictionary version, which changes with every
+import. It's read from the database in the background so that requests can be
+validated against it (ETag) without opening a session.
+"""
+
+import asyncio
+import hashlib
+import inspect
+from typing import Awaitable, Callable
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.crud.dictionary_version import dictionary_version_crud
+
+logger: structlog.BoundLogger = structlog.get_logger()
+
+
+class DictionaryVersionTracker:
+    def __init__(
+        self,
+        async_session_maker: async_sessionmaker[AsyncSession],
+        *,
+        refresh_interval: float = 60.0,
+        on_change: list[Callable[[], Awaitable[None] | None]] | None = None,
+    ) -> None:
+        """
+        **Parameters**
+        * `async_session_maker`: where the version is read from
+        * `refresh_interval`: seconds between two reads of the version
+        * `on_change`: called (and awaited if need be), in order, whenever the version changes
+        and before the new version is published, e.g. to reload the data built from the
+        dictionary then drop the cached responses
+        """
+        self.async_session_maker = async_session_maker
+        self.refresh_interval = refresh_interval
+        self.on_change: list[Callable[[], Awaitable[None] | None]] = on_change or []
+        # until the first refresh, which always calls on_change
+        self.version: int = -1
+
+    async def refresh(self) -> bool:
+        """
+        Reads the version from the database and returns whether it changed. The version is
+        read before on_change rebuilds anything, so the data is never older than the version
+        published; if a callback fails the old version stays and the next refresh tries again.
+        """
+        async with self.async_session_maker() as db:
+            version = await dictionary_version_crud.get_current(db)
+        if version == self.version:
+            return False
+        logger.info("Dictionary version changed", previous_version=self.version, version=version)
+        for callback in self.on_change:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+        self.version = version
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                # the database being unavailable for a while shouldn't stop the refreshes
+                logger.exception("Could not refresh the dictionary version")
+
+    def etag(self, resource: str) -> str:
+        """
+        Returns the strong ETag of `resource` (e.g. a URL) at the current version.
+        """
+        return f'"{self.version}-{hashlib.sha256(resource.encode("utf-8")).hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag`, using the weak comparison it calls for.
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -1,62 +1,93 @@
+import random
 import time
+from typing import Any
 from uuid import uuid4
 
 import structlog
-from starlette.middleware.base import (
-    BaseHTTPMiddleware,
-    DispatchFunction,
-    RequestResponseEndpoint,
-)
 from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.db.query_stats import QueryStats, current_query_stats
+from app.settings.base import app_settings
 
-class AccessLogger(BaseHTTPMiddleware):
-    def __init__(
-        self, app: ASGIApp, dispatch: DispatchFunction | None = None, *, logger: structlog.BoundLogger
-    ) -> None:
+
+class AccessLogger:
+    """
+    Logs every request once its response has been sent, streamed ones included,
+    along with the SQL statements it ran. Only a sample of the 2xx responses is
+    logged when ACCESS_LOG_SAMPLE_RATE is below 1, the fields of the ones that
+    aren't are never worked out.
+    """
+
+    def __init__(self, app: ASGIApp, *, logger: structlog.BoundLogger) -> None:
+        self.app = app
         self.logger: structlog.BoundLogger = logger
-        super().__init__(app, dispatch)
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(
             request_id=str(uuid4()),
         )
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
-        method = request.method
+        query_stats = QueryStats()
+        query_stats_token = current_query_stats.set(query_stats)
+        # an exception raised before the response started ends up as a 500
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start_time
+            current_query_stats.reset(query_stats_token)
+            self.log(scope, status_code, duration, query_stats)
+
+    def log(self, scope: Scope, status_code: int, duration: float, query_stats: QueryStats) -> None:
+        method: str = scope["method"]
+        for statement, count in query_stats.repeated_statements(app_settings.N_PLUS_ONE_THRESHOLD):
+            self.logger.warning(
+                f'Possible N+1 queries in "{method} {scope["path"]}": the same statement ran {count} times',
+                statement=statement,
+                count=count,
+            )
+        if 200 <= status_code < 300 and random.random() >= app_settings.ACCESS_LOG_SAMPLE_RATE:
+            return
+        request = Request(scope)
         path = request.url.path
-        port = request.url.port
-        scheme = request.url.scheme
-        query_params = str(request.query_params)
-        path_params = request.path_params
         client_host = request.client.host if request.client is not None else ""
         client_port = request.client.port if request.client is not None else ""
-        http_version = request.scope["http_version"]
-        status_code = response.status_code
+        http_version = scope["http_version"]
         url: str = path
-        if request.scope.get("query_string"):
-            url += f"?{request.scope['query_string'].decode('ascii')}"
+        if scope.get("query_string"):
+            url += f"?{scope['query_string'].decode('ascii')}"
 
-        logged_dict = {
+        logged_dict: dict[str, Any] = {
             "duration": duration,
             "url": str(request.url),
             "method": method,
             "path": path,
-            "scheme": scheme,
-            "port": port,
-            "query_params": query_params,
-            "path_params": path_params,
+            "scheme": request.url.scheme,
+            "port": request.url.port,
+            "query_params": str(request.query_params),
+            "path_params": request.path_params,
             "client_host": client_host,
             "client_port": client_port,
             "http_version": http_version,
             "status_code": status_code,
+            "db_queries": query_stats.count,
+            "db_time": query_stats.total_time,
+            "db_slowest_time": query_stats.slowest_time,
+            "db_slowest_statement": query_stats.slowest_statement,
         }
         self.logger.info(
             f'{client_host}:{client_port} - "{method} {url} HTTP/{http_version}" {status_code}',
             request=logged_dict,
         )
-        return response
@@ -0,0 +1,58 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import MetricsRegistry
+
+
+class HTTPMetrics:
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.requests = registry.counter(
+            "cnlearn_http_requests_total", "Requests answered.", ("route", "method", "status")
+        )
+        self.errors = registry.counter(
+            "cnlearn_http_request_errors_total", "Requests that failed with a 5xx.", ("route", "method")
+        )
+        self.duration = registry.histogram(
+            "cnlearn_http_request_duration_seconds", "Time taken to answer requests.", ("route", "method")
+        )
+
+    def observe(self, route: str, method: str, status_code: int, duration: float) -> None:
+        self.requests.inc(route, method, str(status_code))
+        if status_code >= 500:
+            self.errors.inc(route, method)
+        self.duration.observe(route, method, value=duration)
+
+
+class RequestMetrics:
+    """
+    Records the duration and status of every request under the name of the route
+    that answered it (e.g. vocabulary:search-phrase) rather than its path, which would
+    give a new series for every word looked up. Requests that didn't match a route are
+    recorded as "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        http_metrics: HTTPMetrics | None = scope.get("state", {}).get("_http_metrics")
+        if scope["type"] != "http" or http_metrics is None:
+            await self.app(scope, receive, send)
+            return
+        # an exception raised before the response started ends up as a 500
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router adds the route it matched to the scope
+            route = getattr(scope.get("route"), "name", None) or "unmatched"
+            http_metrics.observe(route, scope["method"], status_code, time.perf_counter() - start)
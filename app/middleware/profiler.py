@@ -0,0 +1,90 @@
+import threading
+import time
+from uuid import uuid4
+
+import anyio
+import structlog
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.exceptions import CNLearnWithMessage
+from app.core.profiling import SamplingProfiler
+from app.features.auth.logic import user as user_logic
+from app.settings.base import app_settings
+
+PROFILE_HEADER: str = "x-cnlearn-profile"
+logger: structlog.BoundLogger = structlog.get_logger()
+
+
+class RequestProfiler:
+    """
+    Profiles the requests of superusers that carry the X-CNLearn-Profile header,
+    when PROFILING_ENABLED is set. The event loop's thread is sampled until the
+    response has been sent and the collapsed stacks are written to PROFILE_DIR,
+    under the name returned in the X-CNLearn-Profile response header. Other
+    requests sharing the event loop in the meantime show up in the profile too,
+    and only one request is profiled at a time. Requests without the header only
+    cost a look at the setting and the headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._profiling: bool = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not app_settings.PROFILING_ENABLED
+            or not any(name == PROFILE_HEADER.encode("latin-1") for name, _ in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        if self._profiling:
+            logger.warning("Another request is being profiled", path=scope["path"])
+            await self.app(scope, receive, send)
+            return
+        if not await self.is_superuser(scope):
+            await self.app(scope, receive, send)
+            return
+        profile_name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:12]}.collapsed"
+
+        async def send_with_profile_name(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_HEADER, profile_name)
+            await send(message)
+
+        profiler = SamplingProfiler(threading.get_ident(), interval=app_settings.PROFILING_INTERVAL)
+        self._profiling = True
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_name)
+        finally:
+            profiler.stop()
+            self._profiling = False
+            profile = app_settings.PROFILE_DIR / profile_name
+            await anyio.to_thread.run_sync(profiler.write, profile)
+            logger.info("Profiled request", path=scope["path"], profile=str(profile), samples=profiler.samples)
+
+    async def is_superuser(self, scope: Scope) -> bool:
+        """
+        Whether the request's bearer token is the one of a superuser, as read_users_me would resolve it.
+        The token is checked before a session is opened, only valid ones cost a query.
+        """
+        scheme, token = get_authorization_scheme_param(Headers(scope=scope).get("authorization"))
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            token_data = user_logic.get_token_payload(token)
+        except CNLearnWithMessage:
+            return False
+        async_session_maker: async_sessionmaker[AsyncSession] = scope["state"]["_db"]
+        async with async_session_maker() as db:
+            try:
+                user = await user_logic.get_token_user(db, token_data)
+            except CNLearnWithMessage:
+                return False
+        if not user.is_superuser:
+            logger.warning("Profiling refused to a user who isn't a superuser", user_id=user.id)
+        return user.is_superuser
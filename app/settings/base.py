@@ -1,5 +1,8 @@
+import os
 import secrets
-from typing import List
+import tempfile
+from pathlib import Path
+from typing import List, Literal
 
 from pydantic import AnyHttpUrl
 
@@ -20,5 +23,65 @@ class Settings(CNLearnBaseSettings):
     # password settings
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
 
+    # logging settings
+    # fraction of the 2xx responses that get logged, the others always are
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    # a request running the same statement more times than this gets a warning about a likely N+1 pattern
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # log lines waiting to be written before LOG_QUEUE_OVERFLOW applies
+    LOG_QUEUE_SIZE: int = 10_000
+    # drop (and count) the lines that don't fit in the queue or block until they do
+    LOG_QUEUE_OVERFLOW: Literal["drop", "block"] = "drop"
+
+    # profiling settings
+    # profile the requests of superusers sending the X-CNLearn-Profile header
+    PROFILING_ENABLED: bool = False
+    # seconds between two samples of the event loop's stack
+    PROFILING_INTERVAL: float = 0.001
+    # where the collapsed stacks of the profiled requests are written
+    PROFILE_DIR: Path = Path(tempfile.gettempdir()) / "cnlearn" / "profiles"
+
+    # vocabulary settings
+    # load words, characters and their links in memory at startup and answer lookups from there
+    DICTIONARY_SNAPSHOT_ENABLED: bool = False
+    # export the snapshot to a file that every worker maps read-only rather than each of
+    # them loading its own copy
+    DICTIONARY_SNAPSHOT_MAPPED: bool = False
+    # where that file is written
+    DICTIONARY_SNAPSHOT_DIR: Path = Path(tempfile.gettempdir()) / "cnlearn"
+    # build the autocomplete prefix index at startup
+    AUTOCOMPLETE_ENABLED: bool = True
+    # number of suggestions kept for each precomputed prefix
+    AUTOCOMPLETE_TOP_K: int = 10
+    # prefixes matching more keys than this get their suggestions precomputed
+    AUTOCOMPLETE_SCAN_LIMIT: int = 64
+    # cache the serialised responses of /get-words and /search-phrase
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # seconds
+    RESPONSE_CACHE_TTL: float = 3600.0
+    # seconds between two reads of the dictionary version
+    DICTIONARY_VERSION_REFRESH_INTERVAL: float = 60.0
+    # max-age of the dictionary responses carrying an ETag
+    DICTIONARY_CACHE_MAX_AGE: int = 3600
+    # largest text /search-text accepts, in bytes, larger ones get a 413
+    SEARCH_TEXT_MAX_BYTES: int = 10 * 1024 * 1024
+    # load the word and character frequencies used to analyse texts at startup
+    TEXT_ANALYSIS_ENABLED: bool = True
+    # worker processes segmenting long phrases, each holds its own copy of jieba's dictionary
+    # so there are only a couple; 0 segments everything in the event loop
+    SEGMENTATION_POOL_SIZE: int = min(2, os.cpu_count() or 1)
+    # phrases shorter than this (in characters) are segmented in the event loop anyway
+    SEGMENTATION_INLINE_THRESHOLD: int = 200
+    # phrases waiting for, or being segmented by, the pool before new ones get a 503
+    SEGMENTATION_MAX_QUEUE: int = 64
+    # seconds before a pooled segmentation gets a 504
+    SEGMENTATION_TIMEOUT: float = 5.0
+    # segment with a dictionary made of the words table rather than jieba's bundled one
+    SEGMENTATION_DICTIONARY_FROM_DB: bool = True
+    # where that dictionary and jieba's compiled model are cached
+    SEGMENTATION_CACHE_DIR: Path = Path(tempfile.gettempdir()) / "cnlearn"
+
 
 app_settings = CNLearnSettings[Settings](Settings)()
@@ -0,0 +1,130 @@
+"""
+This module contains the handler that takes the writing of log lines off the
+event loop. structlog renders each line (with orjson outside of Development) in
+the thread that logged it, then the handler puts it on a bounded queue that a
+background thread empties into the stream, writing whatever has piled up in one
+go. When the queue is full, lines are either dropped, and counted, or the logging
+thread waits for room.
+"""
+
+import logging
+import queue
+import threading
+from typing import IO, Literal
+
+from app.core.metrics import MetricsRegistry
+
+OverflowPolicy = Literal["drop", "block"]
+# most lines written by one write
+MAX_BATCH: int = 1_000
+
+
+class QueueLogHandler(logging.Handler):
+    def __init__(
+        self,
+        stream: IO[bytes],
+        *,
+        max_size: int = 10_000,
+        overflow: OverflowPolicy = "drop",
+        level: int = logging.NOTSET,
+    ) -> None:
+        """
+        **Parameters**
+        * `stream`: where the lines are written
+        * `max_size`: number of lines waiting to be written before the overflow policy applies
+        * `overflow`: "drop" the lines that don't fit in the queue or "block" until they do
+        """
+        super().__init__(level)
+        self.stream = stream
+        self.overflow = overflow
+        # lines dropped, and times a logging thread had to wait, because the queue was full
+        self.dropped: int = 0
+        self.blocked: int = 0
+        # None stops the writer
+        self._queue: queue.Queue[bytes | None] = queue.Queue(max_size)
+        self._writer = threading.Thread(target=self._write, name="log-writer", daemon=True)
+        self._writer.start()
+
+    def render(self, record: logging.LogRecord) -> bytes:
+        # structlog's JSONRenderer hands over orjson's bytes, everything else gets formatted
+        if isinstance(record.msg, bytes) and not record.args:
+            return record.msg + b"\n"
+        return (self.format(record) + "\n").encode("utf-8", "backslashreplace")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # called with the handler's lock held
+        try:
+            line = self.render(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if not self._writer.is_alive():
+            # closed, e.g. while the interpreter shuts down
+            self._write_lines([line])
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            if self.overflow == "drop":
+                self.dropped += 1
+                return
+            self.blocked += 1
+            self._queue.put(line)
+
+    def _write_lines(self, lines: list[bytes]) -> None:
+        try:
+            self.stream.write(b"".join(lines))
+            self.stream.flush()
+        except (OSError, ValueError):
+            # the stream was closed, nothing else to write to
+            pass
+
+    def _write(self) -> None:
+        stopped = False
+        while not stopped:
+            lines: list[bytes | None] = [self._queue.get()]
+            while len(lines) < MAX_BATCH:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopped = None in lines
+            self._write_lines([line for line in lines if line is not None])
+            for _ in lines:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """
+        Waits until the lines logged so far have been written.
+        """
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        super().close()
+
+
+def queue_log_handler() -> QueueLogHandler | None:
+    """
+    Returns the QueueLogHandler configure_logging added to the root logger, if any.
+    """
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, QueueLogHandler):
+            return handler
+    return None
+
+
+def instrument_log_handler(handler: QueueLogHandler, registry: MetricsRegistry) -> None:
+    dropped = registry.counter("cnlearn_log_lines_dropped_total", "Log lines dropped because the log queue was full.")
+    blocked = registry.counter(
+        "cnlearn_log_queue_blocked_total", "Times logging waited for room in the full log queue."
+    )
+
+    def collect() -> None:
+        dropped.set_total(value=handler.dropped)
+        blocked.set_total(value=handler.blocked)
+
+    registry.add_collector("log_queue", collect)
@@ -5,24 +5,37 @@ logging middleware and separate loggers for the various modules.
 """
 
 import logging
+import sys
+from typing import IO
 
 import orjson
 import structlog
 from structlog.typing import Processor
 
 from ..base import app_settings
+from .sink import QueueLogHandler
 
 
-def configure_logging() -> structlog.BoundLogger:
+def configure_logging(stream: IO[bytes] | None = None) -> structlog.BoundLogger:
     common_processors: list[Processor] = [
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.PositionalArgumentsFormatter(),
     ]
-    logging.basicConfig(
-        format="%(message)s",
+    # the lines are written by the handler's thread rather than the one logging them
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, QueueLogHandler):
+            root_logger.removeHandler(handler)
+            handler.close()
+    queue_handler = QueueLogHandler(
+        stream if stream is not None else sys.stderr.buffer,
+        max_size=app_settings.LOG_QUEUE_SIZE,
+        overflow=app_settings.LOG_QUEUE_OVERFLOW,
     )
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    root_logger.addHandler(queue_handler)
     jieba_logger = logging.getLogger("jieba")
     jieba_logger.handlers = []
     jieba_logger.propagate = False
@@ -1,24 +1,88 @@
+import asyncio
 import contextlib
 from typing import AsyncGenerator, TypedDict
 
-import jieba
 from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import close_all_sessions
 
+from app.core.metrics import MetricsRegistry
+from app.db.pool import InstrumentedAsyncPool, instrument_pool
+from app.db.query_stats import track_queries
+from app.features.vocabulary.cache import ResponseCache, instrument_response_cache
+from app.features.vocabulary.dictionary import LoadedDictionary
+from app.features.vocabulary.segmentation import SegmentationExecutor
+from app.features.vocabulary.versioning import DictionaryVersionTracker
+from app.middleware.metrics import HTTPMetrics
+from app.settings.base import app_settings
 from app.settings.db import db_settings
+from app.settings.logging.sink import instrument_log_handler, queue_log_handler
 
 
 class AppState(TypedDict):
     _db: async_sessionmaker[AsyncSession]
-    _chinese_segmenter: jieba
+    _chinese_segmenter: SegmentationExecutor
+    # the snapshot, autocomplete index and frequency table, replaced when the dictionary changes
+    _dictionary: LoadedDictionary
+    _response_cache: ResponseCache | None
+    _dictionary_version: DictionaryVersionTracker
+    _metrics: MetricsRegistry
+    _http_metrics: HTTPMetrics
 
 
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[AppState, None]:
     ASYNC_URI: str = str(db_settings.CNLEARN_POSTGRES_URI)
-    engine = create_async_engine(ASYNC_URI, echo=False)
+    metrics = MetricsRegistry()
+    http_metrics = HTTPMetrics(metrics)
+    engine = create_async_engine(ASYNC_URI, echo=False, poolclass=InstrumentedAsyncPool)
+    instrument_pool(engine, metrics)
+    track_queries(engine)
+    log_handler = queue_log_handler()
+    if log_handler is not None:
+        instrument_log_handler(log_handler, metrics)
     async_session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-    jieba.initialize()
-    yield AppState(_db=async_session_maker, _chinese_segmenter=jieba)
+    chinese_segmenter = SegmentationExecutor(
+        pool_size=app_settings.SEGMENTATION_POOL_SIZE,
+        inline_threshold=app_settings.SEGMENTATION_INLINE_THRESHOLD,
+        max_queue=app_settings.SEGMENTATION_MAX_QUEUE,
+        timeout=app_settings.SEGMENTATION_TIMEOUT,
+        metrics=metrics,
+    )
+    dictionary = LoadedDictionary(async_session_maker, chinese_segmenter)
+    response_cache: ResponseCache | None = None
+    if app_settings.RESPONSE_CACHE_ENABLED:
+        response_cache = ResponseCache(
+            max_entries=app_settings.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=app_settings.RESPONSE_CACHE_MAX_BYTES,
+            ttl=app_settings.RESPONSE_CACHE_TTL,
+        )
+        instrument_response_cache(response_cache, metrics)
+    dictionary_version = DictionaryVersionTracker(
+        async_session_maker,
+        refresh_interval=app_settings.DICTIONARY_VERSION_REFRESH_INTERVAL,
+        # the responses cached meanwhile were made of the old data
+        on_change=[dictionary.load, *([response_cache.clear] if response_cache is not None else [])],
+    )
+    # the first refresh loads the dictionary and starts the segmenter
+    await dictionary_version.refresh()
+    dictionary_version_refresh = asyncio.create_task(dictionary_version.run())
+    yield AppState(
+        _db=async_session_maker,
+        _chinese_segmenter=chinese_segmenter,
+        _dictionary=dictionary,
+        _response_cache=response_cache,
+        _dictionary_version=dictionary_version,
+        _metrics=metrics,
+        _http_metrics=http_metrics,
+    )
+    dictionary_version_refresh.cancel()
+    # a refresh cancelled halfway through still closes its session
+    with contextlib.suppress(asyncio.CancelledError):
+        await dictionary_version_refresh
+    chinese_segmenter.shutdown()
+    dictionary.close()
     close_all_sessions()
+    await engine.dispose()
+    if log_handler is not None:
+        log_handler.flush()
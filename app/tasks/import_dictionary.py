@@ -0,0 +1,563 @@
+"""
+This module contains the dictionary import command. The CC-CEDICT and
+makemeahanzi files are parsed as they are read and their rows are copied (with
+asyncpg's COPY support) into temporary staging tables. The words, characters and
+word_characters tables are then emptied and refilled from the staging tables
+with set-based INSERT ... SELECT statements, all in one transaction, so that the
+API sees either the old dictionary or the new one. The tables are emptied with
+DELETE rather than TRUNCATE, whose lock would block every read of them until the
+import commits; the old rows are vacuumed away afterwards:
+
+    poetry run import-dictionary --cedict cedict_ts.u8 --hanzi dictionary.txt \\
+        --word-frequencies word_frequencies.txt --character-frequencies character_frequencies.txt
+
+With --incremental the tables are instead diffed against the staging tables, on
+the content hash of every entry, and only the rows that changed are inserted,
+updated or deleted. Each change is recorded in the dictionary_changes table so
+that clients can fetch only what changed since the version they have.
+
+The source files can be gzipped. The frequency files have a token and its count
+per line, tokens that aren't in them get a frequency of 1.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO, cast
+
+from sqlalchemy import (
+    CTE,
+    Column,
+    ColumnElement,
+    MetaData,
+    Select,
+    String,
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import CursorResult, Result
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.sql import FromClause
+
+from app.core.pinyin import tone_numbers_to_marks
+from app.db.crud.dictionary_version import dictionary_version_crud
+from app.db.models import character as character_model
+from app.db.models import dictionary_change as dictionary_change_model
+from app.db.models import word as word_model
+from app.db.models.base import content_hash
+from app.db.models.combined import word_character_association_table
+from app.settings.db import db_settings
+
+WORD_COLUMNS: tuple[str, ...] = (
+    "simplified",
+    "traditional",
+    "pinyin_num",
+    "pinyin_accent",
+    "pinyin_clean",
+    "pinyin_no_spaces",
+    "also_written",
+    "also_pronounced",
+    "classifiers",
+    "definitions",
+    "frequency",
+)
+CHARACTER_COLUMNS: tuple[str, ...] = (
+    "character",
+    "definition",
+    "pinyin",
+    "decomposition",
+    "etymology",
+    "radical",
+    "matches",
+    "frequency",
+)
+# what identifies an entry between two releases
+WORD_KEY: tuple[str, ...] = ("simplified", "traditional", "pinyin_num")
+CHARACTER_KEY: tuple[str, ...] = ("character",)
+# Simplified Traditional [pin1 yin1] /definition/definition/
+_CEDICT_LINE = re.compile(r"^(\S+) (\S+) \[([^\]]*)\] /(.*)/\s*$")
+_TONE_NUMBER = re.compile(r"[1-5]")
+
+_staging_metadata = MetaData()
+
+
+def _staging_table(name: str, source: FromClause, columns: Iterable[str]) -> Table:
+    # the staging tables have the types (and lengths) of the real columns but no constraints
+    return Table(
+        name,
+        _staging_metadata,
+        *(Column(column, source.c[column].type) for column in columns),
+        # computed like the one of the real table
+        Column("content_hash", String(32), content_hash(*columns)),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+words_staging = _staging_table("words_staging", word_model.Word.__table__, WORD_COLUMNS)
+characters_staging = _staging_table("characters_staging", character_model.Character.__table__, CHARACTER_COLUMNS)
+
+
+def _max_lengths(table: Table, columns: Iterable[str]) -> dict[str, int]:
+    max_lengths: dict[str, int] = {}
+    for column in columns:
+        column_type = table.c[column].type
+        if isinstance(column_type, String) and column_type.length is not None:
+            max_lengths[column] = column_type.length
+    return max_lengths
+
+
+_WORD_MAX_LENGTHS = _max_lengths(words_staging, WORD_COLUMNS)
+_CHARACTER_MAX_LENGTHS = _max_lengths(characters_staging, CHARACTER_COLUMNS)
+
+
+@dataclass
+class ParseStats:
+    rows: int = 0
+    # entries that don't fit in the columns
+    skipped: int = 0
+    # lines that couldn't be parsed at all
+    malformed: int = 0
+
+
+@dataclass
+class ImportStats:
+    words: int = 0
+    characters: int = 0
+    word_characters: int = 0
+    # phase -> (rows, seconds)
+    phases: dict[str, tuple[int, float]] = field(default_factory=dict)
+    # e.g. "words updated" -> count, for the incremental import
+    changes: dict[str, int] = field(default_factory=dict)
+
+    def report(self) -> str:
+        lines = []
+        for phase, (rows, seconds) in self.phases.items():
+            rate = rows / seconds if seconds else 0.0
+            lines.append(f"{phase:<30} {rows:>9} rows in {seconds:7.2f}s ({rate:,.0f} rows/s)")
+        for change, count in self.changes.items():
+            lines.append(f"{change:<30} {count:>9}")
+        return "\n".join(lines)
+
+
+def _rowcount(result: Result[Any]) -> int:
+    return cast(CursorResult[Any], result).rowcount
+
+
+def open_source(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open(encoding="utf-8")
+
+
+def read_frequencies(lines: Iterable[str]) -> dict[str, int]:
+    """
+    Returns the token -> count of a frequency file, one `token count` per line.
+    """
+    frequencies: dict[str, int] = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[-1].isdigit():
+            frequencies.setdefault(parts[0], int(parts[-1]))
+    return frequencies
+
+
+def _fits(row: tuple[Any, ...], columns: tuple[str, ...], max_lengths: dict[str, int]) -> bool:
+    return all(
+        value is None or len(value) <= max_lengths[column]
+        for column, value in zip(columns, row)
+        if column in max_lengths
+    )
+
+
+def _split_definitions(definitions: str) -> tuple[str, str, str, str]:
+    also_written: list[str] = []
+    also_pronounced: list[str] = []
+    classifiers: list[str] = []
+    others: list[str] = []
+    for definition in definitions.split("/"):
+        if definition.startswith("CL:"):
+            classifiers.append(definition.removeprefix("CL:"))
+        elif definition.startswith("also written "):
+            also_written.append(definition.removeprefix("also written "))
+        elif definition.startswith("also pr. "):
+            also_pronounced.append(definition.removeprefix("also pr. "))
+        elif definition:
+            others.append(definition)
+    return ", ".join(also_written), ", ".join(also_pronounced), ", ".join(classifiers), "; ".join(others)
+
+
+def parse_cc_cedict(
+    lines: Iterable[str], frequencies: dict[str, int] | None = None, stats: ParseStats | None = None
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Yields the words of a CC-CEDICT file as tuples of WORD_COLUMNS. Entries with a
+    value longer than its column are skipped.
+    """
+    frequencies = frequencies or {}
+    stats = stats if stats is not None else ParseStats()
+    for line in lines:
+        if line.startswith("#") or not line.strip():
+            continue
+        match = _CEDICT_LINE.match(line)
+        if match is None:
+            stats.malformed += 1
+            continue
+        traditional, simplified, pinyin_num, definitions = match.groups()
+        pinyin_clean = _TONE_NUMBER.sub("", pinyin_num).replace("u:", "ü").replace("U:", "Ü")
+        also_written, also_pronounced, classifiers, definition = _split_definitions(definitions)
+        row = (
+            simplified,
+            traditional,
+            pinyin_num,
+            tone_numbers_to_marks(pinyin_num),
+            pinyin_clean,
+            pinyin_clean.replace(" ", ""),
+            also_written,
+            also_pronounced,
+            classifiers,
+            definition,
+            max(frequencies.get(simplified, 1), 1),
+        )
+        if not _fits(row, WORD_COLUMNS, _WORD_MAX_LENGTHS):
+            stats.skipped += 1
+            continue
+        stats.rows += 1
+        yield row
+
+
+def parse_makemeahanzi(
+    lines: Iterable[str], frequencies: dict[str, int] | None = None, stats: ParseStats | None = None
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Yields the characters of a makemeahanzi dictionary.txt file (one JSON object
+    per line) as tuples of CHARACTER_COLUMNS. Entries with a value longer than
+    its column are skipped.
+    """
+    frequencies = frequencies or {}
+    stats = stats if stats is not None else ParseStats()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            character = entry["character"]
+        except (ValueError, KeyError):
+            stats.malformed += 1
+            continue
+        etymology = entry.get("etymology")
+        row = (
+            character,
+            entry.get("definition"),
+            ", ".join(entry.get("pinyin", [])),
+            entry.get("decomposition"),
+            # asyncpg expects json as text
+            json.dumps(etymology, ensure_ascii=False) if etymology is not None else None,
+            entry.get("radical", ""),
+            str(entry.get("matches", [])),
+            max(frequencies.get(character, 1), 1),
+        )
+        if not _fits(row, CHARACTER_COLUMNS, _CHARACTER_MAX_LENGTHS):
+            stats.skipped += 1
+            continue
+        stats.rows += 1
+        yield row
+
+
+async def _copy_to_staging(
+    db: AsyncSession, stats: ImportStats, words: Iterable[tuple[Any, ...]], characters: Iterable[tuple[Any, ...]]
+) -> None:
+    connection = await db.connection()
+    await connection.run_sync(_staging_metadata.create_all)
+    raw_connection = await connection.get_raw_connection()
+    driver_connection: Any = raw_connection.driver_connection
+    for name, table, records, columns in [
+        ("words", words_staging, words, WORD_COLUMNS),
+        ("characters", characters_staging, characters, CHARACTER_COLUMNS),
+    ]:
+        start = time.perf_counter()
+        await driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+        rows = (await db.execute(select(func.count()).select_from(table))).scalar_one()
+        stats.phases[f"copy {name}"] = (rows, time.perf_counter() - start)
+
+
+def _staged(table: Table, columns: tuple[str, ...], key: tuple[str, ...]) -> CTE:
+    # one row per key, CC-CEDICT has a few duplicated entries: the same one is always
+    # kept so that they don't show up as changes from one import to the next
+    key_columns = [table.c[column] for column in key]
+    return (
+        select(*(table.c[column] for column in columns), table.c.content_hash)
+        .distinct(*key_columns)
+        .order_by(*key_columns, table.c.content_hash)
+        .cte(f"{table.name}_unique")
+    )
+
+
+def _word_character_links(*where: ColumnElement[bool]) -> Select[tuple[int, int]]:
+    # every (word, character) pair, from the characters of each word that are in the characters table
+    # (a function in FROM can use the columns of the tables before it, no LATERAL needed)
+    split = func.regexp_split_to_table(word_model.Word.simplified, "").table_valued("character").render_derived("split")
+    return (
+        select(word_model.Word.id, character_model.Character.id)
+        .select_from(word_model.Word)
+        .join(split, true())
+        .join(character_model.Character, character_model.Character.character == split.c.character)
+        .where(*where)
+        .distinct()
+    )
+
+
+async def import_dictionary(
+    db: AsyncSession, *, words: Iterable[tuple[Any, ...]], characters: Iterable[tuple[Any, ...]]
+) -> ImportStats:
+    """
+    Replaces the dictionary with `words` (tuples of WORD_COLUMNS) and `characters`
+    (tuples of CHARACTER_COLUMNS) and bumps the dictionary version. Nothing is
+    committed, the caller commits (or rolls back) the whole import at once.
+    """
+    stats = ImportStats()
+    await _copy_to_staging(db, stats, words, characters)
+
+    # the swap: everything below is only visible to others once the transaction commits, they
+    # keep reading the old rows meanwhile (TRUNCATE would make them wait for the commit)
+    await db.execute(delete(word_character_association_table))
+    await db.execute(delete(word_model.Word))
+    await db.execute(delete(character_model.Character))
+    for name, model, staged, columns in [
+        ("words", word_model.Word, _staged(words_staging, WORD_COLUMNS, WORD_KEY), WORD_COLUMNS),
+        (
+            "characters",
+            character_model.Character,
+            _staged(characters_staging, CHARACTER_COLUMNS, CHARACTER_KEY),
+            CHARACTER_COLUMNS,
+        ),
+    ]:
+        start = time.perf_counter()
+        result = await db.execute(insert(model).from_select(columns, select(*(staged.c[column] for column in columns))))
+        stats.phases[f"insert {name}"] = (_rowcount(result), time.perf_counter() - start)
+    stats.words = stats.phases["insert words"][0]
+    stats.characters = stats.phases["insert characters"][0]
+
+    start = time.perf_counter()
+    result = await db.execute(
+        insert(word_character_association_table).from_select(["word_id", "character_id"], _word_character_links())
+    )
+    stats.word_characters = _rowcount(result)
+    stats.phases["insert word_characters"] = (stats.word_characters, time.perf_counter() - start)
+
+    version = await dictionary_version_crud.bump(db)
+    # the ids have all changed, the clients have to fetch everything again
+    db.add(dictionary_change_model.DictionaryChange(version=version, entity="dictionary", action="reload"))
+    await db.flush()
+    return stats
+
+
+async def _apply_changes(
+    db: AsyncSession,
+    stats: ImportStats,
+    *,
+    version: int,
+    entity: str,
+    model: type[word_model.Word] | type[character_model.Character],
+    staged: CTE,
+    columns: tuple[str, ...],
+    key: tuple[str, ...],
+    link_column: str,
+) -> None:
+    """
+    Deletes, updates and inserts the rows of `model` so that they match `staged`, the
+    rows being matched by their `key` and compared by their content hash. Every change
+    is recorded in the changelog under `version`.
+    """
+    table = model.__table__
+    change = dictionary_change_model.DictionaryChange
+    matches = and_(*(table.c[column] == staged.c[column] for column in key))
+    change_columns = ["version", "entity", "entity_id", "key", "action"]
+
+    def changes(action: str, ids: ColumnElement[int], keys: ColumnElement[str]) -> Select[Any]:
+        return select(literal(version), literal(entity), ids, keys, literal(action))
+
+    start = time.perf_counter()
+    # the changelog doubles as the list of rows to delete
+    result = await db.execute(
+        insert(change).from_select(
+            change_columns,
+            changes("delete", table.c.id, table.c[key[0]]).where(~exists().where(matches)),
+        )
+    )
+    stats.changes[f"{entity}s deleted"] = _rowcount(result)
+    deleted_ids = select(change.entity_id).where(
+        change.version == version, change.entity == entity, change.action == "delete"
+    )
+    await db.execute(
+        delete(word_character_association_table).where(word_character_association_table.c[link_column].in_(deleted_ids))
+    )
+    await db.execute(delete(model).where(table.c.id.in_(deleted_ids)))
+
+    updated = (
+        update(model)
+        .where(matches, table.c.content_hash != staged.c.content_hash)
+        .values({column: staged.c[column] for column in columns if column not in key})
+        .returning(table.c.id, table.c[key[0]])
+        .cte(f"updated_{entity}s")
+    )
+    result = await db.execute(
+        insert(change).from_select(change_columns, changes("update", updated.c.id, updated.c[key[0]]))
+    )
+    stats.changes[f"{entity}s updated"] = _rowcount(result)
+
+    inserted = (
+        insert(model)
+        .from_select(
+            columns,
+            select(*(staged.c[column] for column in columns)).where(~exists().where(matches)),
+        )
+        .returning(table.c.id, table.c[key[0]])
+        .cte(f"inserted_{entity}s")
+    )
+    result = await db.execute(
+        insert(change).from_select(change_columns, changes("insert", inserted.c.id, inserted.c[key[0]]))
+    )
+    stats.changes[f"{entity}s inserted"] = _rowcount(result)
+    stats.phases[f"diff {entity}s"] = (
+        sum(count for name, count in stats.changes.items() if name.startswith(entity)),
+        time.perf_counter() - start,
+    )
+
+
+async def import_dictionary_changes(
+    db: AsyncSession, *, words: Iterable[tuple[Any, ...]], characters: Iterable[tuple[Any, ...]]
+) -> ImportStats:
+    """
+    Brings the dictionary in line with `words` and `characters` by only inserting,
+    updating and deleting the rows that differ, as told by their content hashes. The
+    links of the inserted words and characters are added (those of the deleted ones
+    are removed) and every change is recorded in the changelog. The version is only
+    bumped when something changed. Nothing is committed, as with `import_dictionary`.
+    """
+    stats = ImportStats()
+    await _copy_to_staging(db, stats, words, characters)
+    version = await dictionary_version_crud.get_current(db) + 1
+    await _apply_changes(
+        db,
+        stats,
+        version=version,
+        entity="word",
+        model=word_model.Word,
+        staged=_staged(words_staging, WORD_COLUMNS, WORD_KEY),
+        columns=WORD_COLUMNS,
+        key=WORD_KEY,
+        link_column="word_id",
+    )
+    await _apply_changes(
+        db,
+        stats,
+        version=version,
+        entity="character",
+        model=character_model.Character,
+        staged=_staged(characters_staging, CHARACTER_COLUMNS, CHARACTER_KEY),
+        columns=CHARACTER_COLUMNS,
+        key=CHARACTER_KEY,
+        link_column="character_id",
+    )
+    stats.words = (await db.execute(select(func.count()).select_from(word_model.Word))).scalar_one()
+    stats.characters = (await db.execute(select(func.count()).select_from(character_model.Character))).scalar_one()
+
+    start = time.perf_counter()
+    # updates keep the keys, so only the new words and characters can have new links
+    change = dictionary_change_model.DictionaryChange
+
+    def inserted_ids(entity: str) -> Select[tuple[int | None]]:
+        return select(change.entity_id).where(
+            change.version == version, change.entity == entity, change.action == "insert"
+        )
+
+    result = await db.execute(
+        pg_insert(word_character_association_table)
+        .from_select(
+            ["word_id", "character_id"],
+            _word_character_links(
+                or_(
+                    word_model.Word.id.in_(inserted_ids("word")),
+                    character_model.Character.id.in_(inserted_ids("character")),
+                )
+            ),
+        )
+        .on_conflict_do_nothing()
+    )
+    stats.word_characters = _rowcount(result)
+    stats.phases["insert word_characters"] = (stats.word_characters, time.perf_counter() - start)
+
+    if any(stats.changes.values()):
+        await dictionary_version_crud.bump(db)
+    return stats
+
+
+async def run(arguments: argparse.Namespace) -> ImportStats:
+    word_frequencies: dict[str, int] = {}
+    if arguments.word_frequencies:
+        with open_source(arguments.word_frequencies) as source:
+            word_frequencies = read_frequencies(source)
+    character_frequencies: dict[str, int] = {}
+    if arguments.character_frequencies:
+        with open_source(arguments.character_frequencies) as source:
+            character_frequencies = read_frequencies(source)
+
+    engine = create_async_engine(str(db_settings.CNLEARN_POSTGRES_URI))
+    word_stats, character_stats = ParseStats(), ParseStats()
+    start = time.perf_counter()
+    try:
+        with open_source(arguments.cedict) as cedict, open_source(arguments.hanzi) as hanzi:
+            async with AsyncSession(engine) as db:
+                stats = await (import_dictionary_changes if arguments.incremental else import_dictionary)(
+                    db,
+                    words=parse_cc_cedict(cedict, word_frequencies, word_stats),
+                    characters=parse_makemeahanzi(hanzi, character_frequencies, character_stats),
+                )
+                await db.commit()
+            # the planner needs to know when the tables changed completely, and the deleted or
+            # updated rows are dead space until vacuumed
+            async with engine.connect() as connection:
+                await (await connection.execution_options(isolation_level="AUTOCOMMIT")).execute(
+                    text("VACUUM (ANALYZE) words, characters, word_characters")
+                )
+    finally:
+        await engine.dispose()
+    print(stats.report())
+    print(
+        f"skipped {word_stats.skipped} words and {character_stats.skipped} characters too long for their columns, "
+        f"{word_stats.malformed + character_stats.malformed} malformed lines"
+    )
+    print(f"imported in {time.perf_counter() - start:.2f}s")
+    return stats
+
+
+def main() -> None:
+    """
+    This imports CC-CEDICT and makemeahanzi, replacing the current dictionary.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cedict", type=Path, required=True, help="CC-CEDICT file (cedict_ts.u8)")
+    parser.add_argument("--hanzi", type=Path, required=True, help="makemeahanzi dictionary.txt")
+    parser.add_argument("--word-frequencies", type=Path, help="word frequency file")
+    parser.add_argument("--character-frequencies", type=Path, help="character frequency file")
+    parser.add_argument(
+        "--incremental", action="store_true", help="only apply what changed since the last import and log it"
+    )
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,133 @@
+"""
+Measures the overhead of the access log per request by calling a bare ASGI app
+that answers "ok" directly, through the BaseHTTPMiddleware the access log used to
+be, and through the pure ASGI AccessLogger (logging every request, then a tenth
+of them). The log lines go through the same structlog processors as in
+production and are written to /dev/null. It does not need a database:
+
+    ENVIRONMENT=Testing python -m benchmarks.access_log
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from urllib.parse import urlencode
+from uuid import uuid4
+
+import structlog
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.logger import AccessLogger
+from app.settings.base import app_settings
+from app.settings.logging.structlog import configure_logging
+
+from .common import measure, summarise
+
+
+class BaseHTTPAccessLogger(BaseHTTPMiddleware):
+    """
+    The access log as it was before it became a pure ASGI middleware.
+    """
+
+    def __init__(self, app: ASGIApp, *, logger: structlog.BoundLogger) -> None:
+        self.logger = logger
+        super().__init__(app)
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=str(uuid4()))
+        start_time = time.time()
+        response = await call_next(request)
+        duration = time.time() - start_time
+        client_host = request.client.host if request.client is not None else ""
+        client_port = request.client.port if request.client is not None else ""
+        logged_dict = {
+            "duration": duration,
+            "url": str(request.url),
+            "method": request.method,
+            "path": request.url.path,
+            "scheme": request.url.scheme,
+            "port": request.url.port,
+            "query_params": str(request.query_params),
+            "path_params": request.path_params,
+            "client_host": client_host,
+            "client_port": client_port,
+            "http_version": request.scope["http_version"],
+            "status_code": response.status_code,
+        }
+        self.logger.info(
+            f'{client_host}:{client_port} - "{request.method} {request.url.path} HTTP/1.1" {response.status_code}',
+            request=logged_dict,
+        )
+        return response
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def request_scope() -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 51000),
+        "root_path": "",
+        "path": "/api/v1/vocabulary/get-words",
+        "raw_path": b"/api/v1/vocabulary/get-words",
+        "query_string": urlencode({"simplified_words": "鸦雀无声"}).encode("ascii"),
+        "headers": [(b"host", b"testserver")],
+        "state": {},
+    }
+
+
+async def main(iterations: int) -> None:
+    logger = configure_logging(open(os.devnull, "wb"))
+
+    async def send(message: Message) -> None:
+        pass
+
+    apps: list[tuple[str, ASGIApp, float]] = [
+        ("no access log", endpoint, 1.0),
+        ("BaseHTTPMiddleware", BaseHTTPAccessLogger(endpoint, logger=logger), 1.0),
+        ("pure ASGI", AccessLogger(endpoint, logger=logger), 1.0),
+        ("pure ASGI, 10% of 2xx", AccessLogger(endpoint, logger=logger), 0.1),
+    ]
+    baseline: float | None = None
+    for label, app, sample_rate in apps:
+        app_settings.ACCESS_LOG_SAMPLE_RATE = sample_rate
+
+        async def call() -> None:
+            messages: list[Message] = [
+                {"type": "http.request", "body": b"", "more_body": False},
+                {"type": "http.disconnect"},
+            ]
+
+            async def receive() -> Message:
+                return messages.pop(0) if len(messages) > 1 else messages[0]
+
+            await app(request_scope(), receive, send)
+
+        # warm up
+        await measure(call, 100)
+        durations = await measure(call, iterations)
+        print(summarise(label, durations), flush=True)
+        mean = sum(durations) / len(durations)
+        if baseline is None:
+            baseline = mean
+        else:
+            print(f"{'':<40} adds {(mean - baseline) * 1000:.1f}us per request", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.iterations))
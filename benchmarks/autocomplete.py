@@ -0,0 +1,69 @@
+"""
+Measures how long it takes to build the AutocompleteIndex for a CC-CEDICT sized
+dictionary, how many prefixes get precomputed and the p50/p99 latency of
+suggestions for prefixes typed one keystroke at a time. It does not need a
+database:
+
+    ENVIRONMENT=Testing python -m benchmarks.autocomplete
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.features.vocabulary.autocomplete import AutocompleteEntry, AutocompleteIndex
+
+from .common import (
+    CC_CEDICT_WORDS,
+    MAKEMEAHANZI_CHARACTERS,
+    measure,
+    summarise,
+    synthetic_dictionary,
+)
+
+
+async def main(n_words: int, iterations: int, top_k: int, scan_limit: int) -> None:
+    words, _ = synthetic_dictionary(n_words, MAKEMEAHANZI_CHARACTERS)
+    entries: list[AutocompleteEntry] = [
+        (
+            index,
+            word["simplified"],
+            word["traditional"],
+            word["pinyin_no_spaces"],
+            word["pinyin_accent"],
+            word["frequency"],
+        )
+        for index, word in enumerate(words)
+    ]
+    start = time.perf_counter()
+    autocomplete_index = AutocompleteIndex(entries, top_k=top_k, scan_limit=scan_limit)
+    print(
+        f"built the index in {time.perf_counter() - start:.1f}s, "
+        f"{autocomplete_index.n_precomputed_prefixes} precomputed prefixes"
+    )
+
+    rng = random.Random(0)
+    # every keystroke of a word being typed, in pinyin and in hanzi
+    pinyin_prefixes: list[str] = []
+    hanzi_prefixes: list[str] = []
+    while len(pinyin_prefixes) < iterations or len(hanzi_prefixes) < iterations:
+        word = rng.choice(words)
+        pinyin_prefixes.extend(word["pinyin_no_spaces"][:length] for length in range(1, len(word["pinyin_no_spaces"])))
+        hanzi_prefixes.extend(word["simplified"][:length] for length in range(1, len(word["simplified"]) + 1))
+
+    async def suggest(prefixes: list[str]) -> None:
+        autocomplete_index.suggest(prefixes.pop())
+
+    print(summarise("autocomplete, pinyin", await measure(lambda: suggest(pinyin_prefixes), iterations)))
+    print(summarise("autocomplete, hanzi", await measure(lambda: suggest(hanzi_prefixes), iterations)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=CC_CEDICT_WORDS)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--scan-limit", type=int, default=64)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.words, arguments.iterations, arguments.top_k, arguments.scan_limit))
@@ -0,0 +1,130 @@
+"""
+Helpers shared by the benchmarks: a synthetic CC-CEDICT sized dictionary,
+a way of loading it into the database inside a transaction that gets rolled
+back and a small latency summary.
+"""
+
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
+
+# CC-CEDICT has around 120k entries and makemeahanzi around 9.5k characters
+CC_CEDICT_WORDS = 120_000
+MAKEMEAHANZI_CHARACTERS = 9_500
+# a sample of the ~400 toneless syllables, enough to get realistic pinyin prefixes
+SYLLABLES: list[str] = (
+    "a ai an ang ba bai ban bang bao bei ben bi bian biao bie bin bo bu ca cai can cang cao ce cha chai chan chang "
+    "chao che chen cheng chi chong chou chu chuan chuang chui chun ci cong cu cuo da dai dan dang dao de deng di dian "
+    "diao die ding diu dong dou du duan dui dun duo e en er fa fan fang fei fen feng fo fou fu ga gai gan gang gao ge "
+    "gei gen geng gong gou gu gua guai guan guang gui gun guo ha hai han hang hao he hei hen heng hong hou hu hua huai "
+    "huan huang hui hun huo ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun ka kai kan kang kao ke ken "
+    "li lian liang liao lie lin ling liu long lou lu luan lun luo ma mai man mang mao mei men meng mi mian miao mie "
+    "min ming mo mou mu na nai nan nao ne nei neng ni nian niang niao nie nin ning niu nong nu nuan nuo pa pai pan "
+    "qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun ran rang rao re ren reng ri rong rou ru ruan rui "
+    "sha shai shan shang shao she shen sheng shi shou shu shua shuai shuan shuang shui shun shuo si song sou su suan "
+    "ta tai tan tang tao te teng ti tian tiao tie ting tong tou tu tuan tui tun tuo wa wai wan wang wei wen weng wo wu "
+    "xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun ya yan yang yao ye yi yin ying yo yong you yu yuan "
+    "yue yun za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhen zheng zhi zhong zhou zhu zhua zhuai "
+    "zhuan zhuang zhui zhun zhuo zi zong zou zu zuan zui zun zuo"
+).split()
+
+
+def synthetic_dictionary(
+    n_words: int = CC_CEDICT_WORDS, n_characters: int = MAKEMEAHANZI_CHARACTERS, seed: int = 42
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Returns (words, characters) as lists of column dictionaries. Word lengths and
+    frequencies roughly follow the ones of CC-CEDICT (mostly 2 character words,
+    Zipf-like frequencies).
+    """
+    rng = random.Random(seed)
+    characters: list[dict[str, Any]] = [
+        {
+            "character": chr(0x4E00 + index),
+            "definition": f"definition of character {index}",
+            "pinyin": "pīn",
+            "decomposition": "⿰亻尔",
+            "etymology": {"type": "pictophonetic", "hint": "a hint"},
+            "radical": "亻",
+            "matches": "[[0], [1]]",
+            "frequency": max(1, int(100_000 / (index + 1))),
+        }
+        for index in range(n_characters)
+    ]
+    # the most common character ends up in around 3% of the words, like 一 in CC-CEDICT
+    character_weights = [1 / (index + 10) for index in range(n_characters)]
+    words: list[dict[str, Any]] = []
+    for index in range(n_words):
+        length = rng.choices([1, 2, 3, 4], weights=[5, 60, 20, 15])[0]
+        positions = rng.choices(range(n_characters), character_weights, k=length)
+        simplified = "".join(chr(0x4E00 + position) for position in positions)
+        syllables = [SYLLABLES[position % len(SYLLABLES)] for position in positions]
+        tones = [str(position % 5 + 1) for position in positions]
+        words.append(
+            {
+                "simplified": simplified,
+                "traditional": simplified,
+                "pinyin_num": " ".join(syllable + tone for syllable, tone in zip(syllables, tones)),
+                "pinyin_accent": " ".join(syllables),
+                "pinyin_clean": " ".join(syllables),
+                "pinyin_no_spaces": "".join(syllables),
+                "also_written": "",
+                "also_pronounced": "",
+                "classifiers": "",
+                "definitions": f"synthetic definition number {index}; another meaning",
+                "frequency": max(1, int(1_000_000 / (index + 1))),
+            }
+        )
+    return words, characters
+
+
+async def load_dictionary(
+    connection: AsyncConnection, words: list[dict[str, Any]], characters: list[dict[str, Any]]
+) -> None:
+    """
+    Inserts the synthetic dictionary, and the word_characters links, using the given connection.
+    """
+    await connection.execute(insert(character_model.Character), characters)
+    await connection.execute(insert(word_model.Word), words)
+    character_ids: dict[str, int] = {
+        character: character_id
+        for character_id, character in (
+            await connection.execute(select(character_model.Character.id, character_model.Character.character))
+        ).tuples()
+    }
+    links: list[dict[str, int]] = []
+    for word_id, simplified in (
+        await connection.execute(select(word_model.Word.id, word_model.Word.simplified))
+    ).tuples():
+        for character in set(simplified):
+            if character in character_ids:
+                links.append({"word_id": word_id, "character_id": character_ids[character]})
+    await connection.execute(insert(word_character_association_table), links)
+
+
+async def measure(function: Callable[[], Awaitable[Any]], iterations: int) -> list[float]:
+    """
+    Returns the duration, in milliseconds, of each call of `function`.
+    """
+    durations: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summarise(name: str, durations: list[float]) -> str:
+    percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return (
+        f"{name:<40} p50={percentiles[49]:8.3f}ms p99={percentiles[98]:8.3f}ms "
+        f"mean={statistics.fmean(durations):8.3f}ms n={len(durations)}"
+    )
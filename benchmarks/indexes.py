@@ -0,0 +1,119 @@
+"""
+Checks, on a CC-CEDICT sized dictionary, that the vocabulary lookups are served
+by indexes rather than sequential scans, and prints how long each of them takes.
+The character -> words lookup can be an index only scan once word_characters
+has been vacuumed, which the freshly loaded data here hasn't. The data is loaded
+in a transaction that is rolled back at the end so it can be run against the
+testing database:
+
+    ENVIRONMENT=Testing python -m benchmarks.indexes
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
+from app.settings.db import db_settings
+
+from .common import (
+    CC_CEDICT_WORDS,
+    MAKEMEAHANZI_CHARACTERS,
+    load_dictionary,
+    synthetic_dictionary,
+)
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    return [plan] + [node for child in plan.get("Plans", []) for node in plan_nodes(child)]
+
+
+async def explain(connection: AsyncConnection, statement: Select[Any]) -> tuple[list[dict[str, Any]], float]:
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = (await connection.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}"))).scalar_one()
+    explained = result if isinstance(result, list) else json.loads(result)
+    return plan_nodes(explained[0]["Plan"]), explained[0]["Execution Time"]
+
+
+async def main(n_words: int, n_characters: int) -> None:
+    engine = create_async_engine(str(db_settings.CNLEARN_POSTGRES_URI), echo=False)
+    words, characters = synthetic_dictionary(n_words, n_characters)
+    rng = random.Random(0)
+    simplified = [word["simplified"] for word in rng.sample(words, 10)]
+    hanzi = [character["character"] for character in rng.sample(characters, 3)]
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        start = time.perf_counter()
+        await load_dictionary(connection, words, characters)
+        print(f"loaded {n_words} words and {n_characters} characters in {time.perf_counter() - start:.1f}s", flush=True)
+        for table in ("characters", "words", "word_characters"):
+            await connection.execute(text(f"ANALYZE {table}"))
+        character_ids = list(
+            (
+                await connection.execute(
+                    select(character_model.Character.id).where(character_model.Character.character.in_(hanzi))
+                )
+            ).scalars()
+        )
+        lookups: list[tuple[str, Select[Any], str]] = [
+            (
+                "characters by character",
+                select(character_model.Character).where(character_model.Character.character.in_(hanzi)),
+                "ix_characters_character",
+            ),
+            (
+                "words by simplified",
+                select(word_model.Word).where(word_model.Word.simplified.in_(simplified)),
+                "ix_words_simplified",
+            ),
+            (
+                "words by traditional",
+                select(word_model.Word).where(word_model.Word.traditional.in_(simplified)),
+                "ix_words_traditional",
+            ),
+            (
+                "most frequent words",
+                select(word_model.Word).order_by(word_model.Word.frequency.desc()).limit(20),
+                "ix_words_frequency",
+            ),
+            (
+                "words of characters",
+                select(word_character_association_table.c.word_id).where(
+                    word_character_association_table.c.character_id.in_(character_ids)
+                ),
+                "ix_word_characters_character_id",
+            ),
+        ]
+        failures = 0
+        for name, statement, index in lookups:
+            nodes, execution_time = await explain(connection, statement)
+            scans = [
+                f"{node['Node Type']} using {node['Index Name']}" if "Index Name" in node else node["Node Type"]
+                for node in nodes
+                if "Scan" in node["Node Type"]
+            ]
+            ok = any(node.get("Index Name") == index for node in nodes) and not any(
+                node["Node Type"] == "Seq Scan" for node in nodes
+            )
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':<5}{name:<28}{execution_time:8.3f}ms  {', '.join(scans)}", flush=True)
+        await transaction.rollback()
+    await engine.dispose()
+    if failures:
+        raise SystemExit(f"{failures} lookup(s) not served by their index")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=CC_CEDICT_WORDS)
+    parser.add_argument("--characters", type=int, default=MAKEMEAHANZI_CHARACTERS)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.words, arguments.characters))
@@ -0,0 +1,100 @@
+"""
+Compares the CPU time spent turning ORM rows into a JSON response body:
+
+* response_model: the rows are validated into WordOut/CharacterOut, then FastAPI
+  validates them again through the route's response_model and serialises them
+  with the stdlib json encoder (how the vocabulary routes used to answer)
+* validate + dump_json: the rows are validated once and serialised by pydantic
+* trusted dicts + orjson: the rows are turned into dictionaries without any
+  validation and serialised with orjson (what the lookup routes now do)
+
+The rows are built in memory, no database is needed:
+
+    ENVIRONMENT=Testing python -m benchmarks.serialisation
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Callable
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import RootModel, TypeAdapter
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.domain.vocabulary import combined as combined_domain
+from app.features.vocabulary.serialisation import (
+    character_out_dict,
+    dumps,
+    word_out_dict,
+)
+
+from .common import measure, summarise, synthetic_dictionary
+
+
+def build_rows(n_words: int, n_character_words: int) -> tuple[list[word_model.Word], list[character_model.Character]]:
+    """
+    Returns `n_words` words, with their characters, and 3 characters with `n_character_words` words each.
+    """
+    words, characters = synthetic_dictionary(max(n_words, n_character_words), 100)
+    character_rows = [character_model.Character(id=index, **character) for index, character in enumerate(characters)]
+    word_rows = [word_model.Word(id=index, **word) for index, word in enumerate(words)]
+    for word_row in word_rows[:n_words]:
+        word_row.characters = set(character_rows[:2])
+    for character_row in character_rows[:3]:
+        character_row.words = set(word_rows[:n_character_words])
+    return word_rows[:n_words], character_rows[:3]
+
+
+async def compare(name: str, rows: list[Any], list_type: Any, to_dict: Callable[[Any], Any], iterations: int) -> None:
+    field = create_response_field(name="Response", type_=list_type)
+    root_model: Any = RootModel[list_type]
+    adapter = TypeAdapter(list_type)
+
+    async def response_model() -> bytes:
+        validated = root_model.model_validate(rows).root
+        content = await serialize_response(field=field, response_content=validated, is_coroutine=True)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+    async def validate_dump_json() -> bytes:
+        return adapter.dump_json(root_model.model_validate(rows).root)
+
+    async def trusted_orjson() -> bytes:
+        return dumps([to_dict(row) for row in rows])
+
+    baseline: float | None = None
+    for label, function in [
+        ("response_model", response_model),
+        ("validate + dump_json", validate_dump_json),
+        ("trusted dicts + orjson", trusted_orjson),
+    ]:
+        durations = await measure(function, iterations)
+        print(summarise(f"{name}, {label}", durations), flush=True)
+        mean = sum(durations) / len(durations)
+        if baseline is None:
+            baseline = mean
+        else:
+            print(f"{'':<40} saves {baseline - mean:.3f}ms of CPU per request ({baseline / mean:.1f}x)", flush=True)
+
+
+async def main(n_character_words: int, iterations: int) -> None:
+    words, characters = build_rows(10, n_character_words)
+    await compare("get-words (10 words)", words, list[combined_domain.WordOut], word_out_dict, iterations)
+    await compare(
+        f"get-characters (3, {n_character_words} words each)",
+        characters,
+        list[combined_domain.CharacterOut],
+        lambda character: character_out_dict(character, character.words),
+        iterations,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # 一 is in a few thousand words of CC-CEDICT
+    parser.add_argument("--character-words", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=500)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.character_words, arguments.iterations))
@@ -0,0 +1,118 @@
+"""
+Compares the latency of the vocabulary lookups done through the ORM with the
+ones answered from the in-memory DictionarySnapshot, and from the memory-mapped
+one shared by the workers, on a CC-CEDICT sized dictionary. The data is loaded in a transaction that is rolled back at the
+end so it can be run against the testing database:
+
+    ENVIRONMENT=Testing python -m benchmarks.snapshot
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.domain.vocabulary import common as common_domain
+from app.domain.vocabulary import word as word_domain
+from app.features.vocabulary.logic import search as search_logic
+from app.features.vocabulary.snapshot import (
+    MappedDictionarySnapshot,
+    load_dictionary_snapshot,
+    write_mapped_snapshot,
+)
+from app.settings.db import db_settings
+
+from .common import (
+    CC_CEDICT_WORDS,
+    MAKEMEAHANZI_CHARACTERS,
+    load_dictionary,
+    measure,
+    summarise,
+    synthetic_dictionary,
+)
+
+
+async def main(n_words: int, n_characters: int, iterations: int) -> None:
+    engine = create_async_engine(str(db_settings.CNLEARN_POSTGRES_URI), echo=False)
+    words, characters = synthetic_dictionary(n_words, n_characters)
+    rng = random.Random(0)
+    word_queries = [
+        [word_domain.SimplifiedWord(word_domain.Word(word["simplified"])) for word in rng.sample(words, 10)]
+        for _ in range(iterations)
+    ]
+    character_queries = [
+        [common_domain.Character(character["character"]) for character in rng.sample(characters[:1000], 3)]
+        for _ in range(iterations)
+    ]
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        start = time.perf_counter()
+        await load_dictionary(connection, words, characters)
+        print(f"loaded {n_words} words and {n_characters} characters in {time.perf_counter() - start:.1f}s", flush=True)
+        async_session_maker = async_sessionmaker(bind=connection, expire_on_commit=False, class_=AsyncSession)
+
+        start = time.perf_counter()
+        dictionary_snapshot = await load_dictionary_snapshot(async_session_maker)
+        print(f"built the snapshot in {time.perf_counter() - start:.1f}s", flush=True)
+        footprint = dictionary_snapshot.memory_footprint()
+        print("snapshot memory footprint (MiB): " + ", ".join(f"{k}={v / 2**20:.1f}" for k, v in footprint.items()))
+        snapshot_dir = tempfile.TemporaryDirectory()
+        start = time.perf_counter()
+        write_mapped_snapshot(dictionary_snapshot, Path(snapshot_dir.name) / "dictionary.snapshot")
+        mapped_snapshot = MappedDictionarySnapshot(Path(snapshot_dir.name) / "dictionary.snapshot")
+        print(f"wrote and mapped the snapshot file in {time.perf_counter() - start:.1f}s", flush=True)
+        footprint = mapped_snapshot.memory_footprint()
+        print("mapped snapshot file (MiB, shared): " + ", ".join(f"{k}={v / 2**20:.1f}" for k, v in footprint.items()))
+
+        async with async_session_maker() as db:
+            word_iterator = iter(word_queries)
+            durations = await measure(
+                lambda: search_logic.search_simplified_words_json(next(word_iterator), db), iterations
+            )
+            print(summarise("get-words (10 words), ORM", durations), flush=True)
+            word_iterator = iter(word_queries)
+            durations = await measure(
+                lambda: search_logic.search_simplified_words_json(next(word_iterator), db, dictionary_snapshot),
+                iterations,
+            )
+            print(summarise("get-words (10 words), snapshot", durations), flush=True)
+            word_iterator = iter(word_queries)
+            durations = await measure(
+                lambda: search_logic.search_simplified_words_json(next(word_iterator), db, mapped_snapshot),
+                iterations,
+            )
+            print(summarise("get-words (10 words), mapped snapshot", durations), flush=True)
+            character_iterator = iter(character_queries)
+            durations = await measure(
+                lambda: search_logic.search_characters_json(next(character_iterator), db, True), iterations
+            )
+            print(summarise("get-characters (3, with words), ORM", durations), flush=True)
+            character_iterator = iter(character_queries)
+            durations = await measure(
+                lambda: search_logic.search_characters_json(next(character_iterator), db, True, dictionary_snapshot),
+                iterations,
+            )
+            print(summarise("get-characters (3, with words), snapshot", durations), flush=True)
+            character_iterator = iter(character_queries)
+            durations = await measure(
+                lambda: search_logic.search_characters_json(next(character_iterator), db, True, mapped_snapshot),
+                iterations,
+            )
+            print(summarise("get-characters (3, with words), mapped snapshot", durations), flush=True)
+        mapped_snapshot.close()
+        snapshot_dir.cleanup()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=CC_CEDICT_WORDS)
+    parser.add_argument("--characters", type=int, default=MAKEMEAHANZI_CHARACTERS)
+    parser.add_argument("--iterations", type=int, default=200)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.words, arguments.characters, arguments.iterations))
@@ -40,6 +40,17 @@ def check_environment() -> Generator[None, None, None]:
     yield
 
 
+# the segmentation pool's workers take a while to start, which every test starting the app would
+# pay. The tests that need them turn the pool back on
+@pytest.fixture(scope="session", autouse=True)
+def no_segmentation_pool() -> Generator[None, None, None]:
+    from app.settings.base import app_settings
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(app_settings, "SEGMENTATION_POOL_SIZE", 0)
+        yield
+
+
 # Apply migrations at beginning and end of testing session
 @pytest.fixture(scope="session", autouse=True)
 def apply_migrations(check_environment: Callable[[None], None]) -> Generator[None, None, None]:
@@ -0,0 +1,75 @@
+from urllib.parse import urlencode
+
+import pytest
+import structlog
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.settings.base import app_settings
+
+
+@pytest.mark.asyncio
+async def test_access_log_queries(
+    # the following is a root conftest fixture
+    client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "N_PLUS_ONE_THRESHOLD", 100)
+    url = app.url_path_for("vocabulary:get-words") + "?" + urlencode({"simplified_words": "鸦雀无声"})
+    with structlog.testing.capture_logs() as logs:
+        response = await client.get(url)
+    assert response.status_code == 200
+    (access_log,) = [log for log in logs if "request" in log]
+    assert access_log["request"]["db_queries"] >= 1
+    assert access_log["request"]["db_time"] > 0
+    assert access_log["request"]["db_slowest_statement"].startswith("SELECT")
+    assert not [log for log in logs if log["log_level"] == "warning"]
+
+    # every statement runs more often than that
+    monkeypatch.setattr(app_settings, "N_PLUS_ONE_THRESHOLD", 0)
+    with structlog.testing.capture_logs() as logs:
+        response = await client.get(url + "&fields=simplified")
+    warnings = [log for log in logs if log["log_level"] == "warning"]
+    assert warnings
+    assert warnings[0]["statement"].startswith("SELECT")
+    assert warnings[0]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_access_log_streamed_response(
+    # the following is a root conftest fixture
+    client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    url = app.url_path_for("vocabulary:bulk-lookup")
+    with structlog.testing.capture_logs() as logs:
+        async with client.stream("POST", url=url, json={"simplified_words": ["鸦雀无声"]}) as response:
+            lines = [line async for line in response.aiter_lines() if line]
+    assert response.status_code == 200
+    assert lines
+    # logged once the body was sent, with the statements run while streaming it
+    (access_log,) = [log for log in logs if "request" in log]
+    assert access_log["request"]["status_code"] == 200
+    assert access_log["request"]["db_queries"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_access_log_sampling(
+    # the following is a root conftest fixture
+    client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+    url = app.url_path_for("vocabulary:get-words") + "?" + urlencode({"simplified_words": "鸦雀无声"})
+    with structlog.testing.capture_logs() as logs:
+        response = await client.get(url)
+        assert response.status_code == 200
+        response = await client.get("/not-a-route")
+        assert response.status_code == 404
+    # only the 2xx responses are sampled
+    assert [log["request"]["status_code"] for log in logs if "request" in log] == [404]
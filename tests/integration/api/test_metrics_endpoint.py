@@ -0,0 +1,38 @@
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_metrics(
+    # the following is a root conftest fixture
+    client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrase")
+    response = await client.get(search_url + "?" + urlencode({"phrase": "鸦雀无声"}))
+    assert response.status_code == 200
+    # served from the response cache
+    response = await client.get(search_url + "?" + urlencode({"phrase": "鸦雀无声"}))
+    assert response.status_code == 200
+    response = await client.get("/not-a-route")
+    assert response.status_code == 404
+
+    response = await client.get(app.url_path_for("metrics"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    # the route's name, not its path
+    assert 'cnlearn_http_requests_total{route="vocabulary:search-phrase",method="GET",status="200"} 2' in lines
+    assert 'cnlearn_http_requests_total{route="unmatched",method="GET",status="404"} 1' in lines
+    assert 'cnlearn_http_request_duration_seconds_count{route="vocabulary:search-phrase",method="GET"} 2' in lines
+    assert 'cnlearn_segmentation_duration_seconds_count{mode="inline"} 1' in lines
+    assert any(line.startswith("cnlearn_db_pool_checked_out ") for line in lines)
+    assert any(line.startswith("cnlearn_db_pool_checkout_wait_seconds_count ") for line in lines)
+    assert "cnlearn_response_cache_hits_total 1" in lines
+    assert "cnlearn_response_cache_misses_total 1" in lines
+    assert "cnlearn_response_cache_entries 1" in lines
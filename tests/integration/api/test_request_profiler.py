@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Awaitable, Callable
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import security
+from app.db.models import user as user_model
+from app.middleware.profiler import RequestProfiler
+from app.settings.base import app_settings
+
+
+@pytest.mark.asyncio
+async def test_request_profiler(
+    # the following is a root conftest fixture
+    client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+    # the following is a root conftest fixture
+    create_user_object: Callable[..., Awaitable[user_model.User]],
+    # the following is a root conftest fixture
+    get_async_session_no_transaction: AsyncSession,
+    # the following is a root conftest fixture
+    clean_users_table: None,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(app_settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(app_settings, "PROFILING_INTERVAL", 0.0001)
+    monkeypatch.setattr(app_settings, "PROFILE_DIR", tmp_path)
+    user = await create_user_object(email="user@cnlearn.app", password="thisissecret")
+    superuser = await create_user_object(email="admin@cnlearn.app", password="thisissecret")
+    superuser.is_superuser = True
+    await get_async_session_no_transaction.commit()
+    url = app.url_path_for("vocabulary:search-phrase") + "?" + urlencode({"phrase": "鸦雀无声"})
+
+    # not asked for
+    response = await client.get(url, headers={"Authorization": f"Bearer {security.create_access_token(superuser.id)}"})
+    assert response.status_code == 200
+    assert "x-cnlearn-profile" not in response.headers
+    # asked for by someone who isn't a superuser, or anonymously
+    for authorization in [f"Bearer {security.create_access_token(user.id)}", "Bearer not-a-token", None]:
+        headers = {"X-CNLearn-Profile": "1"}
+        if authorization is not None:
+            headers["Authorization"] = authorization
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert "x-cnlearn-profile" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+    # a phrase that isn't in the response cache yet
+    profiled_url = app.url_path_for("vocabulary:search-phrase") + "?" + urlencode({"phrase": "鸦雀无声。" * 100})
+    response = await client.get(
+        profiled_url,
+        headers={"X-CNLearn-Profile": "1", "Authorization": f"Bearer {security.create_access_token(superuser.id)}"},
+    )
+    assert response.status_code == 200
+    assert response.json()
+    profile = tmp_path / response.headers["x-cnlearn-profile"]
+    lines = profile.read_text(encoding="utf-8").splitlines()
+    assert lines
+    for line in lines:
+        stack, _, count = line.rpartition(" ")
+        assert stack and int(count) > 0
+
+
+@pytest.mark.asyncio
+async def test_request_profiler_no_session(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "PROFILING_ENABLED", True)
+    inner_app = mock.AsyncMock()
+    profiler = RequestProfiler(inner_app)
+    async_session_maker = mock.MagicMock()
+    for authorization, profiling in [
+        (b"Bearer not-a-token", False),
+        (f"Bearer {security.create_access_token(1)}".encode("latin-1"), True),
+    ]:
+        profiler._profiling = profiling
+        scope = {
+            "type": "http",
+            "path": "/",
+            "headers": [(b"x-cnlearn-profile", b"1"), (b"authorization", authorization)],
+            "state": {"_db": async_session_maker},
+        }
+        await profiler(scope, mock.AsyncMock(), mock.AsyncMock())
+        inner_app.assert_awaited()
+    async_session_maker.assert_not_called()
@@ -1,12 +1,17 @@
 from typing import Awaitable, Callable
 
 import pytest
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import exceptions
 from app.db.crud.character import character_crud
 from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
 from app.domain.vocabulary import character as character_domain
 from app.domain.vocabulary import common as common_domain
+from app.domain.vocabulary import word as word_domain
 
 
 @pytest.mark.asyncio
@@ -161,6 +166,62 @@ async def test_crud_character_get_multi(
     assert len(all_characters) == n_characters + 1
 
 
+@pytest.mark.asyncio
+async def test_crud_character_get_page(
+    # the following is a root-imported fixture
+    generate_character_model: Callable[
+        [
+            common_domain.Character,
+            common_domain.Definition | None,
+            common_domain.PinyinToneMarks,
+            character_domain.Decomposition | None,
+            character_domain.Etymology | None,
+            character_domain.Radical,
+            character_domain.Matches,
+            common_domain.Frequency,
+        ],
+        Awaitable[character_model.Character],
+    ],
+    # the following is a root fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    # 们 and 门 are as frequent as each other so their order comes from their ids
+    for character, frequency in [("门", 500), ("谁", 9000), ("们", 500), ("你", 8000)]:
+        await generate_character_model(
+            common_domain.Character(character),
+            None,
+            common_domain.PinyinToneMarks("mén"),
+            None,
+            None,
+            character_domain.Radical("亻"),
+            character_domain.Matches(""),
+            common_domain.Frequency(frequency),
+        )
+    seen: list[str] = []
+    cursor: str | None = None
+    while True:
+        characters, cursor = await character_crud.get_page(
+            get_async_db_session_transaction,
+            limit=3,
+            cursor=cursor,
+            sort_key="frequency",
+            descending=True,
+            where=[character_model.Character.character.in_(["门", "谁", "们", "你"])],
+        )
+        seen.extend(character.character for character in characters)
+        if cursor is None:
+            break
+    assert seen == ["谁", "你", "门", "们"]
+    # the cursor of a page sorted by frequency doesn't fit one sorted by character
+    _, frequency_cursor = await character_crud.get_page(get_async_db_session_transaction, limit=1, sort_key="frequency")
+    assert frequency_cursor is not None
+    with pytest.raises(exceptions.CNLearnWithMessage) as exception_info:
+        await character_crud.get_page(get_async_db_session_transaction, cursor=frequency_cursor, sort_key="character")
+    assert exception_info.value.status_code == 400
+    with pytest.raises(ValueError):
+        await character_crud.get_page(get_async_db_session_transaction, sort_key="nope")
+
+
 @pytest.mark.asyncio
 async def test_crud_character_create(
     # the following is a root-imported fixture
@@ -365,3 +426,83 @@ async def test_crud_character_get_multiple_characters(
         include_words=True,
     )
     assert len(character_models) == 2
+
+
+@pytest.mark.asyncio
+async def test_crud_character_get_top_words(
+    # the following is a root-imported fixture
+    generate_character_model: Callable[
+        [
+            common_domain.Character,
+            common_domain.Definition | None,
+            common_domain.PinyinToneMarks,
+            character_domain.Decomposition | None,
+            character_domain.Etymology | None,
+            character_domain.Radical,
+            character_domain.Matches,
+            common_domain.Frequency,
+        ],
+        Awaitable[character_model.Character],
+    ],
+    # the following is a root-imported fixture
+    generate_word_model: Callable[
+        [
+            word_domain.SimplifiedWord,
+            word_domain.TraditionalWord,
+            common_domain.PinyinToneNumbers,
+            common_domain.PinyinToneMarks,
+            common_domain.PinyinNoToneMarks,
+            common_domain.PinyinNoSpacesNoToneMarks,
+            word_domain.AlsoWritten,
+            word_domain.AlsoPronounced,
+            word_domain.Classifiers,
+            common_domain.Definition,
+            common_domain.Frequency,
+        ],
+        Awaitable[word_model.Word],
+    ],
+    # the following is a root fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    characters: list[character_model.Character] = []
+    for character, frequency in [("门", 9001), ("们", 9002)]:
+        characters.append(
+            await generate_character_model(
+                common_domain.Character(character),
+                None,
+                common_domain.PinyinToneMarks("mén"),
+                None,
+                None,
+                character_domain.Radical("门"),
+                character_domain.Matches(""),
+                common_domain.Frequency(frequency),
+            )
+        )
+    words: list[word_model.Word] = []
+    for simplified, pinyin, frequency in [("门口", "men2 kou3", 500), ("大门", "da4 men2", 800), ("门", "men2", 900)]:
+        words.append(
+            await generate_word_model(
+                word_domain.SimplifiedWord(word_domain.Word(simplified)),
+                word_domain.TraditionalWord(word_domain.Word(simplified)),
+                common_domain.PinyinToneNumbers(pinyin),
+                common_domain.PinyinToneMarks(pinyin),
+                common_domain.PinyinNoToneMarks(pinyin),
+                common_domain.PinyinNoSpacesNoToneMarks(pinyin.replace(" ", "")),
+                word_domain.AlsoWritten(""),
+                word_domain.AlsoPronounced(""),
+                word_domain.Classifiers(""),
+                common_domain.Definition("door"),
+                common_domain.Frequency(frequency),
+            )
+        )
+    # every word has 门, 们 is in none of them
+    await get_async_db_session_transaction.execute(
+        insert(word_character_association_table).values(
+            [{"word_id": word.id, "character_id": characters[0].id} for word in words]
+        )
+    )
+    top_words = await character_crud.get_top_words(
+        get_async_db_session_transaction, character_ids=[character.id for character in characters], limit=2
+    )
+    assert [word.simplified for word in top_words[characters[0].id]] == ["门", "大门"]
+    assert top_words[characters[1].id] == []
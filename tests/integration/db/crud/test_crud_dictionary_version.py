@@ -0,0 +1,12 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.crud.dictionary_version import dictionary_version_crud
+
+
+@pytest.mark.asyncio
+async def test_bump_dictionary_version(get_async_db_session_transaction: AsyncSession) -> None:
+    # the migration adds the first version
+    assert await dictionary_version_crud.get_current(get_async_db_session_transaction) == 1
+    assert await dictionary_version_crud.bump(get_async_db_session_transaction) == 2
+    assert await dictionary_version_crud.get_current(get_async_db_session_transaction) == 2
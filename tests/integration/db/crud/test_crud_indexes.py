@@ -0,0 +1,63 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
+
+
+async def explain(db: AsyncSession, statement: Select[Any]) -> str:
+    compiled = statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    return "\n".join((await db.execute(text(f"EXPLAIN {compiled}"))).scalars())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("statement", "index", "table"),
+    [
+        pytest.param(
+            select(character_model.Character).where(character_model.Character.character.in_(["鸦", "雀"])),
+            "ix_characters_character",
+            "characters",
+            id="characters by character",
+        ),
+        pytest.param(
+            select(word_model.Word).where(word_model.Word.simplified.in_(["鸦雀无声", "你好"])),
+            "ix_words_simplified",
+            "words",
+            id="words by simplified",
+        ),
+        pytest.param(
+            select(word_model.Word).where(word_model.Word.traditional.in_(["鴉雀無聲"])),
+            "ix_words_traditional",
+            "words",
+            id="words by traditional",
+        ),
+        pytest.param(
+            select(word_model.Word).order_by(word_model.Word.frequency.desc()).limit(20),
+            "ix_words_frequency",
+            "words",
+            id="most frequent words",
+        ),
+        pytest.param(
+            select(word_character_association_table.c.word_id).where(
+                word_character_association_table.c.character_id.in_([1, 2])
+            ),
+            "ix_word_characters_character_id",
+            "word_characters",
+            id="words of characters",
+        ),
+    ],
+)
+async def test_lookups_use_indexes(
+    get_async_db_session_transaction: AsyncSession, statement: Select[Any], index: str, table: str
+) -> None:
+    # the testing tables are tiny so the planner would rather scan them, what matters is that
+    # an index can serve the lookup (the benchmarks.indexes module checks it at full size)
+    await get_async_db_session_transaction.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = await explain(get_async_db_session_transaction, statement)
+    assert index in plan
+    assert f"Seq Scan on {table}" not in plan
@@ -1,10 +1,13 @@
 from typing import Awaitable, Callable
 
 import pytest
+from sqlalchemy import insert, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.crud.word import word_crud
+from app.db.models import character as character_model
 from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
 from app.domain.vocabulary import common as common_domain
 from app.domain.vocabulary import word as word_domain
 
@@ -161,6 +164,23 @@ async def test_word_crud_get_multiple_simplified(
     assert len(we_and_you) == 2
 
 
+@pytest.mark.asyncio
+async def test_word_crud_get_multiple_simplified_fields(
+    # the following is a root fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    words = await word_crud.get_multiple_simplified(
+        get_async_db_session_transaction,
+        simplified_words=[word_domain.SimplifiedWord(word_domain.Word("鸦雀无声"))],
+        fields={"simplified", "pinyin_accent"},
+    )
+    assert len(words) == 1
+    # neither the other columns nor the characters were loaded
+    unloaded = inspect(words[0]).unloaded
+    assert {"simplified", "pinyin_accent", "id"}.isdisjoint(unloaded)
+    assert {"definitions", "pinyin_num", "characters"} <= unloaded
+
+
 @pytest.mark.asyncio
 async def test_crud_character_create(
     # the following is a root-imported fixture
@@ -344,3 +364,177 @@ async def test_word_crud_delete(
     # now let's try and get it again
     possible_got_word = await word_crud.get(get_async_db_session_transaction, model_id)
     assert possible_got_word is None
+
+
+@pytest.mark.asyncio
+async def test_word_crud_search_definitions_keyset_pagination(
+    # the following is a root-imported fixture
+    generate_word_model: Callable[
+        [
+            word_domain.SimplifiedWord,
+            word_domain.TraditionalWord,
+            common_domain.PinyinToneNumbers,
+            common_domain.PinyinToneMarks,
+            common_domain.PinyinNoToneMarks,
+            common_domain.PinyinNoSpacesNoToneMarks,
+            word_domain.AlsoWritten,
+            word_domain.AlsoPronounced,
+            word_domain.Classifiers,
+            common_domain.Definition,
+            common_domain.Frequency,
+        ],
+        Awaitable[word_model.Word],
+    ],
+    # the following is a root fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    for simplified, pinyin, definition, frequency in [
+        ("安静", "an1 jing4", "quiet; peaceful; calm", 5000),
+        ("寂静", "ji4 jing4", "quiet", 500),
+        ("静", "jing4", "still; calm; quiet; not moving", 8000),
+    ]:
+        await generate_word_model(
+            word_domain.SimplifiedWord(word_domain.Word(simplified)),
+            word_domain.TraditionalWord(word_domain.Word(simplified)),
+            common_domain.PinyinToneNumbers(pinyin),
+            common_domain.PinyinToneMarks(pinyin),
+            common_domain.PinyinNoToneMarks(pinyin),
+            common_domain.PinyinNoSpacesNoToneMarks(pinyin.replace(" ", "")),
+            word_domain.AlsoWritten(""),
+            word_domain.AlsoPronounced(""),
+            word_domain.Classifiers(""),
+            common_domain.Definition(definition),
+            common_domain.Frequency(frequency),
+        )
+    seen: list[str] = []
+    cursor: str | None = None
+    while True:
+        words, cursor = await word_crud.search_definitions(
+            get_async_db_session_transaction, query="quiet", limit=1, cursor=cursor
+        )
+        seen.extend(word.simplified for word in words)
+        if cursor is None:
+            break
+    # every word is seen once and the more frequent ones come first
+    assert seen == ["静", "安静", "寂静"]
+
+
+@pytest.mark.asyncio
+async def test_word_crud_stream_multiple_simplified(
+    # the following is a root-imported fixture
+    generate_word_model: Callable[
+        [
+            word_domain.SimplifiedWord,
+            word_domain.TraditionalWord,
+            common_domain.PinyinToneNumbers,
+            common_domain.PinyinToneMarks,
+            common_domain.PinyinNoToneMarks,
+            common_domain.PinyinNoSpacesNoToneMarks,
+            word_domain.AlsoWritten,
+            word_domain.AlsoPronounced,
+            word_domain.Classifiers,
+            common_domain.Definition,
+            common_domain.Frequency,
+        ],
+        Awaitable[word_model.Word],
+    ],
+    # the following is a root fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    # 长 has two readings so two entries
+    for simplified, pinyin, definition, frequency in [
+        ("长", "chang2", "long", 9000),
+        ("长", "zhang3", "chief; to grow", 8000),
+        ("短", "duan3", "short", 5000),
+    ]:
+        await generate_word_model(
+            word_domain.SimplifiedWord(word_domain.Word(simplified)),
+            word_domain.TraditionalWord(word_domain.Word(simplified)),
+            common_domain.PinyinToneNumbers(pinyin),
+            common_domain.PinyinToneMarks(pinyin),
+            common_domain.PinyinNoToneMarks(pinyin),
+            common_domain.PinyinNoSpacesNoToneMarks(pinyin),
+            word_domain.AlsoWritten(""),
+            word_domain.AlsoPronounced(""),
+            word_domain.Classifiers(""),
+            common_domain.Definition(definition),
+            common_domain.Frequency(frequency),
+        )
+    rows = [
+        (position, simplified, word.pinyin_num if word is not None else None)
+        async for position, simplified, word in word_crud.stream_multiple_simplified(
+            get_async_db_session_transaction,
+            simplified_words=[
+                word_domain.SimplifiedWord(word_domain.Word(simplified)) for simplified in ["短", "无", "长", "短"]
+            ],
+        )
+    ]
+    # the rows follow the order of the words sent, with an empty row for the missing word
+    assert rows == [
+        (1, "短", "duan3"),
+        (2, "无", None),
+        (3, "长", "chang2"),
+        (3, "长", "zhang3"),
+        (4, "短", "duan3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_word_crud_get_character_words_keyset_pagination(
+    # the following is a root-imported fixture
+    generate_word_model: Callable[
+        [
+            word_domain.SimplifiedWord,
+            word_domain.TraditionalWord,
+            common_domain.PinyinToneNumbers,
+            common_domain.PinyinToneMarks,
+            common_domain.PinyinNoToneMarks,
+            common_domain.PinyinNoSpacesNoToneMarks,
+            word_domain.AlsoWritten,
+            word_domain.AlsoPronounced,
+            word_domain.Classifiers,
+            common_domain.Definition,
+            common_domain.Frequency,
+        ],
+        Awaitable[word_model.Word],
+    ],
+    # the following is a root fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    character = character_model.Character(
+        character="门", pinyin="mén", radical="门", matches="", frequency=9001, definition=None
+    )
+    get_async_db_session_transaction.add(character)
+    await get_async_db_session_transaction.flush()
+    word_ids: list[int] = []
+    # 大门 and 门口 are as frequent as each other so their order comes from their ids
+    for simplified, pinyin, frequency in [("门", "men2", 900), ("大门", "da4 men2", 500), ("门口", "men2 kou3", 500)]:
+        word = await generate_word_model(
+            word_domain.SimplifiedWord(word_domain.Word(simplified)),
+            word_domain.TraditionalWord(word_domain.Word(simplified)),
+            common_domain.PinyinToneNumbers(pinyin),
+            common_domain.PinyinToneMarks(pinyin),
+            common_domain.PinyinNoToneMarks(pinyin),
+            common_domain.PinyinNoSpacesNoToneMarks(pinyin.replace(" ", "")),
+            word_domain.AlsoWritten(""),
+            word_domain.AlsoPronounced(""),
+            word_domain.Classifiers(""),
+            common_domain.Definition("door"),
+            common_domain.Frequency(frequency),
+        )
+        word_ids.append(word.id)
+    await get_async_db_session_transaction.execute(
+        insert(word_character_association_table).values(
+            [{"word_id": word_id, "character_id": character.id} for word_id in word_ids]
+        )
+    )
+    seen: list[str] = []
+    cursor: str | None = None
+    while True:
+        words, cursor = await word_crud.get_character_words(
+            get_async_db_session_transaction, character="门", limit=1, cursor=cursor
+        )
+        seen.extend(word.simplified for word in words)
+        if cursor is None:
+            break
+    assert seen == ["门", "大门", "门口"]
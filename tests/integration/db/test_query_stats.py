@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.query_stats import QueryStats, current_query_stats, track_queries
+from app.settings.db import db_settings
+
+
+def test_query_stats_record() -> None:
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.005)
+    stats.record("SELECT 1", 0.001)
+    assert stats.count == 3
+    assert stats.total_time == pytest.approx(0.008)
+    assert (stats.slowest_statement, stats.slowest_time) == ("SELECT 2", 0.005)
+    assert stats.repeated_statements(1) == [("SELECT 1", 2)]
+    assert stats.repeated_statements(2) == []
+
+
+@pytest.mark.asyncio
+async def test_track_queries() -> None:
+    engine = create_async_engine(str(db_settings.CNLEARN_POSTGRES_URI), echo=False)
+    track_queries(engine)
+    try:
+        async with engine.connect() as connection:
+            # outside of a request, nothing is accounted
+            await connection.execute(text("SELECT 1"))
+            stats = QueryStats()
+            token = current_query_stats.set(stats)
+            try:
+                for _ in range(3):
+                    await connection.execute(text("SELECT pg_sleep(0.01)"))
+                with pytest.raises(DBAPIError):
+                    await connection.execute(text("SELECT 1 / 0"))
+            finally:
+                current_query_stats.reset(token)
+            await connection.rollback()
+            await connection.execute(text("SELECT 1"))
+            assert connection.sync_connection is not None
+            assert connection.sync_connection.info["query_start_times"] == []
+    finally:
+        await engine.dispose()
+
+    assert stats.count == 4
+    assert stats.total_time >= 0.03
+    assert stats.slowest_statement == "SELECT pg_sleep(0.01)"
+    assert stats.repeated_statements(2) == [("SELECT pg_sleep(0.01)", 3)]
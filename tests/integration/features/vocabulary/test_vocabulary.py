@@ -1,10 +1,15 @@
-from typing import Any
+import json
+from typing import Any, AsyncIterator
+from unittest import mock
 from urllib.parse import urlencode
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient, Response
 
+from app.db.crud.word import word_crud
+from app.settings.base import app_settings
+
 
 @pytest.mark.asyncio
 async def test_search_word(
@@ -54,6 +59,36 @@ async def test_search_character(
     assert len(json_response[0]["words"]) == n_words
 
 
+@pytest.mark.asyncio
+async def test_search_character_words_limit(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-characters")
+    search_url += "?" + urlencode({"characters": "鸦", "include_words": True, "words_limit": 1})
+    response: Response = await client.get(url=search_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert [word["simplified"] for word in json_response[0]["words"]] == ["鸦雀无声"]
+    # 鸦 is in no other word
+    assert json_response[0]["next_words_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_character_words(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:character-words")
+    response: Response = await client.get(url=search_url + "?" + urlencode({"character": "鸦", "limit": 1}))
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert [word["simplified"] for word in json_response["items"]] == ["鸦雀无声"]
+    assert json_response["next_cursor"] is None
+    response = await client.get(url=search_url + "?" + urlencode({"character": "鸦", "cursor": "nope"}))
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_search_phrase(
     client: AsyncClient,
@@ -69,3 +104,154 @@ async def test_search_phrase(
     assert response.status_code == 200
     assert len(json_response["words"]) == 1
     assert list(sorted(json_response["not_found"])) == ["hihi", "hoho", "lala"]
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified", wraps=word_crud.get_multiple_simplified)
+async def test_search_phrases(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrases")
+    response: Response = await client.post(
+        url=search_url,
+        json={"phrases": ["鸦雀无声lala", "hoho", "鸦雀无声 鸦雀无声"]},
+    )
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    # the repeated word is only returned, and looked up, once
+    mock_get_multiple_simplified.assert_awaited_once()
+    assert [word["simplified"] for word in json_response["words"]] == ["鸦雀无声"]
+    assert json_response["phrases"] == [
+        {"words": [0], "not_found": ["lala"]},
+        {"words": [], "not_found": ["hoho"]},
+        {"words": [0], "not_found": []},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_phrases_empty_batch(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrases")
+    response: Response = await client.post(url=search_url, json={"phrases": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_search_text(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-text")
+    async with client.stream(
+        "POST",
+        url=search_url,
+        content="鸦雀无声lala。\n\nhoho！鸦雀无声".encode("utf-8"),
+        headers={"Content-Type": "text/plain; charset=utf-8"},
+    ) as response:
+        records: list[dict[str, Any]] = [json.loads(line) async for line in response.aiter_lines() if line]
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [(record["index"], record["sentence"]) for record in records] == [
+        (0, "鸦雀无声lala。"),
+        (1, "hoho！"),
+        (2, "鸦雀无声"),
+    ]
+    assert [len(record["words"]) for record in records] == [1, 0, 1]
+    assert sorted(records[0]["not_found"]) == ["lala", "。"]
+    assert sorted(records[1]["not_found"]) == ["hoho", "！"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("with_length"), [pytest.param(True, id="content length"), pytest.param(False, id="chunked")])
+async def test_search_text_too_large(
+    # the following are pytest parameters
+    with_length: bool,
+    # the following are root conftest fixtures
+    client: AsyncClient,
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "SEARCH_TEXT_MAX_BYTES", 16)
+    text = "鸦雀无声。".encode("utf-8") * 4
+
+    async def chunks() -> AsyncIterator[bytes]:
+        yield text
+
+    search_url: str = app.url_path_for("vocabulary:search-text")
+    response: Response = await client.post(
+        url=search_url, content=text if with_length else chunks(), headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 413
+    assert response.json() == {"message": "The text is too large."}
+
+
+@pytest.mark.asyncio
+async def test_bulk_lookup(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:bulk-lookup")
+    simplified_words = ["hoho", "鸦雀无声", "lala", "鸦雀无声"]
+    async with client.stream("POST", url=search_url, json={"simplified_words": simplified_words}) as response:
+        records: list[dict[str, Any]] = [json.loads(line) async for line in response.aiter_lines() if line]
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    # one record per word sent, in the same order, repetitions included
+    assert [(record["position"], record["simplified"]) for record in records] == list(enumerate(simplified_words))
+    assert [[word["simplified"] for word in record["words"]] for record in records] == [
+        [],
+        ["鸦雀无声"],
+        [],
+        ["鸦雀无声"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_lookup_too_many_words(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:bulk-lookup")
+    response: Response = await client.post(url=search_url, json={"simplified_words": ["鸦雀无声"] * 10_001})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified", wraps=word_crud.get_multiple_simplified)
+async def test_search_word_cached(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-words")
+    first_response: Response = await client.get(
+        url=search_url, params={"simplified_words": ["鸦雀无声", "你好", "鸦雀无声"]}
+    )
+    # the same words in another order are the same query
+    second_response: Response = await client.get(url=search_url, params={"simplified_words": ["你好", "鸦雀无声"]})
+    assert first_response.status_code == second_response.status_code == 200
+    assert first_response.content == second_response.content
+    assert [word["simplified"] for word in second_response.json()] == ["鸦雀无声"]
+    mock_get_multiple_simplified.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified", wraps=word_crud.get_multiple_simplified)
+async def test_search_phrase_not_found_cached(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrase")
+    for _ in range(2):
+        response: Response = await client.get(url=search_url, params={"phrase": "你好"})
+        assert response.status_code == 200
+        assert response.json()["words"] == []
+    mock_get_multiple_simplified.assert_awaited_once()
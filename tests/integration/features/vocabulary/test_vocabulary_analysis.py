@@ -0,0 +1,50 @@
+from typing import Any, AsyncGenerator
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+from app.settings.base import app_settings
+
+
+@pytest.mark.asyncio
+@pytest.fixture
+async def no_analysis_client(app: FastAPI, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[AsyncClient, None]:
+    monkeypatch.setattr(app_settings, "TEXT_ANALYSIS_ENABLED", False)
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(
+            app=manager.app,
+            base_url="http://testserver",
+            headers={"Content-Type": "application/json"},
+        ) as client:
+            yield client
+
+
+@pytest.mark.asyncio
+async def test_analyse_text(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    analyse_url: str = app.url_path_for("vocabulary:analyse-text")
+    response: Response = await client.post(url=analyse_url, json={"text": "鸦雀无声。鸦雀无声，你好！"})
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert json_response["tokens"] == 4
+    assert json_response["unknown_tokens"] == 2
+    assert sorted(json_response["not_found"]) == ["你", "好"]
+    assert json_response["coverage"][0] == {"percentile": 50, "rank": 1}
+    assert json_response["frequency_bands"][0]["tokens"] == 2
+    assert json_response["rarest"] == [{"token": "鸦雀无声", "frequency": 189, "rank": 1, "occurrences": 2}]
+
+
+@pytest.mark.asyncio
+async def test_analyse_text_not_available(
+    # the following is a fixture from this module
+    no_analysis_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    analyse_url: str = app.url_path_for("vocabulary:analyse-text")
+    response: Response = await no_analysis_client.post(url=analyse_url, json={"text": "鸦雀无声"})
+    assert response.status_code == 503
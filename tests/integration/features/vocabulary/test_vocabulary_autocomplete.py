@@ -0,0 +1,52 @@
+from typing import Any
+from urllib.parse import urlencode
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+from app.settings.base import app_settings
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("prefix", "n_words"),
+    [
+        pytest.param("鸦雀", 1, id="simplified"),
+        pytest.param("鴉", 1, id="traditional"),
+        pytest.param("yaque", 1, id="pinyin"),
+        pytest.param("ya1 que4", 1, id="pinyin with tones"),
+        pytest.param("ye", 0, id="no match"),
+    ],
+)
+async def test_autocomplete(
+    # the following are pytest parameters
+    prefix: str,
+    n_words: int,
+    # the following are root conftest fixtures
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    autocomplete_url: str = app.url_path_for("vocabulary:autocomplete")
+    autocomplete_url += "?" + urlencode({"prefix": prefix})
+    response: Response = await client.get(url=autocomplete_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert len(json_response) == n_words
+    if n_words:
+        assert json_response[0]["simplified"] == "鸦雀无声"
+        assert json_response[0]["pinyin_accent"] == "yā què wú shēng"
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_disabled(
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "AUTOCOMPLETE_ENABLED", False)
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(app=manager.app, base_url="http://testserver") as client:
+            autocomplete_url: str = app.url_path_for("vocabulary:autocomplete")
+            response: Response = await client.get(url=autocomplete_url + "?prefix=ya")
+    assert response.status_code == 503
@@ -0,0 +1,46 @@
+from typing import Any
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("query", "n_words"),
+    [
+        pytest.param("silence", 1, id="single word"),
+        pytest.param("silences", 1, id="stemmed word"),
+        pytest.param('"absolute silence"', 1, id="phrase"),
+        pytest.param("silence -crow", 0, id="excluded word"),
+        pytest.param("thunder", 0, id="no match"),
+    ],
+)
+async def test_search_english(
+    # the following are pytest parameters
+    query: str,
+    n_words: int,
+    # the following are root conftest fixtures
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-english")
+    search_url += "?" + urlencode({"query": query})
+    response: Response = await client.get(url=search_url)
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert len(json_response["items"]) == n_words
+    assert json_response["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_english_invalid_cursor(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-english")
+    search_url += "?" + urlencode({"query": "silence", "cursor": "not a cursor"})
+    response: Response = await client.get(url=search_url)
+    assert response.status_code == 400
+    assert response.json() == {"message": "Invalid cursor."}
@@ -0,0 +1,101 @@
+import json
+from typing import Any, AsyncGenerator
+from urllib.parse import urlencode
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+from app.settings.base import app_settings
+
+
+@pytest.mark.asyncio
+@pytest.fixture(params=[pytest.param(False, id="database"), pytest.param(True, id="snapshot")])
+async def fields_client(
+    request: pytest.FixtureRequest, app: FastAPI, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[AsyncClient, None]:
+    # the same responses are expected whether they come from the database or the snapshot
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_ENABLED", request.param)
+    monkeypatch.setattr(app_settings, "RESPONSE_CACHE_ENABLED", False)
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(
+            app=manager.app,
+            base_url="http://testserver",
+            headers={"Content-Type": "application/json"},
+        ) as client:
+            yield client
+
+
+@pytest.mark.asyncio
+async def test_search_word_fields(
+    # the following is a fixture from this module
+    fields_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-words")
+    search_url += "?" + urlencode({"simplified_words": "鸦雀无声", "fields": "simplified,pinyin_accent"})
+    response: Response = await fields_client.get(url=search_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert json_response == [
+        {"id": json_response[0]["id"], "simplified": "鸦雀无声", "pinyin_accent": "yā què wú shēng"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_character_fields(
+    # the following is a fixture from this module
+    fields_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-characters")
+    search_url += "?" + urlencode({"characters": "鸦", "include_words": True, "fields": "character,words"})
+    response: Response = await fields_client.get(url=search_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert set(json_response[0]) == {"id", "character", "words"}
+    assert [word["simplified"] for word in json_response[0]["words"]] == ["鸦雀无声"]
+
+
+@pytest.mark.asyncio
+async def test_search_phrase_fields(
+    # the following is a fixture from this module
+    fields_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrase")
+    search_url += "?" + urlencode({"phrase": "鸦雀无声lala", "fields": "definitions"})
+    response: Response = await fields_client.get(url=search_url)
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert [set(word) for word in json_response["words"]] == [{"definitions"}]
+    assert json_response["not_found"] == ["lala"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_lookup_fields(
+    # the following is a fixture from this module
+    fields_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:bulk-lookup") + "?" + urlencode({"fields": "frequency"})
+    async with fields_client.stream("POST", url=search_url, json={"simplified_words": ["鸦雀无声"]}) as response:
+        records: list[dict[str, Any]] = [json.loads(line) async for line in response.aiter_lines() if line]
+    assert response.status_code == 200
+    assert [set(word) for word in records[0]["words"]] == [{"id", "frequency"}]
+
+
+@pytest.mark.asyncio
+async def test_search_word_unknown_fields(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-words")
+    search_url += "?" + urlencode({"simplified_words": "鸦雀无声", "fields": "simplified,hashed_password"})
+    response: Response = await client.get(url=search_url)
+    assert response.status_code == 422
@@ -0,0 +1,51 @@
+from typing import Any
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("pinyin", "mode", "n_words"),
+    [
+        pytest.param("yaquewusheng", "exact", 1, id="exact toneless"),
+        pytest.param("ya que", "exact", 0, id="exact toneless with only a prefix"),
+        pytest.param("ya que", "prefix", 1, id="prefix toneless"),
+        pytest.param("ya1 que4", "prefix", 1, id="prefix tone numbers"),
+        pytest.param("ya2 que4", "prefix", 0, id="prefix with the wrong tone numbers"),
+        pytest.param("yā què wú shēng", "exact", 1, id="exact tone marks"),
+        pytest.param("wusheng", "partial", 1, id="partial toneless"),
+        pytest.param("wusheng", "prefix", 0, id="prefix from the middle of the word"),
+    ],
+)
+async def test_search_pinyin(
+    # the following are pytest parameters
+    pinyin: str,
+    mode: str,
+    n_words: int,
+    # the following are root conftest fixtures
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-pinyin")
+    search_url += "?" + urlencode({"pinyin": pinyin, "mode": mode})
+    response: Response = await client.get(url=search_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert len(json_response) == n_words
+    if n_words:
+        assert json_response[0]["simplified"] == "鸦雀无声"
+
+
+@pytest.mark.asyncio
+async def test_search_pinyin_not_pinyin(
+    client: AsyncClient,
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-pinyin")
+    search_url += "?" + urlencode({"pinyin": "鸦雀"})
+    response: Response = await client.get(url=search_url)
+    assert response.status_code == 400
+    assert response.json() == {"message": "This does not look like pinyin."}
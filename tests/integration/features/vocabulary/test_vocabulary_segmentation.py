@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Any, AsyncGenerator
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+
+from app.settings.base import app_settings
+
+
+@pytest.mark.asyncio
+@pytest.fixture
+async def segmentation_client(
+    app: FastAPI, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> AsyncGenerator[AsyncClient, None]:
+    monkeypatch.setattr(app_settings, "SEGMENTATION_DICTIONARY_FROM_DB", True)
+    monkeypatch.setattr(app_settings, "SEGMENTATION_CACHE_DIR", tmp_path)
+    # left behind by an older version of the dictionary
+    (tmp_path / "jieba-0123456789abcdef.dict").write_text("鸦雀 1\n")
+    (tmp_path / "jieba-0123456789abcdef.cache").write_bytes(b"")
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(
+            app=manager.app,
+            base_url="http://testserver",
+            headers={"Content-Type": "application/json"},
+        ) as client:
+            yield client
+
+
+@pytest.mark.asyncio
+async def test_segmentation_dictionary_from_words(
+    # the following is a fixture from this module
+    segmentation_client: AsyncClient,
+    # the following are root conftest fixtures
+    app: FastAPI,
+    tmp_path: Path,
+) -> None:
+    (dictionary,) = tmp_path.glob("jieba-*.dict")
+    assert "鸦雀无声 189\n" in dictionary.read_text()
+    assert dictionary.with_suffix(".cache").exists()
+    assert not (tmp_path / "jieba-0123456789abcdef.cache").exists()
+    search_url: str = app.url_path_for("vocabulary:search-phrase")
+    response: Response = await segmentation_client.get(url=search_url, params={"phrase": "鸦雀无声鸦雀"})
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert [word["simplified"] for word in json_response["words"]] == ["鸦雀无声"]
+    # without the HMM unknown text is split into characters
+    assert sorted(json_response["not_found"]) == ["雀", "鸦"]
+
+
+@pytest.mark.asyncio
+async def test_segmentation_pool(
+    # the following are root conftest fixtures
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "SEGMENTATION_POOL_SIZE", 1)
+    monkeypatch.setattr(app_settings, "SEGMENTATION_INLINE_THRESHOLD", 1)
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(app=manager.app, base_url="http://testserver") as client:
+            search_url: str = app.url_path_for("vocabulary:search-phrase")
+            response: Response = await client.get(url=search_url, params={"phrase": "鸦雀无声"})
+            assert response.status_code == 200
+            assert [word["simplified"] for word in response.json()["words"]] == ["鸦雀无声"]
+            response = await client.get(app.url_path_for("metrics"))
+    assert 'cnlearn_segmentation_duration_seconds_count{mode="pooled"} 1' in response.text.splitlines()
@@ -0,0 +1,300 @@
+import asyncio
+import fcntl
+import json
+import threading
+from pathlib import Path
+from typing import Any, AsyncGenerator
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.crud.character import character_crud
+from app.db.crud.dictionary_version import dictionary_version_crud
+from app.db.crud.word import word_crud
+from app.db.models import dictionary_version as dictionary_version_model
+from app.db.models import word as word_model
+from app.domain.vocabulary import word as word_domain
+from app.features.vocabulary.autocomplete import AutocompleteIndex
+from app.features.vocabulary.frequency import FrequencyTable
+from app.features.vocabulary.snapshot import (
+    DictionarySnapshot,
+    MappedDictionarySnapshot,
+    export_dictionary_snapshot,
+)
+from app.settings.base import app_settings
+from app.settings.db import db_settings
+
+
+@pytest.mark.asyncio
+@pytest.fixture(params=[False, True], ids=["in memory", "mapped"])
+async def snapshot_client(
+    app: FastAPI, monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncGenerator[AsyncClient, None]:
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_MAPPED", request.param)
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_DIR", tmp_path)
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(
+            app=manager.app,
+            base_url="http://testserver",
+            headers={"Content-Type": "application/json"},
+        ) as client:
+            yield client
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified", side_effect=AssertionError("the database was queried"))
+async def test_search_word_from_snapshot(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+    # the following is a fixture from this module
+    snapshot_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-words")
+    search_url += "?" + urlencode({"simplified_words": "鸦雀无声"})
+    response: Response = await snapshot_client.get(url=search_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert len(json_response) == 1
+    assert json_response[0]["simplified"] == "鸦雀无声"
+    assert sorted(character["character"] for character in json_response[0]["characters"]) == ["声", "无", "雀", "鸦"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("include_words", "n_words"),
+    [
+        pytest.param(False, 0, id="without requesting words"),
+        pytest.param(True, 1, id="with requesting words"),
+    ],
+)
+@mock.patch.object(character_crud, "get_multiple_characters", side_effect=AssertionError("the database was queried"))
+async def test_search_character_from_snapshot(
+    # the following is a mock patch
+    mock_get_multiple_characters: mock.AsyncMock,
+    # the following are pytest parameters
+    include_words: bool,
+    n_words: int,
+    # the following is a fixture from this module
+    snapshot_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:get-characters")
+    search_url += "?" + urlencode({"characters": "鸦", "include_words": include_words})
+    response: Response = await snapshot_client.get(url=search_url)
+    json_response: list[dict[str, Any]] = response.json()
+    assert response.status_code == 200
+    assert json_response[0]["character"] == "鸦"
+    assert len(json_response[0]["words"]) == n_words
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified", side_effect=AssertionError("the database was queried"))
+async def test_search_phrase_from_snapshot(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+    # the following is a fixture from this module
+    snapshot_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrase")
+    search_url += "?" + urlencode({"phrase": "鸦雀无声lala  hoho hihi鸦雀无声"})
+    response: Response = await snapshot_client.get(url=search_url)
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert len(json_response["words"]) == 1
+    assert list(sorted(json_response["not_found"])) == ["hihi", "hoho", "lala"]
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified", side_effect=AssertionError("the database was queried"))
+async def test_search_phrases_from_snapshot(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+    # the following is a fixture from this module
+    snapshot_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-phrases")
+    response: Response = await snapshot_client.post(url=search_url, json={"phrases": ["鸦雀无声lala", "鸦雀无声"]})
+    json_response: dict[str, Any] = response.json()
+    assert response.status_code == 200
+    assert [word["simplified"] for word in json_response["words"]] == ["鸦雀无声"]
+    assert json_response["phrases"] == [{"words": [0], "not_found": ["lala"]}, {"words": [0], "not_found": []}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mapped", [False, True], ids=["in memory", "mapped"])
+async def test_snapshot_reloaded_with_version(
+    # the following are pytest parameters
+    mapped: bool,
+    # the following is a root conftest fixture
+    app: FastAPI,
+    # the following is a root conftest fixture
+    get_async_session_no_transaction: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_MAPPED", mapped)
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_DIR", tmp_path)
+    monkeypatch.setattr(app_settings, "DICTIONARY_VERSION_REFRESH_INTERVAL", 0.05)
+    db = get_async_session_no_transaction
+    search_url: str = app.url_path_for("vocabulary:get-words") + "?" + urlencode({"simplified_words": "鸦雀无声"})
+    changed_word = update(word_model.Word).where(word_model.Word.simplified == "鸦雀无声")
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(app=manager.app, base_url="http://testserver") as client:
+            response: Response = await client.get(url=search_url)
+            etag = response.headers["etag"]
+            definitions = response.json()[0]["definitions"]
+            version = await dictionary_version_crud.get_current(db)
+            try:
+                # what an import does
+                await db.execute(changed_word.values(definitions="changed by an import"))
+                await dictionary_version_crud.bump(db)
+                await db.commit()
+                for _ in range(100):
+                    await asyncio.sleep(0.05)
+                    response = await client.get(url=search_url, headers={"If-None-Match": etag})
+                    if response.status_code != 304:
+                        break
+                assert response.status_code == 200
+                assert response.headers["etag"] != etag
+                assert response.headers["etag"].startswith(f'"{version + 1}-')
+                assert response.json()[0]["definitions"] == "changed by an import"
+            finally:
+                await db.execute(changed_word.values(definitions=definitions))
+                await db.execute(
+                    delete(dictionary_version_model.DictionaryVersion).where(
+                        dictionary_version_model.DictionaryVersion.version > version
+                    )
+                )
+                await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_dictionary_built_off_the_event_loop(
+    # the following are root conftest fixtures
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(app_settings, "DICTIONARY_SNAPSHOT_MAPPED", False)
+    monkeypatch.setattr(app_settings, "AUTOCOMPLETE_ENABLED", True)
+    monkeypatch.setattr(app_settings, "TEXT_ANALYSIS_ENABLED", True)
+    build_threads: dict[str, int] = {}
+    structures: list[Any] = [DictionarySnapshot, AutocompleteIndex, FrequencyTable]
+    for structure in structures:
+
+        def recording_init(self: Any, *args: Any, __init__: Any = structure.__init__, **kwargs: Any) -> None:
+            build_threads[type(self).__name__] = threading.get_ident()
+            __init__(self, *args, **kwargs)
+
+        monkeypatch.setattr(structure, "__init__", recording_init)
+    async with LifespanManager(app):
+        pass
+    assert set(build_threads) == {"DictionarySnapshot", "AutocompleteIndex", "FrequencyTable"}
+    assert threading.get_ident() not in build_threads.values()
+
+
+@pytest.mark.asyncio
+async def test_export_waits_for_the_lock_without_blocking(
+    # the following is a root conftest fixture
+    tmp_path: Path,
+) -> None:
+    engine = create_async_engine(str(db_settings.CNLEARN_POSTGRES_URI))
+    async_session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    try:
+        # another worker writing the snapshot
+        with (tmp_path / "dictionary-snapshot.lock").open("w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            export = asyncio.create_task(export_dictionary_snapshot(async_session_maker, tmp_path))
+            # the event loop keeps running while the export waits
+            await asyncio.sleep(0.2)
+            assert not export.done()
+        path = await asyncio.wait_for(export, 10)
+    finally:
+        await engine.dispose()
+    snapshot = MappedDictionarySnapshot(path)
+    assert len(snapshot) > 0
+    snapshot.close()
+
+
+@pytest.mark.asyncio
+async def test_export_consistent_with_its_version(
+    # the following is a root conftest fixture
+    get_async_session_no_transaction: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    db = get_async_session_no_transaction
+    changed_word = update(word_model.Word).where(word_model.Word.simplified == "鸦雀无声")
+    simplified_word = word_domain.SimplifiedWord(word_domain.Word("鸦雀无声"))
+    version = await dictionary_version_crud.get_current(db)
+    get_current = dictionary_version_crud.get_current
+    imported = False
+
+    async def get_current_then_import(session: AsyncSession) -> int:
+        # an import commits right after the exporter read the version
+        nonlocal imported
+        current = await get_current(session)
+        if not imported:
+            imported = True
+            await db.execute(changed_word.values(definitions="changed by an import"))
+            await dictionary_version_crud.bump(db)
+            await db.commit()
+        return current
+
+    engine = create_async_engine(str(db_settings.CNLEARN_POSTGRES_URI))
+    async_session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    definitions = (await word_crud.get_multiple_simplified(db, simplified_words=[simplified_word]))[0].definitions
+    monkeypatch.setattr(dictionary_version_crud, "get_current", get_current_then_import)
+    try:
+        path = await export_dictionary_snapshot(async_session_maker, tmp_path)
+    finally:
+        monkeypatch.undo()
+        await db.execute(changed_word.values(definitions=definitions))
+        await db.execute(
+            delete(dictionary_version_model.DictionaryVersion).where(
+                dictionary_version_model.DictionaryVersion.version > version
+            )
+        )
+        await db.commit()
+        await engine.dispose()
+    assert imported
+    snapshot = MappedDictionarySnapshot(path)
+    # the rows of the version it is labelled with
+    assert snapshot.dictionary_version == version
+    assert snapshot.get_multiple_simplified([simplified_word])[0].definitions == definitions
+    snapshot.close()
+
+
+@pytest.mark.asyncio
+@mock.patch.object(AsyncSession, "__init__", side_effect=AssertionError("a session was opened"))
+async def test_search_text_from_snapshot(
+    # the following is a mock patch
+    mock_session_init: mock.MagicMock,
+    # the following is a fixture from this module
+    snapshot_client: AsyncClient,
+    # the following is a root conftest fixture
+    app: FastAPI,
+) -> None:
+    search_url: str = app.url_path_for("vocabulary:search-text")
+    async with snapshot_client.stream(
+        "POST", url=search_url, content="鸦雀无声。鸦雀无声".encode("utf-8"), headers={"Content-Type": "text/plain"}
+    ) as response:
+        records: list[dict[str, Any]] = [json.loads(line) async for line in response.aiter_lines() if line]
+    assert response.status_code == 200
+    assert [[word["simplified"] for word in record["words"]] for record in records] == [["鸦雀无声"], ["鸦雀无声"]]
+    mock_session_init.assert_not_called()
@@ -0,0 +1,62 @@
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from app.db.crud.dictionary_version import dictionary_version_crud
+from app.features.vocabulary.versioning import DictionaryVersionTracker
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("route_name", "params"),
+    [
+        pytest.param("vocabulary:get-words", {"simplified_words": "鸦雀无声"}, id="get-words"),
+        pytest.param("vocabulary:get-characters", {"characters": "鸦"}, id="get-characters"),
+        pytest.param("vocabulary:search-phrase", {"phrase": "鸦雀无声"}, id="search-phrase"),
+    ],
+)
+async def test_not_modified(
+    client: AsyncClient,
+    app: FastAPI,
+    route_name: str,
+    params: dict[str, str],
+) -> None:
+    url: str = app.url_path_for(route_name)
+    response: Response = await client.get(url=url, params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"1-')
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    # a matching If-None-Match is answered without opening a session
+    with mock.patch.object(AsyncSession, "__aenter__", side_effect=AssertionError("a session was opened")):
+        response = await client.get(url=url, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    response = await client.get(url=url, params=params, headers={"If-None-Match": '"0-outdated"'})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_dictionary_version_tracker(get_async_db_session_transaction: AsyncSession) -> None:
+    connection = get_async_db_session_transaction.bind
+    assert isinstance(connection, AsyncConnection)
+    on_change = mock.Mock()
+    tracker = DictionaryVersionTracker(async_sessionmaker(bind=connection), on_change=[on_change])
+    assert await tracker.refresh() is True
+    assert tracker.version == 1
+    assert await tracker.refresh() is False
+    await dictionary_version_crud.bump(get_async_db_session_transaction)
+    assert await tracker.refresh() is True
+    assert tracker.version == 2
+    assert on_change.call_count == 2
+    # nothing is published until every callback has succeeded
+    tracker.on_change.append(mock.AsyncMock(side_effect=RuntimeError("could not reload")))
+    await dictionary_version_crud.bump(get_async_db_session_transaction)
+    with pytest.raises(RuntimeError):
+        await tracker.refresh()
+    assert tracker.version == 2
+    assert tracker.etag("/words?a=b") != DictionaryVersionTracker(mock.MagicMock()).etag("/words?a=b")
@@ -0,0 +1,196 @@
+import json
+from typing import Any
+
+import pytest
+from sqlalchemy import Text, cast, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.crud.dictionary_change import dictionary_change_crud
+from app.db.crud.dictionary_version import dictionary_version_crud
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.db.models.combined import word_character_association_table
+from app.tasks.import_dictionary import (
+    CHARACTER_COLUMNS,
+    WORD_COLUMNS,
+    import_dictionary,
+    import_dictionary_changes,
+    parse_cc_cedict,
+    parse_makemeahanzi,
+)
+
+
+@pytest.mark.asyncio
+async def test_import_dictionary(
+    # the following is a root conftest fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    db = get_async_db_session_transaction
+    version = await dictionary_version_crud.get_current(db)
+    cedict = [
+        "你好 你好 [ni3 hao3] /hello/hi/\n",
+        "好 好 [hao3] /good/\n",
+        "好好 好好 [hao3 hao3] /well/\n",
+        "卡拉OK 卡拉OK [ka3 la1 O K] /karaoke/\n",
+    ]
+    hanzi = [
+        json.dumps({"character": character, "pinyin": [pinyin], "radical": character, "matches": []})
+        for character, pinyin in [("你", "nǐ"), ("好", "hǎo"), ("卡", "kǎ")]
+    ]
+
+    stats = await import_dictionary(db, words=parse_cc_cedict(cedict), characters=parse_makemeahanzi(hanzi))
+
+    assert (stats.words, stats.characters, stats.word_characters) == (4, 3, 5)
+    assert set(stats.phases) == {
+        "copy words",
+        "copy characters",
+        "insert words",
+        "insert characters",
+        "insert word_characters",
+    }
+    # the old dictionary is gone
+    assert (await db.execute(select(func.count()).select_from(word_model.Word))).scalar_one() == 4
+    links = (
+        await db.execute(
+            select(word_model.Word.simplified, character_model.Character.character)
+            .join(word_character_association_table, word_character_association_table.c.word_id == word_model.Word.id)
+            .join(
+                character_model.Character,
+                word_character_association_table.c.character_id == character_model.Character.id,
+            )
+        )
+    ).all()
+    assert sorted(links) == [("你好", "你"), ("你好", "好"), ("卡拉OK", "卡"), ("好", "好"), ("好好", "好")]
+    pinyin = (
+        await db.execute(select(word_model.Word.pinyin_accent).where(word_model.Word.simplified == "你好"))
+    ).scalar_one()
+    assert pinyin == "nǐ hǎo"
+    assert await dictionary_version_crud.get_current(db) == version + 1
+    changes, _ = await dictionary_change_crud.get_since(db, version=version)
+    assert [(change.entity, change.action) for change in changes] == [("dictionary", "reload")]
+
+
+@pytest.mark.asyncio
+async def test_import_dictionary_does_not_block_readers(
+    # the following is a root conftest fixture
+    get_async_db_session_transaction: AsyncSession,
+    # the following is a root conftest fixture
+    get_async_session_no_transaction: AsyncSession,
+) -> None:
+    db = get_async_db_session_transaction
+    reader = get_async_session_no_transaction
+    words = (await reader.execute(select(func.count()).select_from(word_model.Word))).scalar_one()
+    await reader.rollback()
+
+    await import_dictionary(db, words=parse_cc_cedict(["好 好 [hao3] /good/\n"]), characters=parse_makemeahanzi([]))
+
+    # the import hasn't committed, the other sessions still read the old dictionary without waiting
+    await reader.execute(text("SET LOCAL lock_timeout = '1s'"))
+    assert (await reader.execute(select(func.count()).select_from(word_model.Word))).scalar_one() == words
+    await reader.rollback()
+
+
+async def current_rows(db: AsyncSession) -> tuple[list[tuple[Any, ...]], list[tuple[Any, ...]]]:
+    words = (await db.execute(select(*(word_model.Word.__table__.c[column] for column in WORD_COLUMNS)))).all()
+    character_table = character_model.Character.__table__
+    characters = (
+        await db.execute(
+            select(
+                *(
+                    # as the json text it was stored as
+                    cast(character_table.c[column], Text) if column == "etymology" else character_table.c[column]
+                    for column in CHARACTER_COLUMNS
+                )
+            )
+        )
+    ).all()
+    return [tuple(word) for word in words], [tuple(character) for character in characters]
+
+
+@pytest.mark.asyncio
+async def test_import_dictionary_changes_without_changes(
+    # the following is a root conftest fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    db = get_async_db_session_transaction
+    version = await dictionary_version_crud.get_current(db)
+    words, characters = await current_rows(db)
+
+    stats = await import_dictionary_changes(db, words=words, characters=characters)
+
+    assert set(stats.changes.values()) == {0}
+    assert stats.word_characters == 0
+    assert await dictionary_version_crud.get_current(db) == version
+
+
+@pytest.mark.asyncio
+async def test_import_dictionary_changes(
+    # the following is a root conftest fixture
+    get_async_db_session_transaction: AsyncSession,
+) -> None:
+    db = get_async_db_session_transaction
+    version = await dictionary_version_crud.get_current(db)
+    words, characters = await current_rows(db)
+    word_id = (
+        await db.execute(select(word_model.Word.id).where(word_model.Word.simplified == "鸦雀无声"))
+    ).scalar_one()
+    (sample_word,) = words
+    updated_word = (*sample_word[:-2], "absolute silence", sample_word[-1])
+    new_words = [
+        ("无声", "無聲", "wu2 sheng1", "wú shēng", "wu sheng", "wusheng", "", "", "", "silent", 10),
+        ("乌鸦", "烏鴉", "wu1 ya1", "wū yā", "wu ya", "wuya", "", "", "", "crow", 5),
+    ]
+    # 鸦 goes away, 雀 is more frequent and 乌 is new
+    kept_characters = [character for character in characters if character[0] not in "鸦雀"]
+    (sparrow,) = [character for character in characters if character[0] == "雀"]
+    new_characters = [(*sparrow[:-1], sparrow[-1] + 1), ("乌", "crow", "wū", None, None, "丿", "[]", 1)]
+
+    stats = await import_dictionary_changes(
+        db, words=[updated_word, *new_words], characters=[*kept_characters, *new_characters]
+    )
+
+    assert stats.changes == {
+        "words deleted": 0,
+        "words updated": 1,
+        "words inserted": 2,
+        "characters deleted": 1,
+        "characters updated": 1,
+        "characters inserted": 1,
+    }
+    assert (stats.words, stats.characters) == (3, 4)
+    # 无声 -> 无, 声 and 乌鸦 -> 乌
+    assert stats.word_characters == 3
+    assert await dictionary_version_crud.get_current(db) == version + 1
+    # the updated word kept its id
+    definitions = (
+        await db.execute(select(word_model.Word.definitions).where(word_model.Word.id == word_id))
+    ).scalar_one()
+    assert definitions == "absolute silence"
+    links = (
+        await db.execute(
+            select(word_model.Word.simplified, character_model.Character.character)
+            .join(word_character_association_table, word_character_association_table.c.word_id == word_model.Word.id)
+            .join(
+                character_model.Character,
+                word_character_association_table.c.character_id == character_model.Character.id,
+            )
+        )
+    ).all()
+    assert sorted(links) == [
+        ("乌鸦", "乌"),
+        ("无声", "声"),
+        ("无声", "无"),
+        ("鸦雀无声", "声"),
+        ("鸦雀无声", "无"),
+        ("鸦雀无声", "雀"),
+    ]
+    changes, _ = await dictionary_change_crud.get_since(db, version=version)
+    assert sorted((change.entity, change.key, change.action) for change in changes) == [
+        ("character", "乌", "insert"),
+        ("character", "雀", "update"),
+        ("character", "鸦", "delete"),
+        ("word", "乌鸦", "insert"),
+        ("word", "无声", "insert"),
+        ("word", "鸦雀无声", "update"),
+    ]
+    assert {change.version for change in changes} == {version + 1}
@@ -0,0 +1,35 @@
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    in_use = registry.gauge("in_use", "In use.")
+    requests.inc("a")
+    requests.inc("a")
+    requests.inc('b"\n')
+    registry.add_collector("in_use", lambda: in_use.set(value=3))
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="a"} 2',
+        'requests_total{route="b\\"\\n"} 1',
+        "# HELP in_use In use.",
+        "# TYPE in_use gauge",
+        "in_use 3",
+    ]
+
+
+def test_histogram() -> None:
+    registry = MetricsRegistry()
+    duration = registry.histogram("duration_seconds", "Duration.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        duration.observe("a", value=value)
+    assert duration.count("a") == 4
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{route="a",le="0.1"} 2',
+        'duration_seconds_bucket{route="a",le="1"} 3',
+        'duration_seconds_bucket{route="a",le="+Inf"} 4',
+        'duration_seconds_sum{route="a"} 2.65',
+        'duration_seconds_count{route="a"} 4',
+    ]
@@ -0,0 +1,23 @@
+import pytest
+
+from app.core import exceptions
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor([0.123456789, 42, "鸦雀无声"])
+    assert decode_cursor(cursor, 3) == [0.123456789, 42, "鸦雀无声"]
+
+
+@pytest.mark.parametrize(
+    ("cursor", "n_values"),
+    [
+        pytest.param("not a cursor", 2, id="not base64"),
+        pytest.param(encode_cursor([1, 2, 3]), 2, id="wrong number of values"),
+        pytest.param("eyJhIjoxfQ==", 1, id="not a list"),
+        pytest.param("鸦雀", 1, id="not ascii"),
+    ],
+)
+def test_decode_invalid_cursor(cursor: str, n_values: int) -> None:
+    with pytest.raises(exceptions.CNLearnWithMessage):
+        decode_cursor(cursor, n_values)
@@ -0,0 +1,46 @@
+import pytest
+
+from app.core.pinyin import (
+    NormalisedPinyin,
+    normalise_pinyin,
+    strip_tone_marks,
+    tone_numbers_to_marks,
+)
+
+
+@pytest.mark.parametrize(
+    ("pinyin", "expected"),
+    [
+        pytest.param("ni hao", NormalisedPinyin("nihao", None, None), id="toneless with spaces"),
+        pytest.param("NiHao", NormalisedPinyin("nihao", None, None), id="toneless with capitals"),
+        pytest.param("ni3 hao3", NormalisedPinyin("nihao", "ni3hao3", None), id="tone numbers"),
+        pytest.param("nǐhǎo", NormalisedPinyin("nihao", None, "nǐhǎo"), id="tone marks"),
+        pytest.param("Xi1'an1", NormalisedPinyin("xian", "xi1an1", None), id="apostrophe"),
+        pytest.param("nv3", NormalisedPinyin("nü", "nu:3", None), id="v for ü"),
+        pytest.param("nu:3", NormalisedPinyin("nü", "nu:3", None), id="u: for ü"),
+        pytest.param("nǚ", NormalisedPinyin("nü", None, "nǚ"), id="ü with a tone mark"),
+        pytest.param("123", None, id="only tone numbers"),
+        pytest.param("你好", None, id="not pinyin"),
+    ],
+)
+def test_normalise_pinyin(pinyin: str, expected: NormalisedPinyin | None) -> None:
+    assert normalise_pinyin(pinyin) == expected
+
+
+def test_strip_tone_marks() -> None:
+    assert strip_tone_marks("yā què wú shēng lǜ") == "ya que wu sheng lü"
+
+
+@pytest.mark.parametrize(
+    ("pinyin", "expected"),
+    [
+        pytest.param("ya1 que4 wu2 sheng1", "yā què wú shēng", id="one syllable per word"),
+        pytest.param("Bei3 jing1", "Běi jīng", id="capitals"),
+        pytest.param("gou3 liu2 shui3", "gǒu liú shuǐ", id="ou, iu and ui"),
+        pytest.param("nu:3 lu:4", "nǚ lǜ", id="u: for ü"),
+        pytest.param("ma5 r5", "ma r", id="neutral tone"),
+        pytest.param("ka3 la1 O K", "kǎ lā O K", id="letters without tones"),
+    ],
+)
+def test_tone_numbers_to_marks(pinyin: str, expected: str) -> None:
+    assert tone_numbers_to_marks(pinyin) == expected
@@ -0,0 +1,29 @@
+import sys
+import threading
+
+from app.core.profiling import SamplingProfiler, collapse_stack
+
+
+def busy_function() -> int:
+    total = 0
+    for index in range(2_000_000):
+        total += index % 7
+    return total
+
+
+def test_collapse_stack() -> None:
+    stack = collapse_stack(sys._getframe())
+    frames = stack.split(";")
+    # outermost first
+    assert frames[-1].startswith("test_collapse_stack (tests/unit/core/test_profiling.py:")
+
+
+def test_sampling_profiler() -> None:
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.0005)
+    profiler.start()
+    busy_function()
+    profiler.stop()
+    assert profiler.samples > 0
+    lines = profiler.collapsed().splitlines()
+    assert sum(int(line.rpartition(" ")[2]) for line in lines) == profiler.samples
+    assert any("busy_function (tests/unit/core/test_profiling.py:" in line for line in lines)
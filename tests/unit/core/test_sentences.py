@@ -0,0 +1,38 @@
+from typing import AsyncIterator
+
+import pytest
+
+from app.core.sentences import split_sentences
+
+
+async def as_chunks(*chunks: str) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(chunks: AsyncIterator[str], max_length: int = 500) -> list[str]:
+    return [sentence async for sentence in split_sentences(chunks, max_length)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("chunks", "expected"),
+    [
+        pytest.param(["你好。我很好！"], ["你好。", "我很好！"], id="one chunk"),
+        pytest.param(["你好", "。我很", "好！你呢"], ["你好。", "我很好！", "你呢"], id="split across chunks"),
+        pytest.param(
+            ["他说：“你好。", "”然后走了。"], ["他说：“你好。”", "然后走了。"], id="closing quote in next chunk"
+        ),
+        pytest.param(["第一行\n\n", "第二行\n"], ["第一行", "第二行"], id="lines"),
+        pytest.param(["真的吗？！", "真的。"], ["真的吗？！", "真的。"], id="several endings"),
+        pytest.param(["  ", "\n"], [], id="only whitespace"),
+        pytest.param([], [], id="nothing"),
+    ],
+)
+async def test_split_sentences(chunks: list[str], expected: list[str]) -> None:
+    assert await collect(as_chunks(*chunks)) == expected
+
+
+@pytest.mark.asyncio
+async def test_split_sentences_without_endings() -> None:
+    assert await collect(as_chunks("一二三四", "五六七"), max_length=3) == ["一二三", "四五六", "七"]
@@ -1,3 +1,5 @@
+import asyncio
+import json
 from unittest import mock
 
 import pytest
@@ -7,55 +9,61 @@ from app.db.crud.character import character_crud
 from app.db.crud.word import word_crud
 from app.domain.vocabulary import combined as combined_domain
 from app.domain.vocabulary import word as word_domain
+from app.features.vocabulary.cache import ResponseCache, words_key
 from app.features.vocabulary.logic.search import (
-    search_characters,
+    search_characters_json,
     search_phrase,
-    search_simplified_words,
+    search_phrase_json,
+    search_phrases,
+    search_pinyin,
+    search_simplified_words_json,
 )
 
 
 @pytest.mark.asyncio
 @mock.patch.object(word_crud, "get_multiple_simplified")
-async def test_search_simplified_words_validation_error(
+async def test_search_simplified_words_everything_works(
     # the following is a mock patch
     mock_get_multiple_simplified: mock.AsyncMock,
 ) -> None:
-    mock_get_multiple_simplified.return_value = ["hi"]
-    with pytest.raises(exceptions.CNLearnWithMessage):
-        await search_simplified_words([], mock.MagicMock())
+    mock_get_multiple_simplified.return_value = []
+    result = await search_simplified_words_json([], mock.MagicMock())
+    assert result == b"[]"
 
 
 @pytest.mark.asyncio
 @mock.patch.object(word_crud, "get_multiple_simplified")
-async def test_search_simplified_words_everything_works(
+async def test_search_simplified_words_from_cache(
     # the following is a mock patch
     mock_get_multiple_simplified: mock.AsyncMock,
 ) -> None:
-    mock_get_multiple_simplified.return_value = []
-    result = await search_simplified_words([], mock.MagicMock())
-    assert result == []
+    response_cache = ResponseCache(max_entries=10, max_bytes=1_000, ttl=60)
+    response_cache.set(words_key([], None), b"cached")
+    result = await search_simplified_words_json([], mock.MagicMock(), response_cache=response_cache)
+    assert result == b"cached"
+    mock_get_multiple_simplified.assert_not_called()
 
 
 @pytest.mark.asyncio
-@mock.patch.object(character_crud, "get_multiple_characters")
-async def test_search_characters_validation_error_without_words(
+@mock.patch.object(word_crud, "get_multiple_simplified")
+async def test_search_phrase_not_cached_across_a_dictionary_change(
     # the following is a mock patch
-    mock_get_multiple_characters: mock.AsyncMock,
+    mock_get_multiple_simplified: mock.AsyncMock,
 ) -> None:
-    mock_get_multiple_characters.return_value = [mock.Mock()]
-    with pytest.raises(exceptions.CNLearnWithMessage):
-        await search_characters([], mock.MagicMock(), include_words=False)
+    response_cache = ResponseCache()
 
+    async def cut(phrase: str) -> list[str]:
+        # the dictionary is reloaded while the phrase is being segmented
+        response_cache.clear()
+        return [phrase]
 
-@pytest.mark.asyncio
-@mock.patch.object(character_crud, "get_multiple_characters")
-async def test_search_characters_validation_error_with_words(
-    # the following is a mock patch
-    mock_get_multiple_characters: mock.AsyncMock,
-) -> None:
-    mock_get_multiple_characters.return_value = [mock.Mock()]
-    with pytest.raises(exceptions.CNLearnWithMessage):
-        await search_characters([], mock.MagicMock(), include_words=True)
+    mock_chinese_segmenter = mock.MagicMock()
+    mock_chinese_segmenter.cut = cut
+    mock_get_multiple_simplified.return_value = []
+    phrase = word_domain.SimplifiedWord(word_domain.Word("你好"))
+    result = await search_phrase_json(phrase, mock.MagicMock(), mock_chinese_segmenter, response_cache=response_cache)
+    assert json.loads(result) == {"words": [], "not_found": ["你好"]}
+    assert len(response_cache) == 0
 
 
 @pytest.mark.asyncio
@@ -68,8 +76,8 @@ async def test_search_characters_everything_works(
     with_words: bool,
 ) -> None:
     mock_get_multiple_characters.return_value = []
-    result = await search_characters([], mock.MagicMock(), include_words=with_words)
-    assert result == []
+    result = await search_characters_json([], mock.MagicMock(), include_words=with_words)
+    assert result == b"[]"
 
 
 @pytest.mark.asyncio
@@ -79,7 +87,7 @@ async def test_search_phrase_validation_error(
     mock_get_multiple_simplified: mock.AsyncMock,
 ) -> None:
     mock_chinese_segmenter = mock.MagicMock()
-    mock_chinese_segmenter.cut.return_value = []
+    mock_chinese_segmenter.cut = mock.AsyncMock(return_value=[])
     mock_get_multiple_simplified.return_value = [mock.Mock()]
     with pytest.raises(exceptions.CNLearnWithMessage):
         await search_phrase(word_domain.SimplifiedWord(word_domain.Word("")), mock.MagicMock(), mock_chinese_segmenter)
@@ -92,9 +100,70 @@ async def test_search_phrase_everything_works(
     mock_get_multiple_simplified: mock.AsyncMock,
 ) -> None:
     mock_chinese_segmenter = mock.MagicMock()
-    mock_chinese_segmenter.cut.return_value = []
+    mock_chinese_segmenter.cut = mock.AsyncMock(return_value=[])
     mock_get_multiple_simplified.return_value = []
     result = await search_phrase(
         word_domain.SimplifiedWord(word_domain.Word("")), mock.MagicMock(), mock_chinese_segmenter
     )
     assert result == combined_domain.DictionarySearchResult(words=[], not_found=[])
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified")
+async def test_search_phrases_validation_error(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+) -> None:
+    mock_chinese_segmenter = mock.MagicMock(pool_size=0)
+    mock_chinese_segmenter.cut = mock.AsyncMock(return_value=["你好"])
+    mock_get_multiple_simplified.return_value = [mock.Mock()]
+    with pytest.raises(exceptions.CNLearnWithMessage):
+        await search_phrases(
+            [word_domain.SimplifiedWord(word_domain.Word("你好"))], mock.MagicMock(), mock_chinese_segmenter
+        )
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "get_multiple_simplified")
+async def test_search_phrases_segmented_concurrently(
+    # the following is a mock patch
+    mock_get_multiple_simplified: mock.AsyncMock,
+) -> None:
+    running = 0
+    most_running = 0
+
+    async def cut(phrase: str) -> list[str]:
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [phrase]
+
+    mock_chinese_segmenter = mock.MagicMock(pool_size=2)
+    mock_chinese_segmenter.cut = cut
+    mock_get_multiple_simplified.return_value = []
+    phrases = [word_domain.SimplifiedWord(word_domain.Word(phrase)) for phrase in ["你好", "再见", "谢谢"]]
+    result = await search_phrases(phrases, mock.MagicMock(), mock_chinese_segmenter)
+    # as many at a time as the pool has workers
+    assert most_running == 2
+    assert [phrase.not_found for phrase in result.phrases] == [["你好"], ["再见"], ["谢谢"]]
+    # one lookup for the whole batch
+    mock_get_multiple_simplified.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_search_pinyin_not_pinyin() -> None:
+    with pytest.raises(exceptions.CNLearnWithMessage):
+        await search_pinyin("你好", mock.MagicMock())
+
+
+@pytest.mark.asyncio
+@mock.patch.object(word_crud, "search_pinyin")
+async def test_search_pinyin_validation_error(
+    # the following is a mock patch
+    mock_search_pinyin: mock.AsyncMock,
+) -> None:
+    mock_search_pinyin.return_value = [mock.Mock()]
+    with pytest.raises(exceptions.CNLearnWithMessage):
+        await search_pinyin("ni3hao3", mock.MagicMock())
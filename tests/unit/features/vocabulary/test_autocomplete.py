@@ -0,0 +1,49 @@
+import pytest
+
+from app.features.vocabulary.autocomplete import AutocompleteEntry, AutocompleteIndex
+
+
+@pytest.fixture
+def autocomplete_entries() -> list[AutocompleteEntry]:
+    return [
+        (1, "我", "我", "wo", "wǒ", 99999),
+        (2, "我们", "我們", "women", "wǒ men", 12345),
+        (3, "我国", "我國", "woguo", "wǒ guó", 3000),
+        (4, "卧", "臥", "wo", "wò", 500),
+        (5, "窝", "窩", "wo", "wō", 700),
+        (6, "你们", "你們", "nimen", "nǐ men", 2345),
+        (7, "握手", "握手", "woshou", "wò shǒu", 800),
+    ]
+
+
+@pytest.mark.parametrize(("scan_limit"), [pytest.param(64, id="scan"), pytest.param(1, id="precomputed")])
+@pytest.mark.parametrize(
+    ("prefix", "expected"),
+    [
+        pytest.param("我", ["我", "我们", "我国"], id="simplified"),
+        pytest.param("我們", ["我们"], id="traditional"),
+        pytest.param("臥", ["卧"], id="traditional only"),
+        pytest.param("wo", ["我", "我们", "我国", "握手", "窝", "卧"], id="pinyin"),
+        pytest.param("wo3 m", ["我们"], id="pinyin with tones and spaces"),
+        pytest.param("WoGuo", ["我国"], id="pinyin with capitals"),
+        pytest.param("他", [], id="no match"),
+        pytest.param(" ", [], id="nothing typed"),
+    ],
+)
+def test_autocomplete_suggest(
+    # the following are pytest parameters
+    scan_limit: int,
+    prefix: str,
+    expected: list[str],
+    # the following is a fixture from this module
+    autocomplete_entries: list[AutocompleteEntry],
+) -> None:
+    autocomplete_index = AutocompleteIndex(autocomplete_entries, top_k=10, scan_limit=scan_limit)
+    assert [suggestion.simplified for suggestion in autocomplete_index.suggest(prefix)] == expected
+
+
+def test_autocomplete_top_k(autocomplete_entries: list[AutocompleteEntry]) -> None:
+    autocomplete_index = AutocompleteIndex(autocomplete_entries, top_k=2, scan_limit=1)
+    assert autocomplete_index.n_precomputed_prefixes > 0
+    assert [suggestion.simplified for suggestion in autocomplete_index.suggest("wo")] == ["我", "我们"]
+    assert [suggestion.simplified for suggestion in autocomplete_index.suggest("wo", limit=1)] == ["我"]
@@ -0,0 +1,103 @@
+from app.core.metrics import MetricsRegistry
+from app.features.vocabulary.cache import (
+    ResponseCache,
+    instrument_response_cache,
+    phrase_key,
+    words_key,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_hit_and_miss() -> None:
+    cache = ResponseCache()
+    assert cache.get("key") is None
+    cache.set("key", b"[]")
+    assert cache.get("key") == b"[]"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_cache_least_recently_used_evicted() -> None:
+    cache = ResponseCache(max_entries=2)
+    cache.set("first", b"1")
+    cache.set("second", b"2")
+    cache.get("first")
+    cache.set("third", b"3")
+    assert cache.get("second") is None
+    assert cache.get("first") == b"1"
+    assert cache.get("third") == b"3"
+    assert cache.stats.evictions == 1
+
+
+def test_cache_bounded_size() -> None:
+    cache = ResponseCache(max_bytes=10)
+    cache.set("first", b"12345")
+    cache.set("second", b"123456")
+    assert len(cache) == 1
+    assert cache.size == 6
+    # too big to be cached at all
+    cache.set("third", b"12345678901")
+    assert cache.get("third") is None
+    assert cache.get("second") == b"123456"
+
+
+def test_cache_expiry() -> None:
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.set("key", b"[]")
+    clock.now = 9.9
+    assert cache.get("key") == b"[]"
+    clock.now = 10
+    assert cache.get("key") is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+def test_cache_clear() -> None:
+    cache = ResponseCache()
+    cache.set("key", b"[]")
+    cache.clear()
+    assert cache.get("key") is None
+    assert cache.size == 0
+    assert cache.stats.invalidations == 1
+
+
+def test_cache_keys() -> None:
+    assert words_key(["你好", "我", "你好"]) == words_key(["我", "你好"])
+    assert phrase_key("你好") == phrase_key("你好")
+    assert phrase_key("你好") != phrase_key("你好吗")
+
+
+def test_cache_stats_collected() -> None:
+    cache = ResponseCache(max_entries=1)
+    registry = MetricsRegistry()
+    instrument_response_cache(cache, registry)
+    cache.set("first", b"1")
+    cache.set("second", b"22")
+    cache.get("first")
+    cache.get("second")
+    lines = registry.render().splitlines()
+    assert "cnlearn_response_cache_hits_total 1" in lines
+    assert "cnlearn_response_cache_misses_total 1" in lines
+    assert "cnlearn_response_cache_evictions_total 1" in lines
+    assert "cnlearn_response_cache_entries 1" in lines
+    assert "cnlearn_response_cache_bytes 2" in lines
+    cache.clear()
+    assert "cnlearn_response_cache_invalidations_total 1" in registry.render().splitlines()
+
+
+def test_cache_skips_responses_of_an_older_generation() -> None:
+    cache = ResponseCache()
+    generation = cache.generation
+    # the dictionary changed while the response was being computed
+    cache.clear()
+    cache.set("key", b"old", generation)
+    assert cache.get("key") is None
+    cache.set("key", b"new", cache.generation)
+    assert cache.get("key") == b"new"
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app.features.vocabulary.frequency import RANK_BANDS, FrequencyTable
+
+
+@pytest.fixture
+def frequency_table() -> FrequencyTable:
+    # ranks: 我 1, 是 2, 我们 3, 朋友 4, 鸦雀无声 5
+    return FrequencyTable(
+        [("我", 1000), ("我们", 500), ("是", 800), ("朋友", 300), ("鸦雀无声", 10), ("我们", 100)],
+        [("我", 5), ("鸦", 1)],
+    )
+
+
+def test_lookup(frequency_table: FrequencyTable) -> None:
+    frequencies, ranks = frequency_table.lookup(np.array(["我们", "鸦", "你", "鸦雀无声", "齉"]))
+    assert frequencies.tolist() == [500, 1, 0, 10, 0]
+    assert ranks.tolist() == [3, 6, 0, 5, 0]
+
+
+def test_lookup_empty_table() -> None:
+    frequencies, ranks = FrequencyTable([]).lookup(np.array(["我"]))
+    assert frequencies.tolist() == [0]
+    assert ranks.tolist() == [0]
+
+
+def test_analyse(frequency_table: FrequencyTable) -> None:
+    tokens = ["我们", "是", "朋友", "。", "我", "是", "我", "，", "hello", " ", "鸦雀无声", "你"]
+    analysis = frequency_table.analyse(tokens, n_rarest=2)
+    assert analysis.tokens == 8
+    assert analysis.unique_tokens == 6
+    assert analysis.unknown_tokens == 1
+    assert analysis.not_found == ["你"]
+    # sorted ranks of the known tokens: 1 1 2 2 3 4 5, and one unknown token
+    assert [(coverage.percentile, coverage.rank) for coverage in analysis.coverage] == [
+        (50, 2),
+        (80, 5),
+        (90, None),
+        (95, None),
+        (98, None),
+    ]
+    assert len(analysis.frequency_bands) == len(RANK_BANDS) + 1
+    assert analysis.frequency_bands[0].tokens == 7
+    assert analysis.frequency_bands[0].share == 7 / 8
+    assert analysis.frequency_bands[-1].max_rank is None
+    assert [(token.token, token.rank, token.occurrences) for token in analysis.rarest] == [
+        ("鸦雀无声", 5, 1),
+        ("朋友", 4, 1),
+    ]
+
+
+def test_analyse_without_chinese(frequency_table: FrequencyTable) -> None:
+    analysis = frequency_table.analyse(["hello", " ", "!"])
+    assert analysis.tokens == 0
+    assert all(coverage.rank is None for coverage in analysis.coverage)
+    assert all(band.share == 0 for band in analysis.frequency_bands)
+    assert analysis.rarest == []
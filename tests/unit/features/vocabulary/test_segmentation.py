@@ -0,0 +1,117 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest
+
+from app.core import exceptions
+from app.features.vocabulary import segmentation
+from app.features.vocabulary.segmentation import SegmentationExecutor
+
+PHRASE = "我们都是好朋友"
+
+
+@pytest.mark.asyncio
+@pytest.fixture
+async def pooled_segmenter() -> AsyncGenerator[SegmentationExecutor, None]:
+    segmenter = SegmentationExecutor(pool_size=1, inline_threshold=0)
+    await segmenter.start()
+    yield segmenter
+    segmenter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_segment_inline_without_pool() -> None:
+    segmenter = SegmentationExecutor(pool_size=0)
+    await segmenter.start()
+    assert "".join(await segmenter.cut(PHRASE)) == PHRASE
+    assert segmenter.stats.inline_calls == 1
+    assert segmenter.stats.pooled_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_segment_in_pool(
+    # the following is a fixture from this module
+    pooled_segmenter: SegmentationExecutor,
+) -> None:
+    tokens = await pooled_segmenter.cut(PHRASE)
+    assert "".join(tokens) == PHRASE
+    assert "朋友" in tokens
+    assert pooled_segmenter.stats.pooled_calls == 1
+    assert pooled_segmenter.stats.total_segmentation_time > 0
+    # short texts don't go through the pool
+    pooled_segmenter.inline_threshold = len(PHRASE) + 1
+    await pooled_segmenter.cut(PHRASE)
+    assert pooled_segmenter.stats.inline_calls == 1
+    assert pooled_segmenter.stats.pooled_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_segment_in_pool_overloaded(
+    # the following is a fixture from this module
+    pooled_segmenter: SegmentationExecutor,
+) -> None:
+    pooled_segmenter.max_queue = 0
+    with pytest.raises(exceptions.CNLearnWithMessage) as exception_info:
+        await pooled_segmenter.cut(PHRASE)
+    assert exception_info.value.status_code == 503
+    assert pooled_segmenter.stats.rejected_calls == 1
+    pooled_segmenter.max_queue = 1
+    pooled_segmenter.timeout = 0
+    with pytest.raises(exceptions.CNLearnWithMessage) as exception_info:
+        await pooled_segmenter.cut(PHRASE)
+    assert exception_info.value.status_code == 504
+    assert pooled_segmenter.stats.timed_out_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_segment_in_pool_timed_out_still_queued(
+    # the following is a fixture from this module
+    pooled_segmenter: SegmentationExecutor,
+) -> None:
+    pooled_segmenter.max_queue = 1
+    pooled_segmenter.timeout = 0.05
+    with pytest.raises(exceptions.CNLearnWithMessage) as exception_info:
+        await pooled_segmenter.cut(PHRASE * 10_000)
+    assert exception_info.value.status_code == 504
+    # the worker is still segmenting it, there is no room for another text
+    with pytest.raises(exceptions.CNLearnWithMessage) as exception_info:
+        await pooled_segmenter.cut(PHRASE)
+    assert exception_info.value.status_code == 503
+    for _ in range(200):
+        if pooled_segmenter._pending == 0:
+            break
+        await asyncio.sleep(0.05)
+    pooled_segmenter.timeout = 5
+    assert "".join(await pooled_segmenter.cut(PHRASE)) == PHRASE
+
+
+def _worker_ready() -> tuple[int, bool]:
+    return os.getpid(), segmentation._worker_tokenizer.initialized
+
+
+@pytest.mark.asyncio
+async def test_segment_pool_workers_started() -> None:
+    segmenter = SegmentationExecutor(pool_size=2, inline_threshold=0)
+    await segmenter.start()
+    try:
+        assert segmenter._pool is not None
+        loop = asyncio.get_running_loop()
+        workers = await asyncio.gather(*(loop.run_in_executor(segmenter._pool, _worker_ready) for _ in range(10)))
+        # both workers were started, and had loaded jieba, before the segmenter was
+        assert len(segmenter._pool._processes) == 2
+        assert all(initialized for _, initialized in workers)
+    finally:
+        segmenter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_segment_with_dictionary(tmp_path: Path) -> None:
+    dictionary = tmp_path / "jieba-test.dict"
+    dictionary.write_text("我们 100\n都 100\n是 100\n好 100\n朋 10\n友 10\n")
+    segmenter = SegmentationExecutor(dictionary=dictionary)
+    await segmenter.start()
+    # 朋友 isn't in the dictionary and the HMM doesn't get to guess it
+    assert await segmenter.cut(PHRASE) == ["我们", "都", "是", "好", "朋", "友"]
+    assert (tmp_path / "jieba-test.cache").exists()
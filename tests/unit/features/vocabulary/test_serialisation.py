@@ -0,0 +1,57 @@
+import orjson
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.domain.vocabulary import combined as combined_domain
+from app.features.vocabulary.serialisation import (
+    character_out_dict,
+    dumps,
+    word_out_dict,
+)
+
+
+def make_character(id: int, character: str) -> character_model.Character:
+    return character_model.Character(
+        id=id,
+        character=character,
+        definition=None,
+        pinyin="men",
+        decomposition="⿰亻门",
+        etymology={"type": "pictophonetic", "hint": "person"},
+        radical="亻",
+        matches="",
+        frequency=5000,
+    )
+
+
+def make_word(id: int, simplified: str) -> word_model.Word:
+    return word_model.Word(
+        id=id,
+        simplified=simplified,
+        traditional=simplified,
+        pinyin_num="wo3 men5",
+        pinyin_accent="wǒ men",
+        pinyin_clean="wo men",
+        pinyin_no_spaces="women",
+        also_written="",
+        also_pronounced="",
+        classifiers="",
+        definitions="we; us",
+        frequency=12345,
+    )
+
+
+def test_word_out_dict_matches_pydantic() -> None:
+    word = make_word(1, "我们")
+    word.characters = {make_character(10, "们")}
+    expected = combined_domain.WordOut.model_validate(word).model_dump(mode="json")
+    assert orjson.loads(dumps(word_out_dict(word))) == expected
+
+
+def test_character_out_dict_matches_pydantic() -> None:
+    character = make_character(10, "们")
+    words = [make_word(1, "我们"), make_word(2, "你们")]
+    expected = combined_domain.CharacterOut.model_validate(
+        {**character.__dict__, "words": words, "next_words_cursor": "cursor"}
+    ).model_dump(mode="json")
+    assert orjson.loads(dumps(character_out_dict(character, words, "cursor"))) == expected
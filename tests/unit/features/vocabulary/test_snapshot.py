@@ -0,0 +1,154 @@
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from app.domain.vocabulary import common as common_domain
+from app.domain.vocabulary import word as word_domain
+from app.features.vocabulary.snapshot import (
+    DictionarySnapshot,
+    MappedDictionarySnapshot,
+    write_mapped_snapshot,
+)
+
+
+@pytest.fixture
+def memory_snapshot() -> DictionarySnapshot:
+    words: list[tuple[Any, ...]] = [
+        (1, "我们", "我們", "wo3 men5", "wǒ men", "wo men", "women", "", "", "", "we; us", 12345),
+        (2, "你们", "你們", "ni3 men5", "nǐ men", "ni men", "nimen", "", "", "", "you (plural)", 2345),
+        (3, "我", "我", "wo3", "wǒ", "wo", "wo", "", "", "", "I; me", 99999),
+    ]
+    characters: list[tuple[Any, ...]] = [
+        (10, "我", "our, us, i, me, my, we", "wǒ", "⿰手戈", None, "戈", "", 10000),
+        (11, "们", "adjunct pronoun indicate plural", "men", "⿰亻门", None, "亻", "", 5000),
+        (
+            12,
+            "你",
+            "you, second person pronoun",
+            "nǐ",
+            "⿰亻尔",
+            {"type": "pictophonetic", "hint": "人"},
+            "亻",
+            "",
+            8000,
+        ),
+    ]
+    links: list[tuple[int, int]] = [(1, 10), (1, 11), (2, 11), (2, 12), (3, 10), (4, 10)]
+    return DictionarySnapshot(words=words, characters=characters, links=links)
+
+
+@pytest.fixture(params=["memory", "mapped"])
+def dictionary_snapshot(
+    request: pytest.FixtureRequest,
+    tmp_path: Path,
+    # the following is a fixture from this module
+    memory_snapshot: DictionarySnapshot,
+) -> Iterator[DictionarySnapshot]:
+    if request.param == "memory":
+        yield memory_snapshot
+        return
+    write_mapped_snapshot(memory_snapshot, tmp_path / "dictionary.snapshot", dictionary_version=7)
+    mapped_snapshot = MappedDictionarySnapshot(tmp_path / "dictionary.snapshot")
+    yield mapped_snapshot
+    mapped_snapshot.close()
+
+
+def test_snapshot_get_multiple_simplified(dictionary_snapshot: DictionarySnapshot) -> None:
+    words = dictionary_snapshot.get_multiple_simplified(
+        [
+            word_domain.SimplifiedWord(word_domain.Word("我们")),
+            word_domain.SimplifiedWord(word_domain.Word("他们")),
+            word_domain.SimplifiedWord(word_domain.Word("我们")),
+        ]
+    )
+    assert len(words) == 1
+    assert words[0].id == 1
+    assert words[0].pinyin_accent == "wǒ men"
+    assert words[0].characters is not None
+    assert sorted(character.character for character in words[0].characters) == ["们", "我"]
+
+
+@pytest.mark.parametrize(
+    ("include_words", "expected_words"),
+    [
+        pytest.param(False, [], id="without words"),
+        pytest.param(True, ["你们", "我们"], id="with words"),
+    ],
+)
+def test_snapshot_get_multiple_characters(
+    # the following are pytest parameters
+    include_words: bool,
+    expected_words: list[str],
+    # the following is a fixture from this module
+    dictionary_snapshot: DictionarySnapshot,
+) -> None:
+    characters = dictionary_snapshot.get_multiple_characters(
+        [common_domain.Character("们"), common_domain.Character("他")], include_words=include_words
+    )
+    assert len(characters) == 1
+    assert characters[0].id == 11
+    assert characters[0].words is not None
+    assert sorted(word.simplified for word in characters[0].words) == expected_words
+
+
+def test_snapshot_get_multiple_characters_words_limit(
+    # the following is a fixture from this module
+    dictionary_snapshot: DictionarySnapshot,
+) -> None:
+    characters = dictionary_snapshot.get_multiple_characters(
+        [common_domain.Character("们"), common_domain.Character("你")], include_words=True, words_limit=1
+    )
+    # the most frequent word is kept, and a cursor is given for the other one
+    assert characters[0].words is not None
+    assert [word.simplified for word in characters[0].words] == ["我们"]
+    assert characters[0].next_words_cursor is not None
+    assert characters[1].words is not None
+    assert [word.simplified for word in characters[1].words] == ["你们"]
+    assert characters[1].next_words_cursor is None
+
+
+def test_snapshot_get_character_words(
+    # the following is a fixture from this module
+    dictionary_snapshot: DictionarySnapshot,
+) -> None:
+    words = dictionary_snapshot.get_character_words(common_domain.Character("我"), limit=1)
+    assert [word.simplified for word in words] == ["我"]
+    words = dictionary_snapshot.get_character_words(common_domain.Character("我"), limit=10, after=(99999, 3))
+    assert [word.simplified for word in words] == ["我们"]
+    assert dictionary_snapshot.get_character_words(common_domain.Character("他"), limit=10) == []
+
+
+def test_snapshot_memory_footprint(dictionary_snapshot: DictionarySnapshot) -> None:
+    footprint = dictionary_snapshot.memory_footprint()
+    assert len(dictionary_snapshot) == 3
+    assert dictionary_snapshot.n_characters == 3
+    assert footprint["total"] == sum(size for name, size in footprint.items() if name != "total")
+    assert footprint["words"] > 0
+
+
+def test_mapped_snapshot_round_trip(
+    tmp_path: Path,
+    # the following is a fixture from this module
+    memory_snapshot: DictionarySnapshot,
+) -> None:
+    write_mapped_snapshot(memory_snapshot, tmp_path / "dictionary.snapshot", dictionary_version=7)
+    mapped_snapshot = MappedDictionarySnapshot(tmp_path / "dictionary.snapshot")
+    assert mapped_snapshot.dictionary_version == 7
+    assert list(mapped_snapshot._words) == list(memory_snapshot._words)
+    assert list(mapped_snapshot._characters) == list(memory_snapshot._characters)
+    assert [list(positions) for positions in mapped_snapshot._word_characters] == [
+        list(positions) for positions in memory_snapshot._word_characters
+    ]
+    assert [list(positions) for positions in mapped_snapshot._character_words] == [
+        list(positions) for positions in memory_snapshot._character_words
+    ]
+    assert dict(mapped_snapshot._simplified_index) == dict(memory_snapshot._simplified_index)
+    assert dict(mapped_snapshot._character_index) == dict(memory_snapshot._character_index)
+    mapped_snapshot.close()
+
+
+def test_mapped_snapshot_rejects_other_files(tmp_path: Path) -> None:
+    (tmp_path / "dictionary.snapshot").write_bytes(bytes(256))
+    with pytest.raises(ValueError):
+        MappedDictionarySnapshot(tmp_path / "dictionary.snapshot")
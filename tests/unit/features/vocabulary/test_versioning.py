@@ -0,0 +1,18 @@
+import pytest
+
+from app.features.vocabulary.versioning import etag_matches
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        pytest.param('"1-abc"', True, id="same"),
+        pytest.param('W/"1-abc"', True, id="weak"),
+        pytest.param('"0-abc", "1-abc"', True, id="list"),
+        pytest.param("*", True, id="any"),
+        pytest.param('"0-abc"', False, id="other version"),
+        pytest.param("", False, id="empty"),
+    ],
+)
+def test_etag_matches(if_none_match: str, expected: bool) -> None:
+    assert etag_matches(if_none_match, '"1-abc"') is expected
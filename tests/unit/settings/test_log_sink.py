@@ -0,0 +1,89 @@
+import io
+import logging
+import threading
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+from app.settings.logging.sink import QueueLogHandler, instrument_log_handler
+
+
+class BlockingStream(io.BytesIO):
+    """
+    A stream whose writes wait until `release` is set.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self.writing.set()
+        self.release.wait()
+        return super().write(data)
+
+
+def make_record(message: str | bytes, *args: object) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, args, None)
+
+
+def test_queue_log_handler_writes_lines() -> None:
+    stream = io.BytesIO()
+    handler = QueueLogHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.handle(make_record(b'{"event":"rendered by structlog"}'))
+    handler.handle(make_record("formatted %s", "声"))
+    handler.flush()
+    assert stream.getvalue() == '{"event":"rendered by structlog"}\nformatted 声\n'.encode()
+    handler.close()
+    # once closed, lines are written straight away
+    handler.handle(make_record(b"after close"))
+    assert stream.getvalue().endswith(b"after close\n")
+
+
+def test_queue_log_handler_drops_overflow() -> None:
+    stream = BlockingStream()
+    handler = QueueLogHandler(stream, max_size=2, overflow="drop")
+    handler.handle(make_record(b"0"))
+    # the writer took the first line and waits, 2 more fit in the queue
+    assert stream.writing.wait(5)
+    for index in range(1, 6):
+        handler.handle(make_record(str(index).encode()))
+    assert handler.dropped == 3
+    stream.release.set()
+    handler.flush()
+    assert stream.getvalue() == b"0\n1\n2\n"
+    registry = MetricsRegistry()
+    instrument_log_handler(handler, registry)
+    assert "cnlearn_log_lines_dropped_total 3" in registry.render().splitlines()
+    handler.close()
+
+
+def test_queue_log_handler_blocks_on_overflow() -> None:
+    stream = BlockingStream()
+    handler = QueueLogHandler(stream, max_size=1, overflow="block")
+    handler.handle(make_record(b"0"))
+    assert stream.writing.wait(5)
+    handler.handle(make_record(b"1"))
+    logging_thread = threading.Thread(target=handler.handle, args=(make_record(b"2"),))
+    logging_thread.start()
+    logging_thread.join(0.1)
+    # waiting for room in the queue
+    assert logging_thread.is_alive()
+    stream.release.set()
+    logging_thread.join(5)
+    assert not logging_thread.is_alive()
+    handler.close()
+    assert (handler.dropped, handler.blocked) == (0, 1)
+    assert stream.getvalue() == b"0\n1\n2\n"
+
+
+@pytest.mark.parametrize("overflow", ["drop", "block"])
+def test_queue_log_handler_close_writes_everything(overflow: str) -> None:
+    stream = io.BytesIO()
+    handler = QueueLogHandler(stream, overflow=overflow)  # type: ignore[arg-type]
+    for index in range(5_000):
+        handler.handle(make_record(b"x"))
+    handler.close()
+    assert stream.getvalue() == b"x\n" * 5_000
@@ -0,0 +1,87 @@
+import json
+
+from app.db.models import character as character_model
+from app.db.models import word as word_model
+from app.tasks.import_dictionary import (
+    CHARACTER_COLUMNS,
+    WORD_COLUMNS,
+    ParseStats,
+    characters_staging,
+    parse_cc_cedict,
+    parse_makemeahanzi,
+    read_frequencies,
+    words_staging,
+)
+
+CEDICT_LINES = [
+    "# CC-CEDICT\n",
+    "鴉雀無聲 鸦雀无声 [ya1 que4 wu2 sheng1] /lit. crow and peacock make no sound/absolute silence (idiom)/\n",
+    "綠 绿 [lu:4] /green/also pr. [lu4]/CL:個|个[ge4]/\n",
+    "這 这 [zhe4] /this/also written 這|这[zhei4]/\n",
+    "not a cedict line\n",
+    f"長 长 [chang2] /{'long' * 200}/\n",
+]
+
+
+def test_parse_cc_cedict() -> None:
+    stats = ParseStats()
+    words = [dict(zip(WORD_COLUMNS, row)) for row in parse_cc_cedict(CEDICT_LINES, {"鸦雀无声": 189}, stats)]
+    assert words[0] == {
+        "simplified": "鸦雀无声",
+        "traditional": "鴉雀無聲",
+        "pinyin_num": "ya1 que4 wu2 sheng1",
+        "pinyin_accent": "yā què wú shēng",
+        "pinyin_clean": "ya que wu sheng",
+        "pinyin_no_spaces": "yaquewusheng",
+        "also_written": "",
+        "also_pronounced": "",
+        "classifiers": "",
+        "definitions": "lit. crow and peacock make no sound; absolute silence (idiom)",
+        "frequency": 189,
+    }
+    assert (words[1]["pinyin_accent"], words[1]["pinyin_clean"]) == ("lǜ", "lü")
+    assert (words[1]["also_pronounced"], words[1]["classifiers"]) == ("[lu4]", "個|个[ge4]")
+    assert (words[1]["definitions"], words[1]["frequency"]) == ("green", 1)
+    assert words[2]["also_written"] == "這|这[zhei4]"
+    assert stats == ParseStats(rows=3, skipped=1, malformed=1)
+
+
+def test_parse_makemeahanzi() -> None:
+    entry = {
+        "character": "雀",
+        "definition": "sparrow",
+        "pinyin": ["què", "qiāo"],
+        "decomposition": "⿱小隹",
+        "etymology": {"type": "ideographic", "hint": "A small 小 bird 隹"},
+        "radical": "隹",
+        "matches": [[0], [0], None],
+    }
+    stats = ParseStats()
+    lines = [json.dumps(entry), "{", json.dumps({**entry, "character": "雀雀"})]
+    characters = [dict(zip(CHARACTER_COLUMNS, row)) for row in parse_makemeahanzi(lines, {"雀": 650}, stats)]
+    assert characters == [
+        {
+            "character": "雀",
+            "definition": "sparrow",
+            "pinyin": "què, qiāo",
+            "decomposition": "⿱小隹",
+            "etymology": json.dumps(entry["etymology"], ensure_ascii=False),
+            "radical": "隹",
+            "matches": "[[0], [0], None]",
+            "frequency": 650,
+        }
+    ]
+    assert stats == ParseStats(rows=1, skipped=1, malformed=1)
+
+
+def test_read_frequencies() -> None:
+    assert read_frequencies(["的 100\n", "了\t50\n", "broken\n", "的 1\n"]) == {"的": 100, "了": 50}
+
+
+def test_staging_content_hashes() -> None:
+    # the incremental import compares them with the ones of the real tables
+    for staging, model in [(words_staging, word_model.Word), (characters_staging, character_model.Character)]:
+        staging_hash = staging.c.content_hash.computed
+        model_hash = model.__table__.c.content_hash.computed
+        assert staging_hash is not None and model_hash is not None
+        assert str(staging_hash.sqltext) == str(model_hash.sqltext)